@@ -1,7 +1,6 @@
 import json
+import contextvars
 import concurrent.futures
-from openai import OpenAI
-from config import NVIDIA_API_KEY
 
 from capabilities.snapshot import get_market_snapshot
 from capabilities.context import get_asset_context
@@ -16,42 +15,53 @@ from capabilities.ipo_analysis import analyze_financials
 from capabilities.ipo_sentiment import analyze_ipo_sentiment
 from capabilities.ipo_red_flags import analyze_red_flags
 from capabilities.ipo_final_report import assemble_final_ipo_report
-from providers.yahoo import search_symbol
+from providers.yahoo import get_market_data, search_symbol
 
 from capabilities.premarket import get_premarket_dashboard
 from capabilities.alerts import get_overnight_alerts
 from capabilities.sentiment import analyze_news_sentiment
 from capabilities.gaps import scan_gap_opportunities
+from providers.llm_gateway import chat_completion
+from providers.llm_metrics import intent_scope, set_intent
+from capabilities.single_flight import single_flight
+from capabilities.intent_classifier import classify_query, find_asset, record_labeled_query
+from capabilities.prompt_packer import Section, count_tokens, pack_sections, split_markdown_sections, truncate_to_tokens
+from capabilities.cache_warmer import record_asset_query
 
-client = OpenAI(
-    base_url="https://integrate.api.nvidia.com/v1",
-    api_key=NVIDIA_API_KEY
-)
+# Speculative lookups started while the LLM parses intent (see prefetch_asset)
+_prefetch_pool = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="prefetch")
+
+# Seconds a finished result is reused for identical (intent, asset) requests. Concurrent
+# identical requests always share one computation; intents not listed are never coalesced
+# because their answer depends on the exact wording of the question.
+COALESCE_FRESHNESS = {
+    "premarket": 120,
+    "gaps": 120,
+    "alerts": 300,
+    "news_sentiment": 300,
+    "deep_research": 300,
+}
 
-MODEL = "meta/llama-3.3-70b-instruct"
+# Prompt token budgets (see capabilities/prompt_packer.py)
+DEEP_RESEARCH_PROMPT_BUDGET = 6000
+GENERAL_CHAT_REPORT_BUDGET = 5000   # tokens of the latest daily report pasted into general chat
 
 def get_latest_market_report() -> str:
-    """Reads the most recent market impact report from the reports directory."""
-    import glob
-    import os
-    
-    reports_dir = os.path.join(os.path.dirname(__file__), "reports")
-    if not os.path.exists(reports_dir):
-        return ""
-    
-    report_files = glob.glob(os.path.join(reports_dir, "market_impact_report_*.md"))
-    if not report_files:
-        return ""
-    
-    # Sort files by name (since they contain YYYY-MM-DD in the filename, sorting alphabetically sorts by date)
-    report_files.sort()
-    latest_report_path = report_files[-1]
-    
-    try:
-        with open(latest_report_path, "r", encoding="utf-8") as f:
-            return f.read()
-    except Exception:
+    """The most recent published market impact report, served from the in-memory artifact cache."""
+    from capabilities.report_cache import get_latest_report_text
+    return get_latest_report_text()
+
+
+def pack_report_context(report: str, budget: int) -> str:
+    """Fits the daily report into `budget` tokens, keeping its earliest sections whole."""
+    if not report:
         return ""
+    packed = pack_sections(
+        [Section("report", items=split_markdown_sections(report), min_tokens=budget // 4)],
+        budget=budget,
+        label="report context",
+    )
+    return truncate_to_tokens(packed["report"], budget)
 
 
 # =====================================================
@@ -93,12 +103,56 @@ def ipo_worker(query: str):
         "report": assemble_final_ipo_report(query, fin, sen, red, doc)
     }
 
+# The coalesced workers catch their own errors and return them as text
+# ("Pre-market dashboard error: ...", "Research aggregation failed: ..."); never reuse those
+ERROR_RESULT_MARKERS = (
+    "error:", "error generating", "failed:", "unavailable —",
+    "could not resolve symbol", "no recent news found",
+)
+
+
+def is_cacheable_result(result) -> bool:
+    """False for empty results and the error strings the coalesced workers return."""
+    if not isinstance(result, str) or not result.strip():
+        return False
+    head = result[:300].lower()
+    return not any(marker in head for marker in ERROR_RESULT_MARKERS)
+
+
+def coalesced(intent: str, asset: str, fn, *args, **kwargs) -> str:
+    """Runs fn once for all identical concurrent (intent, asset) requests; see COALESCE_FRESHNESS."""
+    key = (intent, " ".join((asset or "").lower().split()))
+    return single_flight(
+        key, fn, *args, fresh_for=COALESCE_FRESHNESS.get(intent, 0),
+        cacheable=is_cacheable_result, **kwargs
+    )
+
+
+def prefetch_asset(asset: str):
+    """Resolves the symbol and fetches the quote for a likely asset, warming the yahoo caches."""
+    symbol = search_symbol(asset)
+    if symbol:
+        get_market_data(symbol)
+
+
+def guess_asset(text: str) -> str:
+    """Cheap asset guess for prefetching: a known alias, or a short heuristic extraction."""
+    known = find_asset(text)
+    if known:
+        return known
+    heuristic = extract_asset(text)
+    return heuristic if 0 < len(heuristic.split()) <= 3 else ""
+
 # =====================================================
 # INTENT DETECTION (SCRIPT-FIRST)
 # =====================================================
 
 def detect_script_intent(text: str) -> str | None:
     text = text.lower()
+    # Economic calendar — check BEFORE news so "upcoming events" isn't treated as company news
+    if any(k in text for k in ["economic calendar", "event calendar", "upcoming events", "coming this week",
+                                 "this week's events", "events this week", "fomc", "mpc meeting", "expiry day"]):
+        return "calendar"
     if any(k in text for k in ["price", "snapshot", "how is", "quote"]):
         return "market"
     if any(k in text for k in ["technical", "indicator", "rsi", "sma", "ema", "signal"]):
@@ -138,7 +192,7 @@ def extract_asset(text: str) -> str:
 # CORE LOGIC
 # =====================================================
 
-def ai_summarize(data: dict, query: str, context: str = "") -> str:
+def ai_summarize(data: dict, query: str, context: str = "", on_delta=None) -> str:
     """Uses AI ONLY to summarize the deterministic data fetched by scripts."""
     prompt = (
         f"User Query: {query}\n"
@@ -151,19 +205,19 @@ def ai_summarize(data: dict, query: str, context: str = "") -> str:
     )
     
     try:
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
+        content = chat_completion(
+            [
                 {"role": "system", "content": "You are a financial data summarizer. Be factual, conservative, and brief. No advice."},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            call_site="agent.summarize",
+            on_delta=on_delta
         )
-        content = response.choices[0].message.content if response and response.choices else None
         return content or "Summary unavailable — LLM returned empty response."
     except Exception as e:
         return f"Summary failed: {e}"
 
-def run_deep_research(query: str) -> str:
+def run_deep_research(query: str, on_delta=None) -> str:
     """Multi-agent Deep Research mode using 5 specialized workers in parallel."""
     workers = {
         "Market": market_worker,
@@ -175,7 +229,7 @@ def run_deep_research(query: str) -> str:
     
     results = {}
     with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_worker = {executor.submit(func, query): name for name, func in workers.items()}
+        future_to_worker = {executor.submit(contextvars.copy_context().run, func, query): name for name, func in workers.items()}
         for future in concurrent.futures.as_completed(future_to_worker):
             worker_name = future_to_worker[future]
             try:
@@ -183,26 +237,40 @@ def run_deep_research(query: str) -> str:
             except Exception as e:
                 results[worker_name] = {"error": str(e)}
 
-    # AI aggregates all worker findings
+    # AI aggregates all worker findings. Raw dumps are packed so the least useful
+    # (IPO data for listed companies, Reddit chatter) is trimmed first.
+    instructions = "Synthesize a professional, 5-part research report. Separate into: Fundamentals, Technicals, News/Sentiment, IPO/Strategy, and Risks. No advice."
+    packed = pack_sections(
+        [
+            Section("Market", json.dumps(results['Market'], default=str), priority=0),
+            Section("Technical", json.dumps(results['Technical'], default=str), priority=1, min_tokens=300),
+            Section("News", json.dumps(results['News'], default=str), priority=2, min_tokens=500),
+            Section("Social", json.dumps(results['Social'], default=str), priority=3, min_tokens=200),
+            Section("IPO", json.dumps(results['IPO'], default=str), priority=4, min_tokens=100),
+        ],
+        budget=DEEP_RESEARCH_PROMPT_BUDGET,
+        reserved=count_tokens(instructions) + 100,
+        label="deep research prompt",
+    )
     prompt = (
         f"Deep Research Report for: {query}\n\n"
-        f"Market Data: {json.dumps(results['Market'], default=str)}\n"
-        f"Technical Data: {json.dumps(results['Technical'], default=str)}\n"
-        f"News & Events: {json.dumps(results['News'], default=str)}\n"
-        f"Social Sentiment: {json.dumps(results['Social'], default=str)}\n"
-        f"IPO Analysis: {json.dumps(results['IPO'], default=str)}\n\n"
-        "Synthesize a professional, 5-part research report. Separate into: Fundamentals, Technicals, News/Sentiment, IPO/Strategy, and Risks. No advice."
+        f"Market Data: {packed['Market']}\n"
+        f"Technical Data: {packed['Technical']}\n"
+        f"News & Events: {packed['News']}\n"
+        f"Social Sentiment: {packed['Social']}\n"
+        f"IPO Analysis: {packed['IPO']}\n\n"
+        f"{instructions}"
     )
     
     try:
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
+        content = chat_completion(
+            [
                 {"role": "system", "content": "You are a lead equity research analyst. Synthesize a detailed report from multiple sub-agent findings. Stay objective and factual."},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            call_site="agent.deep_research",
+            on_delta=on_delta
         )
-        content = response.choices[0].message.content if response and response.choices else None
         return content or "Research report unavailable — LLM returned empty response."
     except Exception as e:
         return f"Research aggregation failed: {e}"
@@ -228,6 +296,7 @@ def extract_intent_and_asset_via_ai(text: str) -> tuple[str, str]:
         "   - 'alerts': Requests for overnight alerts or watchlist monitoring.\n"
         "   - 'news_sentiment': Questions specifically asking for AI sentiment score on recent news for a stock.\n"
         "   - 'gaps': Questions about gap-ups or gap-downs at market open.\n"
+        "   - 'calendar': Questions about upcoming scheduled economic events this week (RBI policy, Fed/FOMC, CPI, GDP, OPEC, F&O expiry).\n"
         "   - 'general': General chat, financial questions, or greetings.\n\n"
         "2. The clean asset or company name OR the geopolitical event description (e.g., 'Middle East war', 'Russia Ukraine conflict', 'US tariffs on India'). Return null if neither is mentioned.\n\n"
         "Output a JSON object with keys 'intent' and 'asset'. For geopolitical_impact, put the event description in 'asset'. Example:\n"
@@ -235,15 +304,14 @@ def extract_intent_and_asset_via_ai(text: str) -> tuple[str, str]:
     )
     
     try:
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
+        content = chat_completion(
+            [
                 {"role": "system", "content": "You are a precise query parser that outputs only raw JSON."},
                 {"role": "user", "content": prompt}
             ],
+            call_site="agent.intent_parse",
             temperature=0.1
         )
-        content = response.choices[0].message.content if response and response.choices else None
         if not content:
             raise ValueError("LLM parser returned empty response")
         content = content.strip()
@@ -251,13 +319,28 @@ def extract_intent_and_asset_via_ai(text: str) -> tuple[str, str]:
             content = re.sub(r"^```(?:json)?\n|```$", "", content, flags=re.MULTILINE).strip()
         
         parsed = json.loads(content)
-        return parsed.get("intent", "general"), parsed.get("asset") or ""
+        intent, asset = parsed.get("intent", "general"), parsed.get("asset") or ""
+        # Every LLM-labeled query becomes training data for the local classifier
+        record_labeled_query(text, intent, asset)
+        return intent, asset
     except Exception:
         # Fallback to simple heuristics
         return detect_script_intent(text) or "general", extract_asset(text)
 
 
-def handle_user_message(user_text: str) -> str:
+def handle_user_message(user_text: str, on_delta=None) -> str:
+    """
+    Routes a user message to the right capability and returns the reply.
+
+    `on_delta` (optional) receives LLM text fragments as they stream in, for frontends
+    that show the answer progressively. The returned string is always the complete reply.
+    """
+    # LLM calls made while handling this message are recorded against its intent
+    with intent_scope("parsing"):
+        return _route_user_message(user_text, on_delta)
+
+
+def _route_user_message(user_text: str, on_delta=None) -> str:
     cleaned_query = user_text.strip()
     
     # Heuristic check: if the query is a single clean word, skip LLM parsing for speed
@@ -265,20 +348,35 @@ def handle_user_message(user_text: str) -> str:
         intent = detect_script_intent(cleaned_query) or "market"
         asset = cleaned_query
     else:
-        # Conversational query: use LLM for robust extraction
-        intent, asset = extract_intent_and_asset_via_ai(cleaned_query)
+        # Conversational query: the local classifier answers when confident,
+        # otherwise use LLM for robust extraction
+        local = classify_query(cleaned_query)
+        if local:
+            intent, asset = local
+        else:
+            # Resolve the likely asset in parallel with the LLM call; the worker reuses it
+            guess = guess_asset(cleaned_query)
+            if guess:
+                _prefetch_pool.submit(contextvars.copy_context().run, prefetch_asset, guess)
+            intent, asset = extract_intent_and_asset_via_ai(cleaned_query)
+            if guess and asset and asset.strip().lower() != guess.lower() and find_asset(asset) == guess:
+                asset = guess  # same company under another name: keep the prefetched lookup
     
-    if not asset and intent not in ["deep_research", "general", "sector_scan", "geopolitical_impact", "premarket", "alerts", "gaps"]:
+    if not asset and intent not in ["deep_research", "general", "sector_scan", "geopolitical_impact", "premarket", "alerts", "gaps", "calendar"]:
         intent = "general"
+    set_intent(intent)
+    if asset and intent in ("market", "technical", "news", "news_sentiment", "deep_research"):
+        # Remembered for the pre-open cache warm-up; resolved off the request path
+        _prefetch_pool.submit(contextvars.copy_context().run, record_asset_query, asset)
 
     # 1. PRIORITY: SCRIPT-FIRST
     if intent == "market":
         data = market_worker(asset)
-        return ai_summarize(data, user_text)
+        return ai_summarize(data, user_text, on_delta=on_delta)
     
     if intent == "technical":
         data = technical_worker(asset)
-        return ai_summarize(data, user_text)
+        return ai_summarize(data, user_text, on_delta=on_delta)
     
     if intent == "news":
         data = news_worker(asset)
@@ -294,49 +392,53 @@ def handle_user_message(user_text: str) -> str:
                 "low": price_data.get("low"),
                 "direction": price_data.get("direction")
             }
-        return ai_summarize(data, user_text)
+        return ai_summarize(data, user_text, on_delta=on_delta)
     
     if intent == "social":
         data = social_worker(asset)
-        return ai_summarize(data, user_text)
+        return ai_summarize(data, user_text, on_delta=on_delta)
     
     if intent == "ipo":
         data = ipo_worker(asset)
         if isinstance(data, dict) and "report" in data: 
             return data["report"]
-        return ai_summarize(data, user_text)
+        return ai_summarize(data, user_text, on_delta=on_delta)
 
     # 2. DEEP RESEARCH MODE (5 Sub-Agents)
     if intent == "deep_research":
-        return run_deep_research(asset or user_text)
+        return coalesced(intent, asset or user_text, run_deep_research, asset or user_text, on_delta=on_delta)
 
     # 3. GEOPOLITICAL IMPACT MODE
     if intent == "geopolitical_impact":
         from capabilities.geo_impact import run_geo_impact_analysis
         # asset here holds the event description extracted by the LLM parser
         event_desc = asset if asset else user_text
-        return run_geo_impact_analysis(user_text, event_desc)
+        return run_geo_impact_analysis(user_text, event_desc, on_delta=on_delta)
 
     if intent == "sector_scan":
         from capabilities.sector_scanner import run_sector_scanner
-        return run_sector_scanner(user_text)
+        return run_sector_scanner(user_text, on_delta=on_delta)
 
     # NEW TOOLS ROUTING
     if intent == "premarket":
-        return get_premarket_dashboard()
+        return coalesced(intent, "", get_premarket_dashboard)
         
     if intent == "alerts":
-        return get_overnight_alerts()
+        return coalesced(intent, "", get_overnight_alerts)
         
     if intent == "news_sentiment":
-        return analyze_news_sentiment(asset)
+        return coalesced(intent, asset, analyze_news_sentiment, asset)
         
     if intent == "gaps":
-        return scan_gap_opportunities()
+        return coalesced(intent, "", scan_gap_opportunities)
+
+    if intent == "calendar":
+        from providers.economic_calendar import format_upcoming_events_text
+        return "🗓️ Upcoming high-impact events (next 7 days):\n\n" + format_upcoming_events_text(7)
 
     # 3. FALLBACK: Use AI to handle conversational filler or general chat
     try:
-        report_context = get_latest_market_report()
+        report_context = pack_report_context(get_latest_market_report(), GENERAL_CHAT_REPORT_BUDGET)
         system_content = (
             "You are FinanceAI, a helpful, premium AI financial assistant for Indian stocks (NSE).\n"
             "If the user asks a complex question about a specific stock, suggest using 'Deep Research' (e.g. 'Tell me about Infosys (Deep Research)').\n"
@@ -351,14 +453,14 @@ def handle_user_message(user_text: str) -> str:
         else:
             system_content += "\nProvide objective financial analysis based on your knowledge, and add a disclaimer that this is not investment advice."
 
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
+        content = chat_completion(
+            [
                 {"role": "system", "content": system_content},
                 {"role": "user", "content": user_text}
-            ]
+            ],
+            call_site="agent.general_chat",
+            on_delta=on_delta
         )
-        content = response.choices[0].message.content if response and response.choices else None
         return content or "I couldn't generate a response. Please try again."
     except Exception as e:
         return f"Error: {e}"
@@ -0,0 +1,18 @@
+"""
+Admin Access
+Gates the operational commands (/llm_stats, /jobs) to the bot operators.
+
+Admins are listed in config.py as ADMIN_IDS: Telegram user ids and Discord user ids, which
+don't collide. With no ADMIN_IDS configured the commands are available to nobody.
+"""
+
+try:
+    from config import ADMIN_IDS
+except ImportError:
+    ADMIN_IDS = ()
+
+_admins = {str(i) for i in ADMIN_IDS}
+
+
+def is_admin(user_id) -> bool:
+    return user_id is not None and str(user_id) in _admins
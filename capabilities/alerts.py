@@ -1,14 +1,8 @@
 import json
 from datetime import datetime
-from openai import OpenAI
-from config import NVIDIA_API_KEY
 from providers.finnhub import get_market_news
+from providers.llm_gateway import chat_completion
 
-client = OpenAI(
-    base_url="https://integrate.api.nvidia.com/v1",
-    api_key=NVIDIA_API_KEY
-)
-MODEL = "meta/llama-3.3-70b-instruct"
 
 def get_overnight_alerts(watchlist: list = None) -> str:
     """
@@ -29,14 +23,14 @@ def get_overnight_alerts(watchlist: list = None) -> str:
     )
     
     try:
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
+        content = chat_completion(
+            [
                 {"role": "system", "content": "You are a risk management and alert system for Indian stocks."},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            call_site="alerts.overnight"
         )
-        content = response.choices[0].message.content or "Error generating alerts."
+        content = content or "Error generating alerts."
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         return f"📅 {current_time}\n\n{content}"
     except Exception as e:
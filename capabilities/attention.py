@@ -1,11 +1,5 @@
-from openai import OpenAI
-from config import NVIDIA_API_KEY
 from providers.reddit import fetch_reddit_posts
-
-client = OpenAI(
-    base_url="https://integrate.api.nvidia.com/v1",
-    api_key=NVIDIA_API_KEY
-)
+from providers.llm_gateway import chat_completion
 
 
 def get_social_macro_query_via_ai(asset_name: str) -> str:
@@ -21,15 +15,15 @@ def get_social_macro_query_via_ai(asset_name: str) -> str:
         f"Output ONLY the 2-word search query without any quotes or punctuation."
     )
     try:
-        response = client.chat.completions.create(
-            model="meta/llama-3.3-70b-instruct",
-            messages=[
+        content = chat_completion(
+            [
                 {"role": "system", "content": "You are a precise search query generator. Output only a 2-word query. No conversational filler."},
                 {"role": "user", "content": prompt}
             ],
+            call_site="attention.social_query",
             temperature=0.1
         )
-        query = response.choices[0].message.content.strip().replace('"', '').replace('.', '').strip()
+        query = content.strip().replace('"', '').replace('.', '').strip()
         # Enforce length limit
         if len(query.split()) > 3:
             query = " ".join(query.split()[:2])
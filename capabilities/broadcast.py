@@ -0,0 +1,228 @@
+"""
+Broadcast Engine
+Parallel fan-out of one message (or document) to many subscribers within Telegram's and
+Discord's limits. Each platform has its own limiter and its own permanent-error list.
+
+- Global token bucket per platform (Telegram: GLOBAL_RATE msgs/sec, it allows ~30;
+  Discord: DISCORD_GLOBAL_RATE, it allows ~50 requests/sec) shared by every broadcast
+- Per-chat pacing: Telegram at most one message per PER_CHAT_INTERVAL to a private chat,
+  GROUP_CHAT_INTERVAL to a group (negative chat ids); Discord one per
+  DISCORD_CHANNEL_INTERVAL per user/channel (it allows ~5 per 5s)
+- Up to MAX_PARALLEL sends in flight at once
+- 429 RetryAfter / RateLimited pauses ALL sends on that platform for the requested time
+  (flood control is bot-wide), then retries; timeouts / network errors retry with backoff;
+  recipients that blocked the bot or no longer exist are dropped without retrying
+- Documents are uploaded once and re-sent to everyone else by Telegram `file_id`
+- Every broadcast logs and returns its delivery throughput
+"""
+
+import time
+import random
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+try:
+    from telegram.error import Forbidden, RetryAfter, BadRequest
+except ImportError:  # Discord-only deployments
+    Forbidden = RetryAfter = BadRequest = None
+
+try:
+    from discord import Forbidden as DiscordForbidden, NotFound as DiscordNotFound, RateLimited as DiscordRateLimited
+except ImportError:  # Telegram-only deployments
+    DiscordForbidden = DiscordNotFound = DiscordRateLimited = None
+
+GLOBAL_RATE = 25.0
+GLOBAL_BURST = 25
+PER_CHAT_INTERVAL = 1.0
+GROUP_CHAT_INTERVAL = 3.0
+DISCORD_GLOBAL_RATE = 40.0
+DISCORD_GLOBAL_BURST = 40
+DISCORD_CHANNEL_INTERVAL = 1.0
+MAX_PARALLEL = 20
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 1.0
+
+
+class RateLimiter:
+    """Async token bucket plus per-chat pacing and a global flood-control pause."""
+
+    def __init__(self, rate: float = GLOBAL_RATE, burst: int = GLOBAL_BURST,
+                 chat_interval: float = PER_CHAT_INTERVAL, group_interval: float = GROUP_CHAT_INTERVAL):
+        self.rate = rate
+        self.burst = burst
+        self.chat_interval = chat_interval
+        self.group_interval = group_interval
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._chat_next: Dict[object, float] = {}
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self, chat_id):
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                wait = max(self._paused_until - now, self._chat_next.get(chat_id, 0) - now)
+                if wait <= 0 and self._tokens >= 1:
+                    self._tokens -= 1
+                    interval = self.group_interval if _is_group(chat_id) else self.chat_interval
+                    self._chat_next[chat_id] = now + interval
+                    return
+                if wait <= 0:
+                    wait = (1 - self._tokens) / self.rate
+            await asyncio.sleep(wait)
+
+
+# platform -> (msgs/sec, burst, private chat interval, group interval)
+PLATFORM_LIMITS = {
+    "telegram": (GLOBAL_RATE, GLOBAL_BURST, PER_CHAT_INTERVAL, GROUP_CHAT_INTERVAL),
+    "discord": (DISCORD_GLOBAL_RATE, DISCORD_GLOBAL_BURST, DISCORD_CHANNEL_INTERVAL, DISCORD_CHANNEL_INTERVAL),
+}
+
+_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_limiter(platform: str = "telegram") -> RateLimiter:
+    # Created lazily so it binds to the running event loop
+    if platform not in _limiters:
+        _limiters[platform] = RateLimiter(*PLATFORM_LIMITS[platform])
+    return _limiters[platform]
+
+
+def _is_group(chat_id) -> bool:
+    try:
+        return int(chat_id) < 0
+    except (TypeError, ValueError):
+        return False
+
+
+def _retry_after(error: Exception):
+    for cls in (RetryAfter, DiscordRateLimited):
+        if cls is not None and isinstance(error, cls):
+            retry_after = error.retry_after
+            return retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else float(retry_after)
+    return None
+
+
+# Errors that will fail the same way on retry
+PERMANENT_ERRORS = {
+    "telegram": (Forbidden, BadRequest),            # bot blocked, chat gone, bad markup
+    "discord": (DiscordForbidden, DiscordNotFound),  # DMs closed / no access, user or channel gone
+}
+
+
+def _is_permanent(error: Exception, platform: str = "telegram") -> bool:
+    return any(cls is not None and isinstance(error, cls) for cls in PERMANENT_ERRORS[platform])
+
+
+async def broadcast(chat_ids: Iterable, send: Callable[[object], Awaitable], label: str = "broadcast",
+                    platform: str = "telegram") -> Dict:
+    """
+    Calls `await send(chat_id)` for every chat in parallel under `platform`'s rate limits.
+    Returns delivery stats: sent, failed, retries, elapsed seconds, msgs/sec and failed chat ids.
+    """
+    chat_ids = list(dict.fromkeys(chat_ids))
+    limiter = get_limiter(platform)
+    semaphore = asyncio.Semaphore(MAX_PARALLEL)
+    stats = {"sent": 0, "failed": 0, "retries": 0, "failed_chats": []}
+    started = time.monotonic()
+
+    async def deliver(chat_id):
+        async with semaphore:
+            for attempt in range(MAX_ATTEMPTS):
+                await limiter.acquire(chat_id)
+                try:
+                    await send(chat_id)
+                    stats["sent"] += 1
+                    return
+                except Exception as e:
+                    retry_after = _retry_after(e)
+                    if retry_after is not None:
+                        logger.warning(f"{label}: flood control, pausing all sends for {retry_after:.0f}s")
+                        limiter.pause(retry_after + 0.5)
+                    elif _is_permanent(e, platform) or attempt == MAX_ATTEMPTS - 1:
+                        logger.error(f"{label}: failed to deliver to {chat_id}: {e}")
+                        stats["failed"] += 1
+                        stats["failed_chats"].append(chat_id)
+                        return
+                    else:
+                        await asyncio.sleep(BACKOFF_BASE * (2 ** attempt) + random.uniform(0, 0.5))
+                    stats["retries"] += 1
+            stats["failed"] += 1
+            stats["failed_chats"].append(chat_id)
+
+    await asyncio.gather(*(deliver(c) for c in chat_ids))
+
+    elapsed = time.monotonic() - started
+    stats["elapsed"] = round(elapsed, 2)
+    stats["rate"] = round(stats["sent"] / elapsed, 1) if elapsed > 0 else float(stats["sent"])
+    logger.info(
+        f"{label}: delivered {stats['sent']}/{len(chat_ids)} in {stats['elapsed']}s "
+        f"({stats['rate']} msg/s, {stats['retries']} retries, {stats['failed']} failed)"
+    )
+    return stats
+
+
+async def broadcast_message(bot, chat_ids: Iterable, text: str, parse_mode: str = None, label: str = "message broadcast") -> Dict:
+    """Sends the same text message to every chat. Bots with a `platform` attribute (the
+    Discord adapter) get that platform's limits; anything else is treated as Telegram."""
+    async def send(chat_id):
+        await bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+    return await broadcast(chat_ids, send, label, platform=getattr(bot, "platform", "telegram"))
+
+
+async def broadcast_document(bot, chat_ids: Iterable, path: str, filename: str = None, caption: str = None,
+                             parse_mode: str = None, label: str = "document broadcast") -> Dict:
+    """
+    Sends a document to every chat. The file is uploaded to the first chat that accepts
+    it and then re-sent to the rest by its Telegram file_id (no re-upload).
+    """
+    chat_ids = list(dict.fromkeys(chat_ids))
+    file_id = None
+    uploaded_to, rejected = [], []
+
+    # Upload once, trying subscribers in order until one succeeds
+    for chat_id in chat_ids:
+        await get_limiter().acquire(chat_id)
+        try:
+            with open(path, "rb") as document:
+                message = await bot.send_document(
+                    chat_id=chat_id, document=document, filename=filename,
+                    caption=caption, parse_mode=parse_mode
+                )
+            uploaded_to.append(chat_id)
+            file_id = message.document.file_id if getattr(message, "document", None) else None
+            break
+        except Exception as e:
+            retry_after = _retry_after(e)
+            if retry_after is not None:
+                get_limiter().pause(retry_after + 0.5)
+            logger.error(f"{label}: upload to {chat_id} failed: {e}")
+            if _is_permanent(e):
+                rejected.append(chat_id)
+            elif retry_after is None:
+                break  # network trouble: let the fan-out retry everyone
+
+    remaining = [c for c in chat_ids if c not in uploaded_to and c not in rejected]
+
+    async def send(chat_id):
+        if file_id:
+            await bot.send_document(chat_id=chat_id, document=file_id, caption=caption, parse_mode=parse_mode)
+        else:
+            with open(path, "rb") as document:
+                await bot.send_document(chat_id=chat_id, document=document, filename=filename,
+                                        caption=caption, parse_mode=parse_mode)
+
+    stats = await broadcast(remaining, send, label)
+    stats["sent"] += len(uploaded_to)
+    stats["failed"] += len(rejected)
+    stats["failed_chats"] += rejected
+    return stats
@@ -0,0 +1,138 @@
+"""
+Pre-Open Cache Warmer
+Fills the lookup caches at WARM_CRON (08:30 IST on trading days) so the 09:00-09:15 rush is
+served hot instead of every query starting cold with symbol search + yfinance calls.
+
+Warmed, in parallel:
+- symbol resolution (`search_symbol`) for every name users asked about in the last week
+- quotes + fundamentals (`get_market_data`) and technical indicators (`get_indicators`) for
+  Nifty 50, every SECTOR_MAP and GEO_SENSITIVE_STOCKS name, the dashboard symbols and the
+  symbols users queried in the last week
+
+Indian prices don't move before the 09:15 open, so Indian symbols are cached until then;
+global symbols keep their normal TTL. The caches are in-process, so the warmer runs in
+each bot process (not in the core service).
+"""
+
+import time
+import logging
+import concurrent.futures
+from typing import List
+
+from capabilities import state_store
+from capabilities.market_session import is_trading_day, seconds_until_session_change, session_name
+from capabilities.daily_report import get_ist_now
+
+logger = logging.getLogger(__name__)
+
+WARM_CRON = "30 8 * * 0-4"       # Mon-Fri (weekday 0 = Monday)
+WARM_CATCH_UP = 40 * 60          # a bot started before 09:10 still warms up
+WARM_WORKERS = 8
+QUERY_LOOKBACK = 7 * 24 * 3600
+MAX_USER_SYMBOLS = 200
+
+NIFTY_50 = [
+    "ADANIENT", "ADANIPORTS", "APOLLOHOSP", "ASIANPAINT", "AXISBANK", "BAJAJ-AUTO", "BAJFINANCE",
+    "BAJAJFINSV", "BEL", "BHARTIARTL", "CIPLA", "COALINDIA", "DRREDDY", "EICHERMOT", "ETERNAL",
+    "GRASIM", "HCLTECH", "HDFCBANK", "HDFCLIFE", "HEROMOTOCO", "HINDALCO", "HINDUNILVR",
+    "ICICIBANK", "INDUSINDBK", "INFY", "ITC", "JIOFIN", "JSWSTEEL", "KOTAKBANK", "LT", "M&M",
+    "MARUTI", "NESTLEIND", "NTPC", "ONGC", "POWERGRID", "RELIANCE", "SBILIFE", "SBIN",
+    "SHRIRAMFIN", "SUNPHARMA", "TATACONSUM", "TATAMOTORS", "TATASTEEL", "TCS", "TECHM", "TITAN",
+    "TRENT", "ULTRACEMCO", "WIPRO",
+]
+
+
+def is_indian_symbol(symbol: str) -> bool:
+    return symbol.endswith((".NS", ".BO")) or symbol in ("^NSEI", "^NSEBANK", "^BSESN", "^INDIAVIX")
+
+
+def record_asset_query(asset: str):
+    """Resolves a user's asset and remembers the symbol for tomorrow's warm-up."""
+    from providers.yahoo import search_symbol
+
+    if not asset:
+        return
+    try:
+        symbol = search_symbol(asset)
+        if symbol:
+            state_store.record_symbol_query(symbol, asset)
+    except Exception as e:
+        logger.debug(f"Could not record asset query {asset!r}: {e}")
+
+
+def warm_symbols() -> List[str]:
+    """Every symbol the warm-up covers, de-duplicated, static lists first."""
+    from capabilities.sector_scanner import SECTOR_MAP
+    from capabilities.geo_impact import GEO_SENSITIVE_STOCKS
+    from providers import market_dashboard as md
+
+    symbols = [f"{s}.NS" for s in NIFTY_50]
+    for group in SECTOR_MAP.values():
+        symbols += group
+    for group in GEO_SENSITIVE_STOCKS.values():
+        symbols += [symbol for _, symbol in group]
+    for group in (md.US_MARKETS, md.ASIAN_MARKETS, md.EUROPEAN_MARKETS, md.COMMODITIES,
+                  md.CURRENCIES, md.INDIA_INDICES, md.INDIAN_ADRS, [md.INDIA_VIX]):
+        symbols += [symbol for symbol, _ in group]
+    try:
+        recent = state_store.recent_symbol_queries(time.time() - QUERY_LOOKBACK)
+        symbols += [symbol for symbol, _ in recent[:MAX_USER_SYMBOLS]]
+    except Exception as e:
+        logger.warning(f"Could not load recently queried symbols: {e}")
+    return list(dict.fromkeys(symbols))
+
+
+def warm_caches() -> dict:
+    """Warm-up stage; returns counts of what was warmed."""
+    from providers.yahoo import get_market_data, search_symbol
+    from capabilities.indicators.basic import get_indicators
+
+    now = get_ist_now()
+    if not is_trading_day(now.date()):
+        logger.info("Cache warmer: not a trading day, skipping")
+        return {}
+
+    started = time.monotonic()
+    # Indian prices are frozen until the open, so keep them until the session changes
+    until_open = seconds_until_session_change(now) + 60 if session_name(now) in ("overnight", "pre_open") else None
+    stats = {"names": 0, "quotes": 0, "indicators": 0, "failed": 0}
+
+    def warm_symbol(symbol: str):
+        ttl = until_open if until_open and is_indian_symbol(symbol) else None
+        quote = get_market_data.refresh(symbol, ttl)
+        indicators = get_indicators.refresh(symbol, ttl) if is_indian_symbol(symbol) else None
+        return quote is not None, indicators is not None
+
+    try:
+        recent_names = [q for _, q in state_store.recent_symbol_queries(time.time() - QUERY_LOOKBACK)]
+    except Exception:
+        recent_names = []
+    symbols = warm_symbols()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=WARM_WORKERS, thread_name_prefix="warm") as executor:
+        # Symbol resolution: the exact names users typed (24h cache)
+        for resolved in executor.map(search_symbol, recent_names[:MAX_USER_SYMBOLS]):
+            stats["names"] += 1 if resolved else 0
+        futures = [executor.submit(warm_symbol, s) for s in symbols]
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                quote_ok, ind_ok = future.result()
+                stats["quotes"] += quote_ok
+                stats["indicators"] += ind_ok
+                stats["failed"] += not quote_ok
+            except Exception:
+                stats["failed"] += 1
+
+    stats["elapsed"] = round(time.monotonic() - started, 1)
+    logger.info(
+        f"Cache warmer: {stats['quotes']}/{len(symbols)} quotes, {stats['indicators']} indicator sets, "
+        f"{stats['names']} names resolved in {stats['elapsed']}s ({stats['failed']} failed)"
+    )
+    return stats
+
+
+def register_cache_warmer_job(job_scheduler):
+    return job_scheduler.add_cron(
+        "cache_warmer", warm_caches, WARM_CRON,
+        jitter=60, catch_up=WARM_CATCH_UP
+    )
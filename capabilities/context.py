@@ -1,11 +1,5 @@
-from openai import OpenAI
-from config import NVIDIA_API_KEY
 from providers.yahoo import search_symbol
-
-client = OpenAI(
-    base_url="https://integrate.api.nvidia.com/v1",
-    api_key=NVIDIA_API_KEY
-)
+from providers.llm_gateway import chat_completion
 
 SYSTEM_PROMPT = """
 You are a financial reference assistant.
@@ -40,14 +34,13 @@ def get_asset_context(asset_query: str) -> dict | None:
     )
 
     try:
-        response = client.chat.completions.create(
-            model="meta/llama-3.3-70b-instruct",
-            messages=[
+        content = chat_completion(
+            [
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            call_site="context.asset_context"
         )
-        content = response.choices[0].message.content if response and response.choices else None
     except Exception:
         content = None
 
@@ -0,0 +1,256 @@
+"""
+Core Service IPC
+Local channel between the core engine (core_service.py) and the bot frontends.
+
+The core runs breaking-news ingestion/triage and daily report generation ONCE and
+publishes the results; the Telegram and Discord frontends subscribe and only deliver
+them to their own subscribers.
+
+- Transport: newline-delimited JSON over TCP on 127.0.0.1:CORE_PORT
+- Handshake: both sides prove they know the shared secret (HMAC over the other side's
+  nonce), so a process that grabs the port can neither feed the bots events nor listen in:
+    client -> core: {"type": "hello", "channel": "telegram" | "discord", "nonce": ...}
+    core -> client: {"type": "welcome", "nonce": ..., "proof": HMAC("core:" + client nonce)}
+    client -> core: {"type": "auth", "proof": HMAC("frontend:" + core nonce)}
+  The secret is CORE_IPC_SECRET from config.py, or else data/core_ipc.key (created 0600 by
+  whichever process starts first)
+- Core -> clients:
+    {"type": "breaking_alert", "text": ...}
+    {"type": "daily_report", "date": "YYYY-MM-DD"}
+  Only the date is sent; frontends resolve the file under REPORTS_DIR themselves.
+  The last event of each STICKY_EVENTS type is replayed to clients when they connect,
+  so a frontend restarted after 08:50 still delivers that day's report once
+- A frontend that cannot reach the core at startup runs the engine embedded (the old
+  standalone behaviour); one that loses the core retries for CORE_FALLBACK_AFTER
+  seconds before doing the same. Either way it keeps looking for the core every
+  EMBEDDED_RETRY_INTERVAL and stops its embedded engine once the core is back
+"""
+
+import os
+import hmac
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import secrets
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CORE_HOST = "127.0.0.1"
+CORE_PORT = 8765
+CORE_FALLBACK_AFTER = 120   # seconds without the core before a frontend goes embedded
+RECONNECT_DELAY = 5
+EMBEDDED_RETRY_INTERVAL = 30  # seconds between looks for the core while running embedded
+HANDSHAKE_TIMEOUT = 10
+STICKY_EVENTS = {"daily_report"}
+SECRET_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "core_ipc.key")
+
+
+class HandshakeError(Exception):
+    """The other end of the IPC connection does not know the shared secret."""
+
+
+def load_secret() -> bytes:
+    try:
+        from config import CORE_IPC_SECRET
+        return CORE_IPC_SECRET.encode("utf-8")
+    except ImportError:
+        pass
+    try:
+        os.makedirs(os.path.dirname(SECRET_FILE), exist_ok=True)
+        fd = os.open(SECRET_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_hex(32))
+    except FileExistsError:
+        pass
+    with open(SECRET_FILE, "r") as f:
+        return f.read().strip().encode("utf-8")
+
+
+def _proof(secret: bytes, role: str, nonce) -> str:
+    return hmac.new(secret, f"{role}:{nonce}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def _line(message: dict) -> bytes:
+    return (json.dumps(message) + "\n").encode("utf-8")
+
+
+async def _read_message(reader: asyncio.StreamReader) -> dict:
+    line = await asyncio.wait_for(reader.readline(), HANDSHAKE_TIMEOUT)
+    try:
+        message = json.loads(line or b"{}")
+    except ValueError:
+        raise HandshakeError("malformed handshake message")
+    return message if isinstance(message, dict) else {}
+
+
+class CoreHub:
+    """Core side: accepts frontend connections and fans every published event out to them."""
+
+    def __init__(self, host: str = CORE_HOST, port: int = CORE_PORT, secret: bytes = None):
+        self.host = host
+        self.port = port
+        self.secret = secret or load_secret()
+        self._clients: Dict[asyncio.StreamWriter, str] = {}
+        self._sticky: Dict[str, dict] = {}
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        logger.info(f"Core service listening on {self.host}:{self.port}")
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def publish(self, event: dict):
+        event = dict(event, ts=round(time.time(), 1))
+        if event["type"] in STICKY_EVENTS:
+            self._sticky[event["type"]] = event
+        line = _line(event)
+        for writer, channel in list(self._clients.items()):
+            try:
+                writer.write(line)
+                await writer.drain()
+            except Exception as e:
+                logger.warning(f"Dropping {channel} frontend: {e}")
+                self._drop(writer)
+        logger.info(f"Published {event['type']} to {len(self._clients)} frontend(s)")
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            hello = await _read_message(reader)
+            nonce = secrets.token_hex(16)
+            writer.write(_line({"type": "welcome", "nonce": nonce,
+                                "proof": _proof(self.secret, "core", hello.get("nonce", ""))}))
+            await writer.drain()
+            auth = await _read_message(reader)
+            if not hmac.compare_digest(str(auth.get("proof", "")), _proof(self.secret, "frontend", nonce)):
+                raise HandshakeError("frontend failed authentication")
+            channel = hello.get("channel") or "unknown"
+            self._clients[writer] = channel
+            logger.info(f"Frontend connected: {channel}")
+            for event in self._sticky.values():
+                writer.write(_line(event))
+            await writer.drain()
+            # Frontends only listen; reading until EOF detects the disconnect
+            while await reader.readline():
+                pass
+        except Exception as e:
+            logger.warning(f"Frontend connection error: {e}")
+        finally:
+            self._drop(writer)
+
+    def _drop(self, writer: asyncio.StreamWriter):
+        channel = self._clients.pop(writer, None)
+        if channel:
+            logger.info(f"Frontend disconnected: {channel}")
+        try:
+            writer.close()
+        except Exception:
+            pass
+
+
+class EmbeddedEngine:
+    """The engine jobs a frontend runs itself while the core service is unreachable."""
+
+    def __init__(self, job_scheduler, register: Callable[[], None]):
+        self.job_scheduler = job_scheduler
+        self.register = register
+        self.jobs = []
+
+    def start(self):
+        if self.jobs:
+            return
+        before = set(self.job_scheduler.jobs)
+        self.register()
+        self.jobs = [name for name in self.job_scheduler.jobs if name not in before]
+
+    def stop(self):
+        for name in self.jobs:
+            self.job_scheduler.remove(name)
+        if self.jobs:
+            logger.info(f"Embedded engine stopped ({', '.join(self.jobs)})")
+        self.jobs = []
+
+
+async def _connect(host: str, port: int, channel: str, secret: bytes):
+    """Opens an authenticated connection to the core, or returns None."""
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        return None
+    try:
+        nonce = secrets.token_hex(16)
+        writer.write(_line({"type": "hello", "channel": channel, "nonce": nonce}))
+        await writer.drain()
+        welcome = await _read_message(reader)
+        if welcome.get("type") != "welcome" or not hmac.compare_digest(
+                str(welcome.get("proof", "")), _proof(secret, "core", nonce)):
+            raise HandshakeError("core failed authentication")
+        writer.write(_line({"type": "auth", "proof": _proof(secret, "frontend", welcome.get("nonce", ""))}))
+        await writer.drain()
+        return reader, writer
+    except (OSError, HandshakeError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+        logger.error(f"Rejected the process on {host}:{port} as core service: {e}")
+        writer.close()
+        return None
+
+
+async def run_core_client(channel: str, handlers: Dict[str, Callable[[dict], Awaitable]],
+                          on_unavailable: Callable[[], None],
+                          on_available: Optional[Callable[[], None]] = None,
+                          host: str = CORE_HOST, port: int = CORE_PORT, secret: bytes = None):
+    """
+    Frontend side: receives core events and awaits `handlers[event["type"]](event)`.
+    Calls `on_unavailable()` (start the embedded engine) if the core is not running at
+    startup, or stays unreachable for CORE_FALLBACK_AFTER seconds later on, and keeps
+    looking for it; `on_available()` (stop the embedded engine) runs once it is back.
+    """
+    secret = secret or load_secret()
+    connected_once = False
+    embedded = False
+    lost_since = time.monotonic()
+    while True:
+        connection = await _connect(host, port, channel, secret)
+        if connection is None:
+            if not embedded and (not connected_once or time.monotonic() - lost_since >= CORE_FALLBACK_AFTER):
+                logger.warning(f"Core service not reachable on {host}:{port}; running the engine embedded.")
+                on_unavailable()
+                embedded = True
+            await asyncio.sleep(EMBEDDED_RETRY_INTERVAL if embedded else RECONNECT_DELAY)
+            continue
+
+        reader, writer = connection
+        connected_once = True
+        logger.info(f"Connected to core service as {channel} frontend.")
+        if embedded:
+            logger.info("Core service is back; stopping the embedded engine.")
+            if on_available:
+                on_available()
+            embedded = False
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                handler = handlers.get(event.get("type"))
+                if handler:
+                    try:
+                        await handler(event)
+                    except Exception as e:
+                        logger.error(f"Error handling core event {event.get('type')}: {e}")
+        except (OSError, asyncio.IncompleteReadError) as e:
+            logger.warning(f"Core service connection error: {e}")
+        finally:
+            writer.close()
+        logger.warning("Lost connection to core service; reconnecting...")
+        lost_since = time.monotonic()
+        await asyncio.sleep(RECONNECT_DELAY)
@@ -1,25 +1,21 @@
 import os
-import json
 import logging
 from datetime import datetime, timedelta
 import feedparser
 import requests
 import pytz
-from openai import OpenAI
-from config import NVIDIA_API_KEY, GNEWS_API_KEY
+from config import GNEWS_API_KEY
+from providers.llm_gateway import chat_completion, MAX_CONCURRENT_REQUESTS, RESERVED_PRIORITY_SLOTS
+from capabilities.prompt_packer import Section, count_tokens, pack_sections
+from capabilities import state_store
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client with NVIDIA endpoints as configured in agent.py
-client = OpenAI(
-    base_url="https://integrate.api.nvidia.com/v1",
-    api_key=NVIDIA_API_KEY
-)
-MODEL = "meta/llama-3.3-70b-instruct"
-
 # Directory to save the reports
 REPORTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "reports")
-SUBSCRIBERS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "subscribers.json")
+# Subscribers and scheduler state live in the SQLite state store (capabilities/state_store.py).
+# The Discord bot sets SUBSCRIBER_CHANNEL = "discord" to keep its subscribers separate.
+SUBSCRIBER_CHANNEL = "telegram"
 
 def fetch_rss_news(feed_url: str, limit: int = 10) -> list[dict]:
     """Fetch and parse news from a given RSS feed URL."""
@@ -48,30 +44,52 @@ def fetch_rss_news(feed_url: str, limit: int = 10) -> list[dict]:
         logger.error(f"Error fetching RSS feed {feed_url}: {e}")
         return []
 
+TENDER_NEWS_WINDOWS = ["24h", "48h", "3d"]
+
+# Prompt token budget for the daily analysis call (instructions + data). The 70B model
+# reads ~12k-token prompts far faster and more faithfully than 25k+ ones.
+REPORT_PROMPT_BUDGET = 12000
+
+# Body of the placeholder report published when no news could be fetched
+EMPTY_REPORT_NOTE = "Could not fetch any news events for today."
+
+# Map-reduce stage: articles are digested per category in parallel before the merge call
+MAP_BATCH_SIZE = 20          # articles per map call (large categories are split)
+MAP_MAX_ARTICLES = 200       # coverage cap across all categories
+MAP_PROMPT_BUDGET = 5000
+MAP_MAX_TOKENS = 700
+MAP_WORKERS = MAX_CONCURRENT_REQUESTS - RESERVED_PRIORITY_SLOTS  # gateway slots open to non-priority work
+
 def fetch_tender_news_with_fallback(query_base: str, limit: int = 10) -> list[dict]:
-    """Fetch tender/funding news from Google News RSS with a fall-back cascade (24h -> 48h -> 3d)."""
-    # 1. Try last 24 hours
-    query_24h = f"({query_base}) when:24h"
-    url_24h = f"https://news.google.com/rss/search?q={query_24h.replace(' ', '+')}&hl=en-IN&gl=IN&ceid=IN:en"
-    logger.info(f"Fetching tender/funding news (24h) for query: {query_base}")
-    articles = fetch_rss_news(url_24h, limit=limit)
-    if articles:
-        return articles
-    
-    # 2. Try last 48 hours
-    query_48h = f"({query_base}) when:48h"
-    url_48h = f"https://news.google.com/rss/search?q={query_48h.replace(' ', '+')}&hl=en-IN&gl=IN&ceid=IN:en"
-    logger.info(f"No 24h results. Fetching tender/funding news (48h) for query: {query_base}")
-    articles = fetch_rss_news(url_48h, limit=limit)
-    if articles:
-        return articles
+    """Fetch tender/funding news from Google News RSS across the 24h / 48h / 3d windows.
 
-    # 3. Try last 3 days
-    query_3d = f"({query_base}) when:3d"
-    url_3d = f"https://news.google.com/rss/search?q={query_3d.replace(' ', '+')}&hl=en-IN&gl=IN&ceid=IN:en"
-    logger.info(f"No 48h results. Fetching tender/funding news (3d) for query: {query_base}")
-    articles = fetch_rss_news(url_3d, limit=limit)
-    return articles
+    All windows are fetched speculatively in parallel and the narrowest window that
+    returned results wins, so a quiet day costs one round-trip instead of three.
+    """
+    import concurrent.futures
+
+    urls = {}
+    for window in TENDER_NEWS_WINDOWS:
+        query = f"({query_base}) when:{window}"
+        urls[window] = f"https://news.google.com/rss/search?q={query.replace(' ', '+')}&hl=en-IN&gl=IN&ceid=IN:en"
+
+    logger.info(f"Fetching tender/funding news ({'/'.join(TENDER_NEWS_WINDOWS)} in parallel) for query: {query_base}")
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(urls))
+    futures = {window: executor.submit(fetch_rss_news, url, limit) for window, url in urls.items()}
+    try:
+        for window in TENDER_NEWS_WINDOWS:
+            try:
+                articles = futures[window].result()
+            except Exception:
+                articles = []
+            if articles:
+                if window != TENDER_NEWS_WINDOWS[0]:
+                    logger.info(f"No narrower tender/funding results. Using {window} window for query: {query_base}")
+                return articles
+        return []
+    finally:
+        # Return as soon as a window wins; wider fetches still running are abandoned
+        executor.shutdown(wait=False, cancel_futures=True)
 
 def get_combined_daily_news() -> list[dict]:
     """
@@ -96,65 +114,147 @@ def get_combined_daily_news() -> list[dict]:
                 item["category"] = category
                 news_items.append(item)
 
-    # Run all fetches in parallel
-    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+    in_rss = "https://news.google.com/rss/headlines/section/topic/BUSINESS?hl=en-IN&gl=IN&ceid=IN:en"
+    global_rss = "https://news.google.com/rss/headlines/section/topic/BUSINESS?hl=en-US&gl=US&ceid=US:en"
+    tender_query = '"government tender" OR "government contract" OR "defense order" OR "railway contract" OR "cabinet approval"'
+    funding_query = '"government funding" OR "government grant" OR "PLI scheme" OR "government subsidy"'
+
+    # Run all fetches in parallel — enhanced sources, Google News business headlines
+    # (always run as fallback/supplement) and the government tender/funding searches
+    with concurrent.futures.ThreadPoolExecutor(max_workers=12) as executor:
+        futures = {}
         try:
             from providers.enhanced_rss import fetch_india_market_news, fetch_global_and_geo_news, fetch_regulatory_news
             from providers.economic_calendar import fetch_economic_calendar_news
             from providers.bse_announcements import fetch_latest_bse_announcements
             from providers.eprocure_scraper import fetch_eprocure_tenders
 
-            futures = {
+            futures.update({
                 executor.submit(fetch_india_market_news, 4, 30): ("India", "Premium India Finance News"),
                 executor.submit(fetch_global_and_geo_news, 3, 20): ("Global", "Global Finance & Geo News"),
                 executor.submit(fetch_regulatory_news, 5): ("India", "RBI / SEBI / NSE Regulatory"),
                 executor.submit(fetch_economic_calendar_news, 4): ("Global", "Economic Calendar Events"),
                 executor.submit(fetch_latest_bse_announcements, 15): ("India", "BSE Corporate Announcements"),
                 executor.submit(fetch_eprocure_tenders, 15): ("India", "Government eProcure Tenders"),
-            }
-            for future, (region, category) in futures.items():
-                try:
-                    articles = future.result(timeout=30)
-                    tag_and_add(articles, region, category)
-                except Exception as e:
-                    logger.warning(f"Enhanced source failed: {e}")
+            })
         except ImportError as e:
             logger.warning(f"Enhanced providers not available: {e}")
 
-    # Fallback / supplement: original Google News sources (always run)
-    logger.info("Fetching Google News fallback sources...")
-    in_rss = "https://news.google.com/rss/headlines/section/topic/BUSINESS?hl=en-IN&gl=IN&ceid=IN:en"
-    global_rss = "https://news.google.com/rss/headlines/section/topic/BUSINESS?hl=en-US&gl=US&ceid=US:en"
-    in_news = fetch_rss_news(in_rss, limit=8)
-    global_news = fetch_rss_news(global_rss, limit=8)
-    tag_and_add(in_news, "India", "General Business")
-    tag_and_add(global_news, "Global", "General Business")
+        logger.info("Fetching Google News business and tender/funding sources...")
+        futures.update({
+            executor.submit(fetch_rss_news, in_rss, 8): ("India", "General Business"),
+            executor.submit(fetch_rss_news, global_rss, 8): ("Global", "General Business"),
+            executor.submit(fetch_tender_news_with_fallback, tender_query, 8): ("India", "Government Tenders & Contracts"),
+            executor.submit(fetch_tender_news_with_fallback, funding_query, 8): ("India", "Government Tenders & Contracts"),
+        })
 
-    # Government tenders (preserved from original)
-    tender_query = '"government tender" OR "government contract" OR "defense order" OR "railway contract" OR "cabinet approval"'
-    funding_query = '"government funding" OR "government grant" OR "PLI scheme" OR "government subsidy"'
-    tender_news = fetch_tender_news_with_fallback(tender_query, limit=8)
-    funding_news = fetch_tender_news_with_fallback(funding_query, limit=8)
-    tag_and_add(tender_news + funding_news, "India", "Government Tenders & Contracts")
+        # Collect in submission order so the dedupe keeps the same source priority as before
+        for future, (region, category) in futures.items():
+            try:
+                articles = future.result(timeout=30)
+                tag_and_add(articles, region, category)
+            except Exception as e:
+                logger.warning(f"News source failed ({category}): {e}")
 
     logger.info(f"Total news items collected: {len(news_items)}")
     return news_items
 
 
-def analyze_news_impact_via_llm(news_data: list[dict], nse_data: dict = None, dashboard_text: str = "", options_text: str = "") -> str:
-    """Uses LLM to analyze the impact of news + institutional data on stocks and ETFs."""
+def format_article(idx: int, item: dict) -> tuple[str, str]:
+    """Returns the (full, headline-only) prompt forms of one article."""
+    summary = item.get('deep_content') or item.get('description') or ''
+    header = f"[{idx}] [{item.get('region','?')}] [{item.get('category','General')}]\n"
+    footer = f"Source: {item.get('source', 'Unknown')} | {(item.get('published_at') or '')[:10]}"
+    full = (
+        f"{header}"
+        f"Title: {item.get('title', 'No Title')}\n"
+        f"Summary: {summary[:500]}\n"
+        f"{footer}"
+    )
+    return full, f"{header}Title: {item.get('title', 'No Title')}\n{footer}"
+
+
+def summarize_news_batch(category: str, batch: list[tuple[int, dict]]) -> str:
+    """Map step: extracts the market-relevant facts from one batch of same-category articles."""
+    formatted = [format_article(idx, item) for idx, item in batch]
+    instructions = (
+        f"Category: {category}\n\n"
+        "Extract every concrete, market-relevant fact from the articles below. Output ONLY markdown bullets, one per fact:\n"
+        "- <Stock/ETF or sector> (<NSE symbol if stated or well known>) — <catalyst with its numbers: order size, %, ₹ Cr, dates> — <Source> [article #] — <Bullish/Bearish/Neutral>\n"
+        "Always include government contracts, tenders, defense/railway orders, PLI schemes, funding and cabinet approvals. "
+        "Skip articles with no market relevance. Use only what the articles say. No preamble, no conclusions.\n\n"
+    )
+    packed = pack_sections(
+        [Section("articles", items=[f for f, _ in formatted], compact_items=[c for _, c in formatted])],
+        budget=MAP_PROMPT_BUDGET,
+        reserved=count_tokens(instructions),
+        label=f"news digest ({category})",
+    )
+    return chat_completion(
+        [
+            {"role": "system", "content": "You are a meticulous financial news analyst. Extract facts; never invent them."},
+            {"role": "user", "content": instructions + packed["articles"]}
+        ],
+        call_site="daily_report.map",
+        max_tokens=MAP_MAX_TOKENS,
+    ).strip()
 
-    # Format news articles
-    formatted_news = []
-    for idx, item in enumerate(news_data[:50], start=1):  # Cap at 50 to control token count
-        summary = item.get('deep_content') or item.get('description') or ''
-        formatted_news.append(
-            f"[{idx}] [{item.get('region','?')}] [{item.get('category','General')}]\n"
-            f"Title: {item.get('title', 'No Title')}\n"
-            f"Summary: {summary[:500]}\n"
-            f"Source: {item.get('source', 'Unknown')} | {(item.get('published_at') or '')[:10]}"
-        )
-    news_context = "\n\n".join(formatted_news)
+
+def summarize_news_by_category(news_data: list[dict]) -> dict:
+    """
+    Map stage of the daily report: digests articles per category (from `tag_and_add`)
+    in parallel batches. Returns {category: digest}; categories whose calls all failed
+    are left out. Article numbers in the digests index into `news_data`.
+    """
+    import concurrent.futures
+
+    batches = []
+    by_category = {}
+    for idx, item in enumerate(news_data[:MAP_MAX_ARTICLES], start=1):
+        by_category.setdefault(item.get("category") or "General", []).append((idx, item))
+    for category, items in by_category.items():
+        for start in range(0, len(items), MAP_BATCH_SIZE):
+            batches.append((category, items[start:start + MAP_BATCH_SIZE]))
+
+    logger.info(f"Digesting {sum(len(b) for _, b in batches)} articles in {len(batches)} parallel batches across {len(by_category)} categories...")
+    parts = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAP_WORKERS) as executor:
+        futures = {executor.submit(summarize_news_batch, category, batch): (order, category)
+                   for order, (category, batch) in enumerate(batches)}
+        for future in concurrent.futures.as_completed(futures):
+            order, category = futures[future]
+            try:
+                digest = future.result()
+                if digest:
+                    parts[order] = (category, digest)
+            except Exception as e:
+                logger.warning(f"News digest failed ({category}): {e}")
+
+    digests = {}
+    for order in sorted(parts):
+        category, digest = parts[order]
+        digests[category] = f"{digests[category]}\n{digest}" if category in digests else digest
+    return digests
+
+
+def analyze_news_impact_via_llm(news_data: list[dict], nse_data: dict = None, dashboard_text: str = "",
+                                options_text: str = "", news_digests: dict = None) -> str:
+    """
+    Uses LLM to analyze the impact of news + institutional data on stocks and ETFs.
+
+    With `news_digests` (from summarize_news_by_category) this is the reduce step: the
+    prompt carries the per-category fact digests instead of raw articles.
+    """
+    if news_digests:
+        news_items = [f"### {category}\n{digest}" for category, digest in news_digests.items()]
+        compact_news = None
+        news_label = f"fact digests of {min(len(news_data), MAP_MAX_ARTICLES)} articles across {len(news_digests)} categories; [n] = article number"
+    else:
+        # Format news articles. Each has a compact (headline-only) form the packer can fall back to.
+        formatted = [format_article(idx, item) for idx, item in enumerate(news_data[:50], start=1)]  # Cap at 50 to control token count
+        news_items = [f for f, _ in formatted]
+        compact_news = [c for _, c in formatted]
+        news_label = f"{len(news_data)} articles from premium sources"
 
     # Format NSE institutional data
     nse_context = ""
@@ -210,7 +310,7 @@ def analyze_news_impact_via_llm(news_data: list[dict], nse_data: dict = None, da
             if lower and isinstance(lower, list):
                 nse_context += f"🔻 LOWER CIRCUIT STOCKS (panic/exit): {', '.join(s.get('symbol','') for s in lower[:6])}\n"
 
-    prompt = (
+    instructions = (
         "You are an ELITE INSTITUTIONAL QUANT & RESEARCH ANALYST whose sole objective is to give the reader an unfair 'smart money' edge before the market opens.\n"
         "You have access to today's news from premium sources (Economic Times, Moneycontrol, Reuters, Bloomberg) and real-time institutional flow data.\n"
         "Your goal is to identify early catalysts, stealthy government contracts, asymmetric bets, and stocks that are about to break out BEFORE the rest of the market prices them in.\n\n"
@@ -234,25 +334,40 @@ def analyze_news_impact_via_llm(news_data: list[dict], nse_data: dict = None, da
         "## 6. ⚡ TODAY'S WATCHLIST (DATA-BACKED ONLY)\n"
         "List stocks to watch today based EXCLUSIVELY on the provided news, institutional data, or ADR performance. For each stock, cite the exact data point supporting it. If no strong data exists, state 'No clear setups today based on the provided data.' DO NOT invent ideas.\n\n"
         "CRITICAL: Write a detailed report. Format as beautiful Markdown. Be specific with stock names and NSE tickers. Add disclaimer at end.\n\n"
-        f"--- PRE-MARKET DASHBOARD ---\n{dashboard_text or 'Not available'}\n\n"
-        f"--- KEY LEVELS & OPTIONS ---\n{options_text or 'Not available'}\n\n"
-        f"--- NSE INSTITUTIONAL DATA ---\n{nse_context or 'Not available today'}\n\n"
-        f"--- NEWS DATA ({len(news_data)} articles from premium sources) ---\n{news_context}\n--- END ---"
+    )
+
+    # Hard numbers are kept whole; news gives way first (summaries, then the tail articles)
+    packed = pack_sections(
+        [
+            Section("dashboard", dashboard_text or "Not available", priority=0),
+            Section("options", options_text or "Not available", priority=0),
+            Section("nse", nse_context or "Not available today", priority=1, min_tokens=800),
+            Section("news", items=news_items, compact_items=compact_news, priority=2, min_tokens=1500),
+        ],
+        budget=REPORT_PROMPT_BUDGET,
+        reserved=count_tokens(instructions) + 200,
+        label="daily report prompt",
+    )
+    prompt = (
+        instructions +
+        f"--- PRE-MARKET DASHBOARD ---\n{packed['dashboard']}\n\n"
+        f"--- KEY LEVELS & OPTIONS ---\n{packed['options']}\n\n"
+        f"--- NSE INSTITUTIONAL DATA ---\n{packed['nse']}\n\n"
+        f"--- NEWS DATA ({news_label}) ---\n{packed['news']}\n--- END ---"
     )
 
     try:
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
+        content = chat_completion(
+            [
                 {
                     "role": "system",
                     "content": "You are a professional equity research analyst at a top Indian brokerage. Generate a premium, actionable daily market intelligence report based ONLY on the provided news and data. DO NOT hallucinate. DO NOT invent recommendations, stock movements, or catalysts. Stay strictly factual and cite the provided data."
                 },
                 {"role": "user", "content": prompt}
             ],
+            call_site="daily_report.analysis",
             max_tokens=4000,
         )
-        content = response.choices[0].message.content if response and response.choices else None
         if not content:
             return "# Report Generation Issue\nThe LLM returned an empty response. This may be due to high server load. Please try /report again."
         return content
@@ -275,8 +390,7 @@ def generate_daily_report() -> str:
         os.makedirs(REPORTS_DIR, exist_ok=True)
 
     date_str = datetime.now().strftime("%Y-%m-%d")
-    report_filename = f"market_impact_report_{date_str}.md"
-    report_path = os.path.join(REPORTS_DIR, report_filename)
+    report_path = report_path_for(date_str)
 
     logger.info(f"Starting enhanced daily report generation for {date_str}...")
 
@@ -359,9 +473,8 @@ def generate_daily_report() -> str:
                 logger.warning(f"Earnings calendar fetch failed: {e}")
 
     if not news_data:
-        err_msg = f"# Daily Market Impact Report - {date_str}\n\nCould not fetch any news events for today."
-        with open(report_path, "w", encoding="utf-8") as f:
-            f.write(err_msg)
+        err_msg = f"# Daily Market Impact Report - {date_str}\n\n{EMPTY_REPORT_NOTE}"
+        publish_report(report_path, err_msg)
         return report_path
 
     logger.info(f"Total articles fetched: {len(news_data)}. Enhancing with Scrapling deep text...")
@@ -373,10 +486,13 @@ def generate_daily_report() -> str:
 
     logger.info(f"Deep scraping complete. Generating LLM analysis...")
 
-    # Analyze with all data (pass dashboard + options context to LLM)
+    # Map: per-category fact digests in parallel. Reduce: one merge call assembles the report.
+    # If every digest call failed, the merge call falls back to the raw articles.
+    news_digests = summarize_news_by_category(news_data)
     report_content = analyze_news_impact_via_llm(
         news_data, nse_data=nse_data,
-        dashboard_text=dashboard_text, options_text=options_text
+        dashboard_text=dashboard_text, options_text=options_text,
+        news_digests=news_digests
     )
 
     # Format earnings section (pure data, no AI)
@@ -392,6 +508,14 @@ def generate_daily_report() -> str:
             rev_est = e.get('revenue_estimate', 'N/A')
             earnings_section += f"| {symbol} | {date} | {eps_est} | {rev_est} |\n"
 
+    # Economic calendar section (local event store — no network, no AI)
+    calendar_section = ""
+    try:
+        from providers.economic_calendar import format_upcoming_events_text
+        calendar_section = "\n## 🗓️ Economic Calendar (Next 7 Days)\n" + format_upcoming_events_text(7) + "\n"
+    except Exception as e:
+        logger.warning(f"Economic calendar unavailable: {e}")
+
     # Build final report: HARD DATA FIRST, then AI analysis
     source_count = len(set(item.get('source', '') for item in news_data))
     
@@ -413,77 +537,58 @@ def generate_daily_report() -> str:
     if earnings_section:
         final_report += f"{earnings_section}\n"
 
+    if calendar_section:
+        final_report += f"{calendar_section}\n"
+
     final_report += "---\n\n"
 
     # AI analysis sections (grounded in the data above)
     final_report += f"{report_content}\n"
 
-    with open(report_path, "w", encoding="utf-8") as f:
-        f.write(final_report)
+    publish_report(report_path, final_report)
 
     logger.info(f"Enhanced daily report saved to: {report_path}")
     return report_path
 
+def report_path_for(date_str: str) -> str:
+    """Where the report for `date_str` (YYYY-MM-DD) is published."""
+    return os.path.join(REPORTS_DIR, f"market_impact_report_{date_str}.md")
+
+def publish_report(report_path: str, text: str):
+    """Writes the report atomically, so readers never see a half-written file."""
+    tmp_path = f"{report_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, report_path)
+
 def add_subscriber(chat_id: int) -> bool:
     """Adds a chat ID to the subscribers list."""
-    subscribers = load_subscribers()
-    if chat_id not in subscribers:
-        subscribers.append(chat_id)
-        save_subscribers(subscribers)
-        return True
-    return False
+    return state_store.add_subscriber("daily_report", SUBSCRIBER_CHANNEL, chat_id)
 
 def remove_subscriber(chat_id: int) -> bool:
     """Removes a chat ID from the subscribers list."""
-    subscribers = load_subscribers()
-    if chat_id in subscribers:
-        subscribers.remove(chat_id)
-        save_subscribers(subscribers)
-        return True
-    return False
+    return state_store.remove_subscriber("daily_report", SUBSCRIBER_CHANNEL, chat_id)
 
 def load_subscribers() -> list[int]:
-    """Loads subscribers from the JSON file."""
-    if not os.path.exists(SUBSCRIBERS_FILE):
-        os.makedirs(os.path.dirname(SUBSCRIBERS_FILE), exist_ok=True)
-        with open(SUBSCRIBERS_FILE, "w") as f:
-            json.dump({"chat_ids": []}, f)
-        return []
-        
+    """Loads subscribers from the state store."""
     try:
-        with open(SUBSCRIBERS_FILE, "r") as f:
-            data = json.load(f)
-            return data.get("chat_ids", [])
+        return state_store.list_subscribers("daily_report", SUBSCRIBER_CHANNEL)
     except Exception as e:
         logger.error(f"Error loading subscribers: {e}")
         return []
 
-def save_subscribers(subscribers: list[int]):
-    """Saves subscribers to the JSON file."""
-    try:
-        with open(SUBSCRIBERS_FILE, "w") as f:
-            json.dump({"chat_ids": subscribers}, f, indent=4)
-    except Exception as e:
-        logger.error(f"Error saving subscribers: {e}")
-
-STATE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "scheduler_state.json")
-
 def get_last_run_date() -> str:
     """Gets the date of the last successful daily report run."""
-    if os.path.exists(STATE_FILE):
-        try:
-            with open(STATE_FILE, "r") as f:
-                return json.load(f).get("last_run_date", "")
-        except Exception:
-            pass
-    return ""
+    try:
+        return state_store.get_state(f"daily_report.last_run_date.{SUBSCRIBER_CHANNEL}", "")
+    except Exception as e:
+        logger.error(f"Error loading last run date state: {e}")
+        return ""
 
 def save_last_run_date(date_str: str):
     """Saves the date of the last successful daily report run."""
     try:
-        os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
-        with open(STATE_FILE, "w") as f:
-            json.dump({"last_run_date": date_str}, f)
+        state_store.set_state(f"daily_report.last_run_date.{SUBSCRIBER_CHANNEL}", date_str)
     except Exception as e:
         logger.error(f"Error saving last run date state: {e}")
 
@@ -1,14 +1,8 @@
 from datetime import datetime, timedelta
 from typing import Dict, Optional, List
-from openai import OpenAI
-from config import NVIDIA_API_KEY
 from providers.news import fetch_news
 from providers.yahoo import get_market_data, search_symbol
-
-client = OpenAI(
-    base_url="https://integrate.api.nvidia.com/v1",
-    api_key=NVIDIA_API_KEY
-)
+from providers.llm_gateway import chat_completion
 
 
 def get_macro_queries_via_ai(asset_name: str) -> str:
@@ -24,15 +18,15 @@ def get_macro_queries_via_ai(asset_name: str) -> str:
         f"Output ONLY the 2-3 word search query without any quotes or punctuation."
     )
     try:
-        response = client.chat.completions.create(
-            model="meta/llama-3.3-70b-instruct",
-            messages=[
+        content = chat_completion(
+            [
                 {"role": "system", "content": "You are a precise search query generator. Output only a 2-3 word query. No conversational filler."},
                 {"role": "user", "content": prompt}
             ],
+            call_site="events.macro_query",
             temperature=0.1
         )
-        query = response.choices[0].message.content.strip().replace('"', '').replace('.', '').strip()
+        query = content.strip().replace('"', '').replace('.', '').strip()
         # Enforce length limit
         if len(query.split()) > 4:
             query = " ".join(query.split()[:3])
@@ -0,0 +1,127 @@
+"""
+Adaptive Feed Scheduler
+Decides WHEN each news source should be polled, based on how often it actually publishes.
+
+Every source starts at its own initial interval and then adapts:
+- Source produced new articles  -> interval halves (towards MIN_INTERVAL), bounded by its observed cadence
+- Source produced nothing new   -> interval grows by 1.5x (towards MAX_INTERVAL)
+- Source failed (timeout / HTTP) -> exponential backoff (towards ERROR_MAX_INTERVAL)
+
+Hot sources (BSE filings, Moneycontrol) settle at 30-60 seconds while quiet or dead ones
+(RBI, SEBI, dead Reuters URLs) drift out to tens of minutes, cutting total request volume.
+"""
+
+import time
+import logging
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+MIN_INTERVAL = 30           # seconds — fastest any source is polled
+MAX_INTERVAL = 30 * 60      # seconds — slowest a quiet (but healthy) source is polled
+ERROR_MAX_INTERVAL = 60 * 60  # seconds — slowest a failing source is polled
+CADENCE_ALPHA = 0.3         # EWMA smoothing for the observed publish gap
+
+
+class FeedState:
+    """Polling state and statistics for one news source."""
+
+    def __init__(self, name: str, fetch: Callable[[], list], initial_interval: float):
+        self.name = name
+        self.fetch = fetch
+        self.interval = float(initial_interval)
+        self.next_due = 0.0  # poll everything once on startup
+        self.last_poll = None
+        self.last_new_at = None
+        self.cadence = None  # EWMA of seconds between polls that yielded new articles
+        self.consecutive_errors = 0
+        self.polls = 0
+        self.errors = 0
+        self.new_articles = 0
+
+
+class FeedScheduler:
+    """Tracks every registered source and hands out the ones that are due."""
+
+    def __init__(self, min_interval: float = MIN_INTERVAL, max_interval: float = MAX_INTERVAL):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._feeds: Dict[str, FeedState] = {}
+
+    def register(self, name: str, fetch: Callable[[], list], initial_interval: float = 120):
+        """Registers a source. `fetch` takes no arguments and returns a list of articles."""
+        self._feeds[name] = FeedState(name, fetch, initial_interval)
+
+    def set_bounds(self, min_interval: float, max_interval: float):
+        """Changes the polling bounds and clamps every source into them."""
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        for state in self._feeds.values():
+            state.interval = self._clamp(state.interval)
+            if state.last_poll is not None:
+                state.next_due = min(state.next_due, state.last_poll + state.interval)
+
+    def due_sources(self, now: float = None) -> List[FeedState]:
+        """Returns every source whose next poll time has passed."""
+        now = now or time.time()
+        return [s for s in self._feeds.values() if s.next_due <= now]
+
+    def seconds_until_next(self, now: float = None) -> float:
+        """Seconds until the earliest source becomes due (0 if one already is)."""
+        if not self._feeds:
+            return self.max_interval
+        now = now or time.time()
+        return max(0.0, min(s.next_due for s in self._feeds.values()) - now)
+
+    def record(self, name: str, new_count: int = 0, error: bool = False, now: float = None):
+        """Feeds the outcome of a poll back into the source's interval."""
+        state = self._feeds.get(name)
+        if not state:
+            return
+        now = now or time.time()
+        state.polls += 1
+        state.last_poll = now
+
+        if error:
+            state.errors += 1
+            state.consecutive_errors += 1
+            backoff = max(state.interval, self.min_interval) * (2 ** min(state.consecutive_errors, 6))
+            state.interval = min(ERROR_MAX_INTERVAL, max(self.min_interval, backoff))
+            state.next_due = now + state.interval
+            return
+
+        state.consecutive_errors = 0
+        if new_count > 0:
+            state.new_articles += new_count
+            if state.last_new_at is not None:
+                gap = (now - state.last_new_at) / new_count
+                state.cadence = gap if state.cadence is None else (
+                    CADENCE_ALPHA * gap + (1 - CADENCE_ALPHA) * state.cadence
+                )
+            state.last_new_at = now
+            target = state.interval / 2
+            if state.cadence is not None:
+                target = min(target, state.cadence)
+            state.interval = self._clamp(target)
+        else:
+            state.interval = self._clamp(state.interval * 1.5)
+
+        state.next_due = now + state.interval
+
+    def stats(self) -> List[Dict]:
+        """Per-source statistics, hottest sources first."""
+        rows = []
+        for s in self._feeds.values():
+            rows.append({
+                "source": s.name,
+                "interval_s": round(s.interval),
+                "cadence_s": round(s.cadence) if s.cadence is not None else None,
+                "polls": s.polls,
+                "errors": s.errors,
+                "new_articles": s.new_articles,
+            })
+        rows.sort(key=lambda r: r["interval_s"])
+        return rows
+
+    def _clamp(self, interval: float) -> float:
+        return max(self.min_interval, min(self.max_interval, interval))
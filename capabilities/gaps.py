@@ -1,14 +1,8 @@
 import json
-from openai import OpenAI
-from config import NVIDIA_API_KEY
 from providers.yahoo import search_symbol, get_market_data
 from providers.finnhub import get_company_news
+from providers.llm_gateway import chat_completion
 
-client = OpenAI(
-    base_url="https://integrate.api.nvidia.com/v1",
-    api_key=NVIDIA_API_KEY
-)
-MODEL = "meta/llama-3.3-70b-instruct"
 
 def scan_gap_opportunities(stocks: list = None) -> str:
     """
@@ -36,13 +30,13 @@ def scan_gap_opportunities(stocks: list = None) -> str:
     )
     
     try:
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
+        content = chat_completion(
+            [
                 {"role": "system", "content": "You are an expert day trader specializing in opening gaps."},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            call_site="gaps.scan"
         )
-        return response.choices[0].message.content or "Error generating gap scan."
+        return content or "Error generating gap scan."
     except Exception as e:
         return f"Gap scan error: {e}"
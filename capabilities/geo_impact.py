@@ -6,14 +6,16 @@ Produces a structured WINNERS vs LOSERS report with real prices and reasoning.
 import concurrent.futures
 import logging
 import json
-from openai import OpenAI
-from config import NVIDIA_API_KEY
 from providers.news import fetch_news
 from providers.yahoo import get_market_data, search_symbol
+from providers.llm_gateway import chat_completion
+from capabilities.prompt_packer import Section, pack_sections
 
 logger = logging.getLogger(__name__)
 
-MODEL = "meta/llama-3.3-70b-instruct"
+# Prompt token budgets (see capabilities/prompt_packer.py)
+GEO_DATA_BUDGET = 6000     # live prices + event news
+GEO_REPORT_BUDGET = 1000   # excerpt of the latest daily report
 
 # Stocks most sensitive to geopolitical events — pre-seeded for speed
 # Format: { category: [(name, symbol)] }
@@ -141,7 +143,7 @@ def fetch_geo_news(event_query: str) -> list:
     return all_news[:20]
 
 
-def run_geo_impact_analysis(user_query: str, event_description: str) -> str:
+def run_geo_impact_analysis(user_query: str, event_description: str, on_delta=None) -> str:
     """
     Full geopolitical impact analysis:
     1. Fetches live prices for geo-sensitive stocks in parallel
@@ -177,15 +179,20 @@ def run_geo_impact_analysis(user_query: str, event_description: str) -> str:
     news = fetch_geo_news(event_description)
 
     # 3. Retrieve latest market report for additional context
-    from agent import get_latest_market_report
-    report_context = get_latest_market_report()
-
-    # 4. Build LLM prompt
-    client = OpenAI(
-        base_url="https://integrate.api.nvidia.com/v1",
-        api_key=NVIDIA_API_KEY
+    from agent import get_latest_market_report, pack_report_context
+    report_context = pack_report_context(get_latest_market_report(), GEO_REPORT_BUDGET)
+
+    # Live prices are what the answer cites; event news is trimmed (oldest last) before them
+    packed = pack_sections(
+        [
+            Section("prices", json.dumps(price_data, default=str), priority=0),
+            Section("news", items=[json.dumps(n, default=str) for n in news], priority=1, min_tokens=600, joiner=",\n"),
+        ],
+        budget=GEO_DATA_BUDGET,
+        label="geo impact data",
     )
 
+    # 4. Build LLM prompt
     prompt = (
         f"User Question: {user_query}\n\n"
         f"Geopolitical Event Context: {event_description}\n\n"
@@ -212,16 +219,15 @@ def run_geo_impact_analysis(user_query: str, event_description: str) -> str:
 
         "Use the LIVE PRICE DATA below to cite REAL current prices. Be specific — name exact stocks with their NSE ticker.\n"
         "Do NOT give generic answers. This must be actionable.\n\n"
-        f"--- LIVE PRICE DATA (categorized) ---\n{json.dumps(price_data, default=str)}\n\n"
-        f"--- LATEST NEWS ON THE EVENT ---\n{json.dumps(news, default=str)}\n\n"
-        f"--- LATEST MARKET REPORT CONTEXT ---\n{report_context[:3000] if report_context else 'Not available'}\n\n"
+        f"--- LIVE PRICE DATA (categorized) ---\n{packed['prices']}\n\n"
+        f"--- LATEST NEWS ON THE EVENT ---\n[{packed['news']}]\n\n"
+        f"--- LATEST MARKET REPORT CONTEXT ---\n{report_context or 'Not available'}\n\n"
         "Add a disclaimer at the end that this is AI-generated analysis, not financial advice."
     )
 
     try:
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
+        content = chat_completion(
+            [
                 {
                     "role": "system",
                     "content": (
@@ -231,9 +237,10 @@ def run_geo_impact_analysis(user_query: str, event_description: str) -> str:
                     )
                 },
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            call_site="geo_impact.report",
+            on_delta=on_delta
         )
-        content = response.choices[0].message.content if response and response.choices else None
         if not content:
             return "❌ The LLM returned an empty response. This may be due to server load. Please try again."
         return content
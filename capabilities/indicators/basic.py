@@ -1,7 +1,13 @@
 import yfinance as yf
 import pandas as pd
 
+from providers.cache_utils import ttl_cached
 
+# Daily-bar indicators only move with the live price; reuse them briefly
+INDICATOR_CACHE_TTL = 5 * 60
+
+
+@ttl_cached(INDICATOR_CACHE_TTL)
 def get_indicators(symbol: str) -> dict | None:
     """
     Computes basic technical indicators using daily data.
@@ -0,0 +1,366 @@
+"""
+Local Intent & Entity Classifier
+Parses most user queries in about a millisecond so `handle_user_message` can skip the
+70B parsing call in `extract_intent_and_asset_via_ai`.
+
+- Intent: multinomial naive Bayes (a linear model in log space) over character 2-4 grams,
+  trained on built-in seed examples plus every query the LLM parser has labeled
+  (data/intent_queries.jsonl), and retrained as that log grows
+- Asset: longest-match lookup in an alias map built from SECTOR_MAP, GEO_SENSITIVE_STOCKS
+  and common company names / tickers. Ticker roots that are short or everyday words
+  ("oil", "ioc", "sci", "lt") only match written as tickers ("OIL", "IOC.NS")
+- The model is trained (and retrained) on a background thread; callers on the event loop
+  use `get_model(wait=False)` and never train inline
+- Returns None (defer to the LLM) when the intent is uncertain, when an asset-specific
+  intent has no recognizable asset, or for geopolitical events (free-form descriptions)
+"""
+
+import os
+import re
+import json
+import math
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+QUERY_LOG_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "intent_queries.jsonl")
+
+NGRAM_RANGE = (2, 4)
+SMOOTHING = 0.5
+CONFIDENCE_THRESHOLD = 0.80   # posterior needed to skip the LLM
+RETRAIN_EVERY = 25            # newly logged queries before the model is refit
+MIN_WORD_ALIAS_LEN = 4        # shorter ticker roots only match in ticker form
+# Ticker roots that are everyday words: only matched in ticker form
+WORD_TICKERS = {"oil", "gold", "coal", "power", "steel", "bank", "energy", "tata"}
+
+# Intents that are answered without a specific asset
+ASSET_FREE_INTENTS = {"general", "sector_scan", "premarket", "alerts", "gaps", "calendar"}
+# Intents the local parser never answers (the LLM extracts a free-form event description)
+LLM_ONLY_INTENTS = {"geopolitical_impact"}
+
+SEED_EXAMPLES = {
+    "market": [
+        "what is the price of reliance", "reliance share price", "how is tcs doing today",
+        "current price of infosys", "hdfc bank stock quote", "sbi share price today",
+        "how is tata steel trading", "quote for itc", "what is wipro trading at",
+        "price of bel", "how is hal doing", "nifty level now", "latest price of ongc",
+    ],
+    "technical": [
+        "technical analysis for tcs", "rsi of reliance", "is infosys overbought",
+        "moving averages for hdfc bank", "sma and ema of sbi", "technical indicators for itc",
+        "show me the trend signals for tata motors", "is wipro above its 50 day average",
+        "chart analysis of bel", "rsi and macd for hal", "trend for ntpc technically",
+    ],
+    "news": [
+        "latest news on reliance", "why is tcs falling today", "why did infosys drop",
+        "any news about hdfc bank", "what happened to adani ports", "dividend announcement by itc",
+        "stock split news for tata steel", "why is sbi rising", "corporate updates for wipro",
+        "why is hal up today", "news for bel", "why did ongc shares dip",
+    ],
+    "social": [
+        "what are people saying about reliance", "reddit discussion on tcs",
+        "retail sentiment for infosys on reddit", "what do investors think about zomato",
+        "social buzz around hal", "opinion on sbi on forums", "reddit chatter on adani",
+        "is there hype about suzlon", "what is reddit saying about irfc",
+    ],
+    "ipo": [
+        "analyze the swiggy ipo", "should i apply for the upcoming ipo", "ipo listing details",
+        "drhp of ola electric", "gmp of the latest ipo", "ipo analysis for hyundai india",
+        "is the ipo worth subscribing", "ipo review", "listing gains expected for the ipo",
+        "subscription status of the ipo", "red flags in the ipo drhp",
+    ],
+    "deep_research": [
+        "deep research on reliance", "tell me everything about tcs", "deep dive into infosys",
+        "analyze hdfc bank in detail", "comprehensive analysis of tata motors",
+        "full research report on hal", "detailed research on bel", "everything about itc",
+        "complete analysis of sbi", "do a deep dive on adani enterprises",
+    ],
+    "sector_scan": [
+        "find 3 stocks in it and banking to trade this week", "scan sectors for swing trades",
+        "which stocks will grow this week", "list 3 stocks from each sector",
+        "best stocks to trade this week", "swing trade ideas across sectors",
+        "scan all sectors for setups", "top picks in power and metal this week",
+        "give me trade setups with entry target and stop loss",
+    ],
+    "premarket": [
+        "premarket dashboard", "how will the market open today", "gift nifty today",
+        "show me global cues", "pre-market update", "what are global markets saying",
+        "how did us markets close", "market opening prediction", "pre market dashboard please",
+        "asian markets this morning",
+    ],
+    "alerts": [
+        "show me overnight alerts", "any alerts for my watchlist", "overnight news alerts",
+        "watchlist alerts", "alerts for today", "did anything happen overnight",
+        "scan overnight news for my watchlist", "any overnight alerts",
+    ],
+    "news_sentiment": [
+        "news sentiment for reliance", "sentiment score of tcs news", "what is the news sentiment on infosys",
+        "ai sentiment on hdfc bank news", "is the news for sbi bullish or bearish",
+        "score the news sentiment for itc", "news feeling for tata motors",
+    ],
+    "gaps": [
+        "scan for gaps today", "gap up stocks", "gap down stocks today", "any gap opportunities",
+        "which stocks will gap up", "opening gap scanner", "gap-up candidates", "gap trading today",
+    ],
+    "calendar": [
+        "what events are coming this week", "economic calendar", "when is the next fomc",
+        "rbi policy date", "upcoming economic events", "when is cpi data", "next expiry day",
+        "events this week", "when is the mpc meeting", "is there a fed meeting this week",
+    ],
+    "general": [
+        "hi", "hello", "thanks", "what can you do", "how does the bot work", "what is a pe ratio",
+        "explain mutual funds", "what is inflation", "should i invest in index funds",
+        "good morning", "what sectors look good", "what is the difference between nse and bse",
+        "how do options work", "what is sip", "help",
+    ],
+    "geopolitical_impact": [
+        "how will the middle east war affect indian stocks", "impact of us tariffs on india",
+        "russia ukraine war impact on markets", "which stocks benefit from iran sanctions",
+        "effect of israel iran conflict on oil stocks", "trade war impact on indian it",
+    ],
+}
+
+# Common names / tickers -> canonical asset name passed to the capability workers
+COMMON_ALIASES = {
+    "reliance": "Reliance Industries", "ril": "Reliance Industries",
+    "tcs": "TCS", "tata consultancy": "TCS", "infosys": "Infosys", "infy": "Infosys",
+    "wipro": "Wipro", "hcl tech": "HCL Technologies", "hcltech": "HCL Technologies",
+    "tech mahindra": "Tech Mahindra", "techm": "Tech Mahindra",
+    "hdfc bank": "HDFC Bank", "hdfcbank": "HDFC Bank", "icici bank": "ICICI Bank", "icicibank": "ICICI Bank",
+    "sbi": "SBI", "state bank": "SBI", "axis bank": "Axis Bank", "kotak": "Kotak Mahindra Bank",
+    "kotak bank": "Kotak Mahindra Bank", "itc": "ITC", "tata motors": "Tata Motors",
+    "tata steel": "Tata Steel", "tata power": "Tata Power", "jsw steel": "JSW Steel",
+    "hindalco": "Hindalco", "vedanta": "Vedanta", "ongc": "ONGC", "ntpc": "NTPC",
+    "power grid": "Power Grid", "coal india": "Coal India", "bharti airtel": "Bharti Airtel",
+    "airtel": "Bharti Airtel", "larsen": "Larsen & Toubro", "l&t": "Larsen & Toubro",
+    "maruti": "Maruti Suzuki", "bajaj finance": "Bajaj Finance", "asian paints": "Asian Paints",
+    "hul": "Hindustan Unilever", "hindustan unilever": "Hindustan Unilever", "titan": "Titan",
+    "sun pharma": "Sun Pharma", "cipla": "Cipla", "dr reddy": "Dr Reddy's", "adani ports": "Adani Ports",
+    "adani enterprises": "Adani Enterprises", "adani power": "Adani Power", "zomato": "Zomato",
+    "eternal": "Zomato", "paytm": "Paytm", "suzlon": "Suzlon", "irfc": "IRFC", "rvnl": "RVNL",
+    "hal": "HAL", "bel": "BEL", "indigo": "IndiGo", "nifty": "Nifty 50", "nifty 50": "Nifty 50",
+    "bank nifty": "Nifty Bank", "banknifty": "Nifty Bank", "sensex": "Sensex",
+}
+
+# Only matched in ticker form (uppercase or with .NS): lowercase ticker -> canonical name
+TICKER_ONLY_ALIASES = {"lt": "Larsen & Toubro"}
+
+_lock = threading.Lock()
+_model = None
+_training = False
+_logged_since_fit = 0
+_alias_map = None
+_ticker_alias_map = None
+
+
+def _ngrams(text: str) -> Counter:
+    text = f" {re.sub(r'[^a-z0-9&]+', ' ', text.lower()).strip()} "
+    grams = Counter()
+    for n in range(NGRAM_RANGE[0], NGRAM_RANGE[1] + 1):
+        for i in range(len(text) - n + 1):
+            grams[text[i:i + n]] += 1
+    return grams
+
+
+class NaiveBayesIntentModel:
+    """Multinomial naive Bayes over character n-gram counts."""
+
+    def __init__(self, texts: List[str], labels: List[str], alpha: float = SMOOTHING):
+        self.classes = sorted(set(labels))
+        class_idx = {c: i for i, c in enumerate(self.classes)}
+        self.vocab: Dict[str, int] = {}
+        docs = [_ngrams(t) for t in texts]
+        for grams in docs:
+            for g in grams:
+                self.vocab.setdefault(g, len(self.vocab))
+
+        counts = np.zeros((len(self.classes), len(self.vocab)), dtype=np.float64)
+        priors = np.zeros(len(self.classes), dtype=np.float64)
+        for grams, label in zip(docs, labels):
+            row = class_idx[label]
+            priors[row] += 1
+            for g, c in grams.items():
+                counts[row, self.vocab[g]] += c
+
+        smoothed = counts + alpha
+        self.log_likelihood = np.log(smoothed / smoothed.sum(axis=1, keepdims=True))
+        self.log_prior = np.log(priors / priors.sum())
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Returns (intent, posterior probability)."""
+        grams = _ngrams(text)
+        idx = [self.vocab[g] for g in grams if g in self.vocab]
+        if not idx:
+            return "general", 0.0
+        weights = np.array([grams[g] for g in grams if g in self.vocab], dtype=np.float64)
+        # Length-normalize so long queries don't produce absurdly over-confident posteriors
+        scores = (self.log_likelihood[:, idx] @ weights) / math.sqrt(weights.sum()) + self.log_prior
+        scores -= scores.max()
+        probs = np.exp(scores)
+        probs /= probs.sum()
+        best = int(probs.argmax())
+        return self.classes[best], float(probs[best])
+
+
+def _load_logged_examples() -> Tuple[List[str], List[str]]:
+    texts, labels = [], []
+    if not os.path.exists(QUERY_LOG_FILE):
+        return texts, labels
+    try:
+        with open(QUERY_LOG_FILE, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if rec.get("text") and rec.get("intent") in SEED_EXAMPLES:
+                    texts.append(rec["text"])
+                    labels.append(rec["intent"])
+    except Exception as e:
+        logger.error(f"Error reading intent query log: {e}")
+    return texts, labels
+
+
+def _fit() -> NaiveBayesIntentModel:
+    texts, labels = [], []
+    for intent, examples in SEED_EXAMPLES.items():
+        texts.extend(examples)
+        labels.extend([intent] * len(examples))
+    logged_texts, logged_labels = _load_logged_examples()
+    texts.extend(logged_texts)
+    labels.extend(logged_labels)
+    start = time.perf_counter()
+    model = NaiveBayesIntentModel(texts, labels)
+    logger.info(f"Intent classifier trained on {len(texts)} queries ({len(logged_texts)} from log) in {(time.perf_counter() - start) * 1000:.0f}ms")
+    return model
+
+
+def _retrain():
+    global _model, _training
+    try:
+        model = _fit()
+        with _lock:
+            _model = model
+    except Exception as e:
+        logger.error(f"Intent classifier training failed: {e}")
+    finally:
+        with _lock:
+            _training = False
+
+
+def get_model(wait: bool = True) -> Optional[NaiveBayesIntentModel]:
+    """
+    The current model. Retraining runs on a background thread while the old model keeps
+    answering. Without a model yet, `wait=True` trains one here; `wait=False` (event loop
+    callers) starts training in the background and returns None.
+    """
+    global _model, _training, _logged_since_fit
+    with _lock:
+        if _model is None and wait:
+            _model = _fit()
+            _logged_since_fit = 0
+        elif (_model is None or _logged_since_fit >= RETRAIN_EVERY) and not _training:
+            _training = True
+            _logged_since_fit = 0
+            threading.Thread(target=_retrain, name="intent-train", daemon=True).start()
+        return _model
+
+
+def _ticker_alias(root: str, name: str, aliases: Dict[str, str], ticker_aliases: Dict[str, str]):
+    key = root.lower()
+    if len(key) < MIN_WORD_ALIAS_LEN or key in WORD_TICKERS:
+        ticker_aliases[key] = name
+    else:
+        aliases[key] = name
+
+
+def get_alias_map() -> Dict[str, str]:
+    """lowercase alias -> canonical asset name (matched in any case)."""
+    global _alias_map, _ticker_alias_map
+    if _alias_map is None:
+        from capabilities.sector_scanner import SECTOR_MAP
+        from capabilities.geo_impact import GEO_SENSITIVE_STOCKS
+        aliases, ticker_aliases = {}, dict(TICKER_ONLY_ALIASES)
+        for symbols in SECTOR_MAP.values():
+            for symbol in symbols:
+                root = symbol.split(".")[0]
+                _ticker_alias(root, root, aliases, ticker_aliases)
+        for stocks in GEO_SENSITIVE_STOCKS.values():
+            for name, symbol in stocks:
+                aliases[name.lower()] = name
+                _ticker_alias(symbol.split(".")[0], name, aliases, ticker_aliases)
+        aliases.update(COMMON_ALIASES)
+        _ticker_alias_map = ticker_aliases
+        _alias_map = aliases
+    return _alias_map
+
+
+def get_ticker_alias_map() -> Dict[str, str]:
+    """lowercase ticker -> canonical asset name, for tickers only matched in ticker form."""
+    get_alias_map()
+    return _ticker_alias_map
+
+
+def find_asset(text: str) -> Optional[str]:
+    """Longest alias (up to 3 words) found in the query, as a canonical asset name."""
+    aliases, ticker_aliases = get_alias_map(), get_ticker_alias_map()
+    tokens, ticker_form = [], []
+    for raw in re.sub(r"[^A-Za-z0-9&.]+", " ", text).split():
+        raw = raw.strip(".")
+        explicit = raw.lower().endswith(".ns")
+        if explicit:
+            raw = raw[:-3]
+        if raw:
+            tokens.append(raw.lower())
+            ticker_form.append(explicit or raw.isupper())
+    for n in (3, 2, 1):
+        for i in range(len(tokens) - n + 1):
+            candidate = " ".join(tokens[i:i + n])
+            if candidate in aliases:
+                return aliases[candidate]
+            if n == 1 and ticker_form[i] and candidate in ticker_aliases:
+                return ticker_aliases[candidate]
+    # An explicit NSE ticker the alias map doesn't know ("IRCTC.NS")
+    explicit = re.search(r"\b([A-Z0-9&]{2,15})\.NS\b", text)
+    return explicit.group(1) if explicit else None
+
+
+def classify_query(text: str) -> Optional[Tuple[str, str]]:
+    """
+    Returns (intent, asset) when the local model is confident, else None so the caller
+    falls back to the LLM parser.
+    """
+    try:
+        intent, confidence = get_model().predict(text)
+    except Exception as e:
+        logger.error(f"Intent classifier failed: {e}")
+        return None
+    if confidence < CONFIDENCE_THRESHOLD or intent in LLM_ONLY_INTENTS:
+        logger.debug(f"Intent classifier deferring ({intent}, p={confidence:.2f}): {text!r}")
+        return None
+    asset = find_asset(text) or ""
+    if not asset and intent not in ASSET_FREE_INTENTS:
+        return None
+    logger.info(f"Local intent: {intent} (p={confidence:.2f}) asset={asset!r}")
+    return intent, asset
+
+
+def record_labeled_query(text: str, intent: str, asset: str = ""):
+    """Appends an LLM-labeled query to the training log."""
+    global _logged_since_fit
+    if intent not in SEED_EXAMPLES:
+        return
+    try:
+        os.makedirs(os.path.dirname(QUERY_LOG_FILE), exist_ok=True)
+        with open(QUERY_LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"text": text, "intent": intent, "asset": asset, "ts": int(time.time())}) + "\n")
+        with _lock:
+            _logged_since_fit += 1
+    except Exception as e:
+        logger.error(f"Error logging labeled query: {e}")
@@ -0,0 +1,327 @@
+"""
+Job Scheduler
+One asyncio scheduler for all recurring background work (daily report, breaking-news
+scanner, samplers, cache warmers), replacing per-feature `while True: sleep(60)` loops.
+
+Triggers:
+- cron: 5-field "minute hour day month weekday" expressions evaluated in IST
+  (`*`, `*/n`, `a-b`, `a-b/n` and comma lists; weekday 0 = Monday ... 6 = Sunday)
+- interval: fixed-rate every N seconds, measured from the scheduled start, so the
+  period never drifts by the job's own run time
+- adaptive: the job returns the number of seconds until its next run
+
+Per job:
+- last run is persisted in the state store; a cron run missed while the bot was down
+  is caught up at startup if it is still within the job's `catch_up` window
+- optional random `jitter` (seconds) so jobs don't fire in lockstep
+- never overlaps itself: a run that is still going when the next one is due is skipped
+- failed cron runs are retried after `retry_delay` instead of waiting for the next slot
+- timing metrics (runs, failures, skips, last/avg/max duration), see `format_job_stats()`
+
+Sync job functions run in the default thread pool; async ones on the event loop.
+"""
+
+import math
+import time
+import random
+import asyncio
+import inspect
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import pytz
+
+from capabilities import state_store
+
+logger = logging.getLogger(__name__)
+
+IST = pytz.timezone("Asia/Kolkata")
+MAX_SLEEP = 60
+
+
+class CronTrigger:
+    """Cron expression evaluated in IST. Weekday 0 = Monday, matching datetime.weekday()."""
+
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse(field, lo, hi) for field, (lo, hi) in zip(fields, self.RANGES)
+        )
+
+    @staticmethod
+    def _parse(field: str, lo: int, hi: int) -> set:
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_str = part.split("/")
+                step = int(step_str)
+            if part == "*":
+                start, end = lo, hi
+            elif "-" in part:
+                start, end = (int(x) for x in part.split("-"))
+            else:
+                start = end = int(part)
+            if start < lo or end > hi or start > end:
+                raise ValueError(f"Cron field {field!r} out of range {lo}-{hi}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def matches(self, dt: datetime) -> bool:
+        return (dt.minute in self.minutes and dt.hour in self.hours and dt.day in self.days
+                and dt.month in self.months and dt.weekday() in self.weekdays)
+
+    def next_after(self, ts: float) -> float:
+        """Epoch seconds of the first matching minute strictly after `ts`."""
+        dt = datetime.fromtimestamp(ts, IST).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366)
+        while dt < limit:
+            if dt.month not in self.months or dt.day not in self.days or dt.weekday() not in self.weekdays:
+                dt = IST.localize(datetime.combine(dt.date() + timedelta(days=1), datetime.min.time()))
+            elif dt.hour not in self.hours:
+                dt = IST.normalize(dt.replace(minute=0) + timedelta(hours=1))
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt.timestamp()
+        raise ValueError(f"Cron expression never fires: {self.expr!r}")
+
+    def previous_fire(self, ts: float, window: float) -> Optional[float]:
+        """Latest fire time in (ts - window, ts], if any."""
+        fire, last = ts - window, None
+        while True:
+            fire = self.next_after(fire)
+            if fire > ts:
+                return last
+            last = fire
+
+
+class Job:
+    def __init__(self, name: str, fn: Callable, kind: str, cron: CronTrigger = None,
+                 interval: float = None, jitter: float = 0, catch_up: float = 0,
+                 retry_delay: float = None, run_at_start: bool = False):
+        self.name = name
+        self.fn = fn
+        self.kind = kind
+        self.cron = cron
+        self.interval = interval
+        self.jitter = jitter
+        self.catch_up = catch_up
+        self.retry_delay = retry_delay
+        self.run_at_start = run_at_start
+        self.next_run = 0.0
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_duration = None
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.last_error = None
+
+    @property
+    def state_key(self) -> str:
+        return f"jobs.{self.name}.last_run"
+
+    def describe(self) -> str:
+        if self.kind == "cron":
+            return f"cron '{self.cron.expr}' IST"
+        if self.kind == "interval":
+            return f"every {self.interval:g}s"
+        return "adaptive"
+
+
+class JobScheduler:
+    """Runs registered jobs on the event loop of whoever awaits `run()`."""
+
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+        self._wake: Optional[asyncio.Event] = None
+
+    # ------------------------------------------------------------------
+    # Registration
+
+    def add_cron(self, name: str, fn: Callable, expr: str, jitter: float = 0,
+                 catch_up: float = 0, retry_delay: float = None) -> Job:
+        """Runs fn at every IST time matching `expr`. Missed runs within `catch_up` seconds run at startup."""
+        job = Job(name, fn, "cron", cron=CronTrigger(expr), jitter=jitter,
+                  catch_up=catch_up, retry_delay=retry_delay)
+        now = time.time()
+        last_run = state_store.get_state(job.state_key, 0) or 0
+        missed = job.cron.previous_fire(now, catch_up) if catch_up else None
+        if missed and last_run < missed:
+            logger.info(f"Job {name}: catching up the run missed at {_fmt_ts(missed)}")
+            job.next_run = now
+        else:
+            job.next_run = self._with_jitter(job, job.cron.next_after(now))
+        return self._add(job)
+
+    def add_interval(self, name: str, fn: Callable, seconds: float, jitter: float = 0,
+                     run_at_start: bool = True) -> Job:
+        """Runs fn every `seconds`, fixed-rate."""
+        job = Job(name, fn, "interval", interval=seconds, jitter=jitter, run_at_start=run_at_start)
+        job.next_run = time.time() if run_at_start else self._with_jitter(job, time.time() + seconds)
+        return self._add(job)
+
+    def add_adaptive(self, name: str, fn: Callable, default_delay: float = 60) -> Job:
+        """Runs fn now and then again after however many seconds it returns (default_delay on failure)."""
+        job = Job(name, fn, "adaptive", interval=default_delay)
+        job.next_run = time.time()
+        return self._add(job)
+
+    def remove(self, name: str):
+        self.jobs.pop(name, None)
+
+    def _add(self, job: Job) -> Job:
+        if job.name in self.jobs:
+            logger.warning(f"Job {job.name} re-registered; replacing the previous definition")
+        self.jobs[job.name] = job
+        logger.info(f"Registered job {job.name} ({job.describe()}), first run {_fmt_ts(job.next_run)}")
+        if self._wake:
+            self._wake.set()
+        return job
+
+    @staticmethod
+    def _with_jitter(job: Job, ts: float) -> float:
+        return ts + random.uniform(0, job.jitter) if job.jitter else ts
+
+    # ------------------------------------------------------------------
+    # Execution
+
+    async def run(self):
+        """Scheduler loop; run it as a background task."""
+        self._wake = asyncio.Event()
+        logger.info("Job scheduler started.")
+        while True:
+            now = time.time()
+            for job in list(self.jobs.values()):
+                if job.next_run <= now:
+                    self._launch(job)
+            delay = min([MAX_SLEEP] + [j.next_run - time.time() for j in self.jobs.values()])
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(0.5, delay))
+            except asyncio.TimeoutError:
+                pass
+
+    def _launch(self, job: Job):
+        scheduled = job.next_run
+        # The next slot is fixed before the run starts; adaptive jobs pick theirs when done
+        if job.kind == "adaptive":
+            job.next_run = float("inf")
+        else:
+            self._advance(job, scheduled)
+        if job.running:
+            job.skipped += 1
+            logger.warning(f"Job {job.name} is still running; skipping this run")
+            return
+        job.running = True
+        asyncio.create_task(self._execute(job))
+
+    async def _execute(self, job: Job):
+        started = time.monotonic()
+        result, failed = None, False
+        try:
+            if inspect.iscoroutinefunction(job.fn):
+                result = await job.fn()
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(None, job.fn)
+            if inspect.isawaitable(result):
+                result = await result
+        except Exception as e:
+            failed = True
+            job.failures += 1
+            job.last_error = f"{type(e).__name__}: {e}"
+            logger.error(f"Job {job.name} failed: {e}")
+        finally:
+            duration = time.monotonic() - started
+            job.running = False
+            job.runs += 1
+            job.last_duration = duration
+            job.total_duration += duration
+            job.max_duration = max(job.max_duration, duration)
+
+        if job.kind == "cron" and not failed:
+            try:
+                state_store.set_state(job.state_key, time.time())
+            except Exception as e:
+                logger.warning(f"Could not persist last run of job {job.name}: {e}")
+
+        if job.kind == "adaptive":
+            delay = result if isinstance(result, (int, float)) and not failed else job.interval
+            job.next_run = time.time() + max(0.0, delay)
+        elif failed and job.retry_delay:
+            job.next_run = min(job.next_run, time.time() + job.retry_delay)
+        if self._wake:
+            self._wake.set()
+
+    def _advance(self, job: Job, scheduled: float):
+        now = time.time()
+        if job.kind == "cron":
+            job.next_run = self._with_jitter(job, job.cron.next_after(now))
+        elif job.kind == "interval":
+            # Fixed rate: next slot after the scheduled start; slots missed while running are dropped
+            next_run = scheduled + job.interval
+            while next_run <= now:
+                next_run += job.interval
+            job.next_run = self._with_jitter(job, next_run)
+
+    # ------------------------------------------------------------------
+    # Metrics
+
+    def stats(self) -> List[Dict]:
+        rows = []
+        for job in self.jobs.values():
+            rows.append({
+                "name": job.name,
+                "trigger": job.describe(),
+                "runs": job.runs,
+                "failures": job.failures,
+                "skipped": job.skipped,
+                "running": job.running,
+                "last_duration": job.last_duration,
+                "avg_duration": job.total_duration / job.runs if job.runs else None,
+                "max_duration": job.max_duration if job.runs else None,
+                "next_run": job.next_run,
+                "last_error": job.last_error,
+            })
+        return rows
+
+
+def _fmt_ts(ts: float) -> str:
+    # Adaptive jobs have no next run (inf) while they are running
+    if ts is None or not math.isfinite(ts):
+        return "-"
+    return datetime.fromtimestamp(ts, IST).strftime("%d %b %H:%M:%S IST")
+
+
+def _fmt_seconds(value: Optional[float]) -> str:
+    return f"{value:.1f}s" if value is not None else "-"
+
+
+def format_job_stats(scheduler: "JobScheduler" = None) -> str:
+    """Plain-text table of every registered job and its timing."""
+    rows = (scheduler or job_scheduler).stats()
+    if not rows:
+        return "No background jobs registered in this process."
+    lines = ["⏱️ Background jobs", "", "Job | trigger | runs (fail/skip) | last / avg / max | next run"]
+    for r in rows:
+        status = " (running)" if r["running"] else ""
+        next_run = _fmt_ts(r["next_run"]) if math.isfinite(r["next_run"]) else "after this run"
+        lines.append(
+            f"{r['name']}{status} | {r['trigger']} | {r['runs']} ({r['failures']}/{r['skipped']}) | "
+            f"{_fmt_seconds(r['last_duration'])} / {_fmt_seconds(r['avg_duration'])} / "
+            f"{_fmt_seconds(r['max_duration'])} | {next_run}"
+        )
+        if r["last_error"]:
+            lines.append(f"  └ last error: {r['last_error'][:150]}")
+    return "\n".join(lines)
+
+
+job_scheduler = JobScheduler()
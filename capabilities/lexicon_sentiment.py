@@ -0,0 +1,205 @@
+"""
+Lexicon Sentiment Scorer
+Fast, local, finance-tuned headline sentiment — used as a triage stage before the LLM.
+
+- Weighted lexicon of market words and phrases ("bags order" +2.5, "fraud" -3.0, ...)
+- Intensity modifiers ("sharply", "massive", "marginally") scale the adjacent sentiment term
+  ("falls sharply" as well as "sharp fall")
+- Negation ("not", "no", "fails to", "n't") within 3 tokens flips and dampens a term
+- Batches are scored together: term hits are collected once and reduced with numpy
+
+Each headline gets a `compound` score in [-1, 1] (VADER-style normalization) plus its
+positive / negative mass.
+
+- `triage_articles` (news sentiment): items with clear, low-magnitude lexicon hits are
+  settled locally; high-magnitude, mixed and unscored items go to the LLM
+- `rank_articles` (breaking news): nothing is settled — sentiment strength is not urgency
+  ("US launches military strike on Iran" scores mildly), so every item still reaches the
+  LLM, strongest signals first
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Finance-tuned lexicon: term -> weight (-3.0 .. +3.0). Multi-word phrases are matched first.
+LEXICON = {
+    # Strong positive
+    "bags order": 2.5, "wins order": 2.5, "order win": 2.5, "bags contract": 2.5, "wins contract": 2.5,
+    "record high": 2.0, "all-time high": 2.0, "upper circuit": 2.5, "rate cut": 1.5,
+    "beats estimates": 2.0, "strong demand": 1.5, "oversubscribed": 2.0, "buyback": 1.5,
+    "surge": 2.5, "surges": 2.5, "soar": 2.5, "soars": 2.5, "rally": 2.0, "rallies": 2.0,
+    "jump": 2.0, "jumps": 2.0, "skyrocket": 3.0, "skyrockets": 3.0, "breakout": 2.0,
+    "upgrade": 2.0, "upgrades": 2.0, "upgraded": 2.0, "outperform": 1.5, "bullish": 2.0,
+    "gain": 1.5, "gains": 1.5, "rise": 1.5, "rises": 1.5, "climb": 1.5, "climbs": 1.5,
+    "profit": 1.0, "profits": 1.0, "growth": 1.0, "record": 1.0, "beat": 1.5, "beats": 1.5,
+    "approval": 1.5, "approves": 1.5, "approved": 1.5, "invest": 1.5, "invests": 1.5,
+    "investment": 1.0, "acquire": 1.0, "acquires": 1.0, "dividend": 1.0, "expansion": 1.0,
+    "recovery": 1.5, "rebound": 1.5, "rebounds": 1.5, "strong": 1.0, "robust": 1.5,
+    # Strong negative
+    "lower circuit": -2.5, "rate hike": -1.5, "misses estimates": -2.0, "profit warning": -2.5,
+    "sell-off": -2.5, "selloff": -2.5, "52-week low": -2.0,
+    "crash": -3.0, "crashes": -3.0, "plunge": -3.0, "plunges": -3.0, "tank": -2.5, "tanks": -2.5,
+    "slump": -2.5, "slumps": -2.5, "tumble": -2.5, "tumbles": -2.5, "sink": -2.0, "sinks": -2.0,
+    "fall": -1.5, "falls": -1.5, "drop": -1.5, "drops": -1.5, "decline": -1.5, "declines": -1.5,
+    "downgrade": -2.0, "downgrades": -2.0, "downgraded": -2.0, "bearish": -2.0, "underperform": -1.5,
+    "loss": -1.5, "losses": -1.5, "miss": -1.5, "misses": -1.5, "weak": -1.0, "muted": -1.0,
+    "ban": -2.5, "bans": -2.5, "banned": -2.5, "fraud": -3.0, "scam": -3.0, "default": -3.0,
+    "defaults": -3.0, "bankrupt": -3.0, "bankruptcy": -3.0, "insolvency": -2.5, "arrest": -2.5,
+    "arrested": -2.5, "raid": -2.5, "raids": -2.5, "probe": -2.0, "penalty": -1.5,
+    "lawsuit": -1.5, "sanction": -2.0, "sanctions": -2.0, "tariff": -1.5, "tariffs": -1.5,
+    "war": -2.0, "strike": -1.0, "attack": -2.5, "recession": -2.5, "inflation": -1.0,
+    "layoffs": -2.0, "resigns": -1.5, "resignation": -1.5, "halt": -2.0, "halted": -2.0,
+    "suspends": -2.0, "suspended": -2.0, "pledge": -1.0, "overpriced": -1.5, "risk": -0.5,
+    "concern": -1.0, "concerns": -1.0, "warning": -1.5, "volatile": -1.0, "outflow": -1.5,
+    "outflows": -1.5, "selling": -1.0, "bars": -2.5, "barred": -2.5, "cancels": -2.0,
+    "cancelled": -2.0, "revoked": -2.0, "steps down": -1.5, "quits": -1.5,
+}
+
+# Scale the next sentiment term, or the one right before ("falls marginally")
+INTENSIFIERS = {
+    "sharp": 1.5, "sharply": 1.5, "massive": 1.5, "massively": 1.5, "huge": 1.5, "biggest": 1.5, "steep": 1.4,
+    "heavy": 1.3, "heavily": 1.3, "major": 1.3, "significant": 1.3, "big": 1.2,
+    "slightly": 0.5, "marginally": 0.5, "modest": 0.6, "mild": 0.6, "minor": 0.6,
+}
+
+NEGATORS = {"not", "no", "never", "without", "neither", "nor", "unlikely", "denies", "deny", "fails", "fail"}
+
+NEGATION_WINDOW = 3        # tokens after a negator that are flipped
+NEGATION_SCALAR = -0.74    # flipped and dampened, as in VADER
+NORMALIZATION_ALPHA = 15.0
+
+# Triage thresholds
+HIGH_MAGNITUDE = 0.35      # |compound| at or above this -> worth an LLM look
+AMBIGUITY_RATIO = 0.5      # min(pos, neg) / max(pos, neg) at or above this -> mixed signal
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+_PHRASES = sorted((t for t in LEXICON if " " in t), key=len, reverse=True)
+_MAX_PHRASE_LEN = max(len(p.split()) for p in _PHRASES)
+_PHRASE_SET = set(_PHRASES)
+
+
+def _tokenize(text: str) -> List[str]:
+    text = (text or "").lower().replace("n't", " not")
+    return _TOKEN_RE.findall(text)
+
+
+def _term_hits(tokens: List[str]) -> List[float]:
+    """Returns the signed, modified weight of every sentiment term in one headline."""
+    hits = []
+    negate_until = -1
+    boost = 1.0
+    last_term_end = -1
+    i = 0
+    while i < len(tokens):
+        tok = tokens[i]
+        if tok in NEGATORS:
+            negate_until = i + NEGATION_WINDOW
+            i += 1
+            continue
+
+        # Longest phrase match first
+        term, width = None, 1
+        for n in range(min(_MAX_PHRASE_LEN, len(tokens) - i), 1, -1):
+            candidate = " ".join(tokens[i:i + n])
+            if candidate in _PHRASE_SET:
+                term, width = candidate, n
+                break
+        if term is None and tok in LEXICON:
+            term = tok
+
+        if term is not None:
+            weight = LEXICON[term] * boost
+            if i <= negate_until:
+                weight *= NEGATION_SCALAR
+            hits.append(weight)
+            boost = 1.0
+            last_term_end = i + width
+        elif tok in INTENSIFIERS:
+            if hits and last_term_end == i and boost == 1.0:
+                hits[-1] *= INTENSIFIERS[tok]
+            else:
+                boost = INTENSIFIERS[tok]
+        i += width
+    return hits
+
+
+def score_headlines(texts: List[str]) -> List[Dict]:
+    """Scores a batch of headlines. Returns one dict per input, in order."""
+    if not texts:
+        return []
+
+    doc_idx, weights = [], []
+    for idx, text in enumerate(texts):
+        for w in _term_hits(_tokenize(text)):
+            doc_idx.append(idx)
+            weights.append(w)
+
+    n = len(texts)
+    doc_idx = np.asarray(doc_idx, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    pos = np.bincount(doc_idx, weights=np.clip(weights, 0, None), minlength=n)
+    neg = np.bincount(doc_idx, weights=-np.clip(weights, None, 0), minlength=n)
+    hits = np.bincount(doc_idx, minlength=n)
+
+    raw = pos - neg
+    compound = raw / np.sqrt(raw * raw + NORMALIZATION_ALPHA)
+    larger = np.maximum(pos, neg)
+    ambiguity = np.divide(np.minimum(pos, neg), larger, out=np.zeros(n), where=larger > 0)
+
+    results = []
+    for i in range(n):
+        c = float(compound[i])
+        results.append({
+            "compound": round(c, 3),
+            "positive": round(float(pos[i]), 2),
+            "negative": round(float(neg[i]), 2),
+            "hits": int(hits[i]),
+            "label": "positive" if c >= 0.05 else "negative" if c <= -0.05 else "neutral",
+            "ambiguous": bool(ambiguity[i] >= AMBIGUITY_RATIO),
+        })
+    return results
+
+
+def article_text(article: Dict) -> str:
+    return f"{article.get('title') or ''}. {article.get('description') or ''}"
+
+
+def triage_articles(articles: List[Dict], high_magnitude: float = HIGH_MAGNITUDE) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Scores every article and splits them into (needs_llm, settled).
+
+    Each article gets a `lexicon` entry with its score. Only articles with lexicon hits
+    that are clearly low-magnitude are settled locally; high-magnitude, mixed and
+    unscored articles (no lexicon hit at all) go to the LLM. For sentiment only: a mild
+    score doesn't mean the news is routine (use rank_articles to triage alerts).
+    """
+    scores = score_headlines([article_text(a) for a in articles])
+    needs_llm, settled = [], []
+    for article, score in zip(articles, scores):
+        article["lexicon"] = score
+        if not score["hits"] or abs(score["compound"]) >= high_magnitude or score["ambiguous"]:
+            needs_llm.append(article)
+        else:
+            settled.append(article)
+    return needs_llm, settled
+
+
+def rank_articles(articles: List[Dict]) -> List[Dict]:
+    """
+    Scores every article (`lexicon` entry) and returns them all, strongest lexicon signal
+    first; unscored articles keep their order after the scored ones.
+    """
+    scores = score_headlines([article_text(a) for a in articles])
+    for article, score in zip(articles, scores):
+        article["lexicon"] = score
+    return sorted(articles, key=lambda a: -abs(a["lexicon"]["compound"]))
+
+
+def aggregate_score(scores: List[Dict]) -> int:
+    """Mean compound score of a batch mapped to -100..+100 (0 if nothing scored)."""
+    scored = [s["compound"] for s in scores if s["hits"]]
+    if not scored:
+        return 0
+    return int(round(float(np.mean(scored)) * 100))
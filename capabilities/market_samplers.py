@@ -0,0 +1,93 @@
+"""
+Market Samplers
+Session-aware background jobs that keep market data warm (see market_session.py for the
+per-session rates).
+
+- PCR sampler: samples the Nifty Put-Call Ratio during market hours; the latest reading
+  and the day's series are kept in the state store, so the options snapshot of every
+  process is served from it (engine job, see register_market_jobs)
+- Quote refresher: re-fetches the QUOTE_WATCHLIST quotes into the quote cache, so index
+  and FX questions are answered from memory. The quote cache is per process, so each
+  bot runs its own (see register_quote_refresher)
+- NSE holiday calendar refresh (weekly)
+
+Outside the sessions that need them, the samplers sleep until the next session change
+instead of polling.
+"""
+
+import logging
+import concurrent.futures
+from typing import List, Dict
+
+from capabilities import state_store
+from capabilities.market_session import (
+    current_profile,
+    next_run_delay,
+    refresh_holidays,
+    HOLIDAY_REFRESH_CRON,
+)
+from capabilities.daily_report import get_ist_now
+
+logger = logging.getLogger(__name__)
+
+QUOTE_WATCHLIST = ["^NSEI", "^NSEBANK", "^BSESN", "^INDIAVIX", "USDINR=X", "^GSPC", "^IXIC", "GC=F", "CL=F"]
+QUOTE_WORKERS = 5
+MAX_PCR_SAMPLES = 200  # per day; 09:15-15:30 at 3 minutes is ~125
+
+
+def _pcr_state_key(day: str) -> str:
+    return f"samples.pcr.{day}"
+
+
+def sample_pcr() -> float:
+    """Adaptive job: one PCR sample in market hours. Returns the delay until the next one."""
+    from providers.options_data import sample_pcr_data
+
+    profile = current_profile()
+    if not profile.pcr_interval:
+        return next_run_delay(None)
+
+    data = sample_pcr_data()
+    if data.get("nifty_pcr") is not None:
+        now = get_ist_now()
+        key = _pcr_state_key(now.strftime("%Y-%m-%d"))
+        samples = state_store.get_state(key, [])
+        samples.append({"t": now.strftime("%H:%M"), "pcr": data["nifty_pcr"]})
+        state_store.set_state(key, samples[-MAX_PCR_SAMPLES:])
+    return profile.pcr_interval
+
+
+def get_pcr_samples(day: str = None) -> List[Dict]:
+    """The PCR series sampled on `day` (YYYY-MM-DD, default today): [{"t": "HH:MM", "pcr": ...}]."""
+    day = day or get_ist_now().strftime("%Y-%m-%d")
+    return state_store.get_state(_pcr_state_key(day), [])
+
+
+def refresh_quotes() -> float:
+    """Adaptive job: refreshes every watchlist quote in parallel. Returns the delay until the next round."""
+    from providers.yahoo import get_market_data
+
+    profile = current_profile()
+    if not profile.quote_interval:
+        return next_run_delay(None)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=QUOTE_WORKERS) as executor:
+        results = list(executor.map(get_market_data.refresh, QUOTE_WATCHLIST))
+    missing = [sym for sym, data in zip(QUOTE_WATCHLIST, results) if data is None]
+    if missing:
+        logger.debug(f"Quote refresher: no data for {', '.join(missing)}")
+    return profile.quote_interval
+
+
+def register_market_jobs(job_scheduler):
+    """Engine jobs (core service or embedded engine): PCR sampler and holiday calendar refresh."""
+    job_scheduler.add_adaptive("pcr_sampler", sample_pcr, default_delay=300)
+    job_scheduler.add_cron(
+        "nse_holiday_refresh", refresh_holidays, HOLIDAY_REFRESH_CRON,
+        jitter=300, catch_up=7 * 24 * 3600, retry_delay=3600
+    )
+
+
+def register_quote_refresher(job_scheduler):
+    """Bot-process job: keeps this process's quote cache warm."""
+    return job_scheduler.add_adaptive("quote_refresher", refresh_quotes, default_delay=300)
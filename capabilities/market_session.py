@@ -0,0 +1,134 @@
+"""
+Market Session Profiles
+Maps the current IST time to an NSE market session and the polling rates that suit it,
+so background work concentrates in the hours that matter.
+
+Sessions (trading days):
+    pre_open     08:00 - 09:15   overnight news + global cues priced in at the open
+    market       09:15 - 15:30   fastest news polling, PCR sampling, live quotes
+    post_market  15:30 - 18:00   results / filings after the close
+    overnight    18:00 - 08:00   US session and slow global news
+Weekends and NSE trading holidays use the `holiday` profile all day.
+
+The holiday calendar comes from NSE's holiday-master API (refreshed weekly by a job
+and stored in the state store), with a built-in list as fallback.
+"""
+
+import time
+import logging
+from datetime import date, datetime, timedelta
+from typing import Optional, Set
+
+from capabilities import state_store
+from capabilities.daily_report import get_ist_now
+
+logger = logging.getLogger(__name__)
+
+
+class SessionProfile:
+    """
+    Polling rates for one session. Intervals are seconds; None means "don't run".
+    feed_min / feed_max bound the adaptive per-source news polling (see feed_scheduler.py).
+    """
+
+    def __init__(self, name: str, feed_min: float, feed_max: float,
+                 pcr_interval: Optional[float], quote_interval: Optional[float]):
+        self.name = name
+        self.feed_min = feed_min
+        self.feed_max = feed_max
+        self.pcr_interval = pcr_interval
+        self.quote_interval = quote_interval
+
+
+PROFILES = {
+    "pre_open":    SessionProfile("pre_open",    feed_min=30,  feed_max=10 * 60, pcr_interval=None,   quote_interval=120),
+    "market":      SessionProfile("market",      feed_min=20,  feed_max=5 * 60,  pcr_interval=180,    quote_interval=60),
+    "post_market": SessionProfile("post_market", feed_min=60,  feed_max=15 * 60, pcr_interval=None,   quote_interval=10 * 60),
+    "overnight":   SessionProfile("overnight",   feed_min=120, feed_max=30 * 60, pcr_interval=None,   quote_interval=15 * 60),
+    "holiday":     SessionProfile("holiday",     feed_min=300, feed_max=60 * 60, pcr_interval=None,   quote_interval=None),
+}
+
+# (start, session) boundaries on a trading day, IST
+SESSION_BOUNDARIES = [
+    ((0, 0), "overnight"),
+    ((8, 0), "pre_open"),
+    ((9, 15), "market"),
+    ((15, 30), "post_market"),
+    ((18, 0), "overnight"),
+]
+
+# NSE equity trading holidays for 2026 (fallback when the NSE API can't be reached)
+BUILTIN_NSE_HOLIDAYS = {
+    "2026-01-26", "2026-03-03", "2026-03-26", "2026-03-31", "2026-04-03",
+    "2026-04-14", "2026-05-01", "2026-05-28", "2026-06-26", "2026-09-14",
+    "2026-10-02", "2026-10-20", "2026-11-10", "2026-11-24", "2026-12-25",
+}
+
+HOLIDAYS_STATE_KEY = "nse_holidays"
+HOLIDAY_REFRESH_CRON = "0 6 * * 6"   # Sundays 06:00 IST (weekday 0 = Monday)
+
+_holidays: Optional[Set[str]] = None
+
+
+def get_holidays() -> Set[str]:
+    """NSE trading holidays as YYYY-MM-DD strings."""
+    global _holidays
+    if _holidays is None:
+        try:
+            stored = state_store.get_state(HOLIDAYS_STATE_KEY) or {}
+            _holidays = set(stored.get("dates", [])) | BUILTIN_NSE_HOLIDAYS
+        except Exception as e:
+            logger.warning(f"Could not load NSE holiday calendar, using built-in list: {e}")
+            _holidays = set(BUILTIN_NSE_HOLIDAYS)
+    return _holidays
+
+
+def refresh_holidays() -> int:
+    """Fetches the NSE trading holiday list and stores it. Returns the number of dates."""
+    global _holidays
+    from providers.nse_data import get_trading_holidays
+
+    dates = get_trading_holidays()
+    if not dates:
+        raise RuntimeError("NSE holiday calendar unavailable")
+    state_store.set_state(HOLIDAYS_STATE_KEY, {"dates": sorted(dates), "fetched_at": time.time()})
+    _holidays = set(dates) | BUILTIN_NSE_HOLIDAYS
+    logger.info(f"NSE holiday calendar refreshed: {len(dates)} trading holidays")
+    return len(dates)
+
+
+def is_trading_day(day: date) -> bool:
+    return day.weekday() < 5 and day.strftime("%Y-%m-%d") not in get_holidays()
+
+
+def session_name(now: datetime = None) -> str:
+    now = now or get_ist_now()
+    if not is_trading_day(now.date()):
+        return "holiday"
+    current = "overnight"
+    for (hour, minute), name in SESSION_BOUNDARIES:
+        if (now.hour, now.minute) >= (hour, minute):
+            current = name
+    return current
+
+
+def current_profile(now: datetime = None) -> SessionProfile:
+    return PROFILES[session_name(now)]
+
+
+def seconds_until_session_change(now: datetime = None) -> float:
+    """Seconds until the session name changes (at most one day ahead)."""
+    now = now or get_ist_now()
+    current = session_name(now)
+    # Every boundary falls on a quarter hour
+    probe = now.replace(minute=now.minute - now.minute % 15, second=0, microsecond=0)
+    for _ in range(24 * 4):
+        probe += timedelta(minutes=15)
+        if session_name(probe) != current:
+            return max(1.0, (probe - now).total_seconds())
+    return 24 * 3600.0
+
+
+def next_run_delay(interval: Optional[float], now: datetime = None) -> float:
+    """Delay for a sampler job: its session interval, or until the next session if it is off."""
+    return interval if interval else seconds_until_session_change(now)
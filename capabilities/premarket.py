@@ -1,16 +1,10 @@
 import json
-from openai import OpenAI
-from config import NVIDIA_API_KEY
 from providers.yahoo import search_symbol, get_market_data
 from providers.nse_data import get_fii_dii_data
 from providers.finnhub import get_market_news
 from providers.gift_nifty import get_gift_nifty
+from providers.llm_gateway import chat_completion
 
-client = OpenAI(
-    base_url="https://integrate.api.nvidia.com/v1",
-    api_key=NVIDIA_API_KEY
-)
-MODEL = "meta/llama-3.3-70b-instruct"
 
 def get_premarket_dashboard() -> str:
     """
@@ -56,13 +50,13 @@ def get_premarket_dashboard() -> str:
     )
     
     try:
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
+        content = chat_completion(
+            [
                 {"role": "system", "content": "You are a pre-market analyst for the NSE."},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            call_site="premarket.dashboard"
         )
-        return response.choices[0].message.content or "Error generating dashboard."
+        return content or "Error generating dashboard."
     except Exception as e:
         return f"Pre-market dashboard error: {e}"
@@ -0,0 +1,149 @@
+"""
+Prompt Packer
+Measures prompt size and fits context material into a token budget before it is sent to the LLM.
+
+- count_tokens(): tiktoken's cl100k_base when installed (close to Llama 3's BPE), else a
+  character heuristic (~4 chars per token for prose, ~3 for JSON/number-heavy text)
+- Every block of context is a Section with a priority (0 = most important)
+- When the prompt is over budget, the lowest-priority sections give way first:
+  list sections swap items for their compact form (e.g. headline only), then drop items
+  from the end; text sections are cut at a line boundary. No section goes below its
+  `min_tokens` floor, so higher-priority material is only touched when it must be.
+"""
+
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # not installed, or the encoding file can't be downloaded
+    _ENCODING = None
+
+TRUNCATION_NOTE = "\n[... trimmed to fit context]"
+
+
+def count_tokens(text: str) -> int:
+    """Token count of `text` (exact with tiktoken, estimated otherwise)."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    # Digits and punctuation tokenize densely; prose averages ~4 chars per token
+    dense = sum(1 for c in text if not c.isalpha() and not c.isspace())
+    chars_per_token = 4.0 - 1.5 * (dense / len(text))
+    return int(len(text) / chars_per_token) + 1
+
+
+class Section:
+    """One block of prompt context. Either plain `text`, or a list of `items` (most important first)."""
+
+    def __init__(self, name: str, text: str = "", priority: int = 0, items: List[str] = None,
+                 compact_items: List[str] = None, min_tokens: int = 0, joiner: str = "\n\n"):
+        self.name = name
+        self.text = text or ""
+        self.priority = priority
+        self.items = list(items) if items is not None else None
+        self.compact_items = list(compact_items) if compact_items is not None else None
+        self.min_tokens = min_tokens
+        self.joiner = joiner
+        self.omitted = 0
+
+    def render(self) -> str:
+        if self.items is None:
+            return self.text
+        body = self.joiner.join(self.items)
+        if self.omitted:
+            body += f"{self.joiner}[+{self.omitted} more items omitted to fit context]"
+        return body
+
+    def tokens(self) -> int:
+        return count_tokens(self.render())
+
+
+def split_markdown_sections(text: str) -> List[str]:
+    """Splits a markdown document into its top-level ('# ' / '## ') sections, in order."""
+    chunks, current = [], []
+    for line in (text or "").splitlines(keepends=True):
+        if (line.startswith("# ") or line.startswith("## ")) and current:
+            chunks.append("".join(current).strip())
+            current = []
+        current.append(line)
+    if current:
+        chunks.append("".join(current).strip())
+    return [c for c in chunks if c]
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts `text` to roughly `max_tokens`, preferring a line boundary."""
+    total = count_tokens(text)
+    if total <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    cut = int(len(text) * max_tokens / total)
+    while cut > 0 and count_tokens(text[:cut]) > max_tokens:
+        cut = int(cut * 0.9)
+    newline = text.rfind("\n", 0, cut)
+    if newline > cut // 2:
+        cut = newline
+    return text[:cut].rstrip() + TRUNCATION_NOTE
+
+
+def _shrink(section: Section, excess: int) -> int:
+    """Shrinks one section by up to `excess` tokens. Returns the tokens actually freed."""
+    before = section.tokens()
+    if section.items is None:
+        target = max(section.min_tokens, before - excess)
+        section.text = truncate_to_tokens(section.text, target)
+        return before - section.tokens()
+
+    # 1. Swap the least important items for their compact form
+    if section.compact_items:
+        for i in range(len(section.items) - 1, -1, -1):
+            if before - section.tokens() >= excess:
+                return before - section.tokens()
+            if i < len(section.compact_items) and section.compact_items[i]:
+                section.items[i] = section.compact_items[i]
+
+    # 2. Drop items from the end, but never below the floor
+    while section.items and before - section.tokens() < excess:
+        item = section.items.pop()
+        section.omitted += 1
+        if section.tokens() < section.min_tokens:
+            section.items.append(item)
+            section.omitted -= 1
+            break
+    return before - section.tokens()
+
+
+def pack_sections(sections: List[Section], budget: int, reserved: int = 0, label: str = "prompt") -> Dict[str, str]:
+    """
+    Fits `sections` into `budget` tokens, with `reserved` tokens already taken by the
+    fixed instructions. Returns {section name: packed text}.
+    """
+    sizes = {s.name: s.tokens() for s in sections}
+    total = reserved + sum(sizes.values())
+    excess = total - budget
+
+    if excess > 0:
+        # Least important first; among equals, the later section gives way first
+        order = sorted(enumerate(sections), key=lambda pair: (-pair[1].priority, -pair[0]))
+        trimmed = []
+        for _, section in order:
+            if excess <= 0:
+                break
+            freed = _shrink(section, excess)
+            if freed > 0:
+                excess -= freed
+                trimmed.append(f"{section.name} {sizes[section.name]}->{sizes[section.name] - freed}")
+        packed_total = reserved + sum(s.tokens() for s in sections)
+        logger.info(f"Packed {label}: {total} -> {packed_total} tokens (budget {budget}); trimmed {', '.join(trimmed) or 'nothing'}")
+        if excess > 0:
+            logger.warning(f"{label} still {excess} tokens over budget after packing (section floors)")
+    else:
+        logger.debug(f"{label}: {total} tokens (budget {budget})")
+
+    return {s.name: s.render() for s in sections}
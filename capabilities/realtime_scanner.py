@@ -1,88 +1,57 @@
-import os
-import json
 import logging
 import asyncio
+import time
 from datetime import datetime, timedelta
-from openai import OpenAI
-from config import NVIDIA_API_KEY
-from providers.enhanced_rss import fetch_india_market_news, fetch_global_and_geo_news
-from providers.finnhub import get_market_news
-from providers.news import fetch_news
+from typing import Optional
+from providers.enhanced_rss import (
+    RSS_FEEDS, GEO_FEEDS, INDIA_FEEDS, GLOBAL_FEEDS, REGULATORY_FEEDS, fetch_feed_strict
+)
+from providers.finnhub import get_market_news_strict
+from providers.news import fetch_news_strict
 from providers.scrapling_fetcher import enrich_articles_with_deep_scrape
-from providers.bse_announcements import fetch_latest_bse_announcements
-from providers.eprocure_scraper import fetch_eprocure_tenders
+from providers.bse_announcements import fetch_latest_bse_announcements_strict
+from providers.eprocure_scraper import fetch_eprocure_tenders_strict
+from capabilities.feed_scheduler import FeedScheduler
+from capabilities.market_session import current_profile
+from capabilities.seen_store import SeenStore
+from capabilities import state_store
+from capabilities.lexicon_sentiment import rank_articles
+from capabilities.broadcast import broadcast_message
+from providers.llm_gateway import chat_completion
 
 logger = logging.getLogger(__name__)
 
-client = OpenAI(
-    base_url="https://integrate.api.nvidia.com/v1",
-    api_key=NVIDIA_API_KEY
-)
-MODEL = "meta/llama-3.3-70b-instruct"
+# Subscribers and seen articles live in the SQLite state store (capabilities/state_store.py).
+# The Discord bot sets SUBSCRIBER_CHANNEL = "discord" to keep its subscribers separate.
+SUBSCRIBER_CHANNEL = "telegram"
+SEEN_SCOPE = "breaking_news"
 
-STATE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "seen_breaking_news.json")
-ALERT_SUBSCRIBERS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "alert_subscribers.json")
+# Minimum gap between two LLM triage calls — new articles found in between are batched together
+ANALYSIS_MIN_INTERVAL = 60
+# Upper bound on how long the loop sleeps, so newly due sources are picked up promptly
+MAX_TICK = 30
 
 def load_alert_subscribers() -> list[int]:
-    if not os.path.exists(ALERT_SUBSCRIBERS_FILE):
-        os.makedirs(os.path.dirname(ALERT_SUBSCRIBERS_FILE), exist_ok=True)
-        with open(ALERT_SUBSCRIBERS_FILE, "w") as f:
-            json.dump({"chat_ids": []}, f)
-        return []
     try:
-        with open(ALERT_SUBSCRIBERS_FILE, "r") as f:
-            data = json.load(f)
-            return data.get("chat_ids", [])
+        return state_store.list_subscribers("alerts", SUBSCRIBER_CHANNEL)
     except Exception as e:
         logger.error(f"Error loading alert subscribers: {e}")
         return []
 
-def save_alert_subscribers(subscribers: list[int]):
-    try:
-        with open(ALERT_SUBSCRIBERS_FILE, "w") as f:
-            json.dump({"chat_ids": subscribers}, f, indent=4)
-    except Exception as e:
-        logger.error(f"Error saving alert subscribers: {e}")
-
 def add_alert_subscriber(chat_id: int) -> bool:
-    subscribers = load_alert_subscribers()
-    if chat_id not in subscribers:
-        subscribers.append(chat_id)
-        save_alert_subscribers(subscribers)
-        return True
-    return False
+    return state_store.add_subscriber("alerts", SUBSCRIBER_CHANNEL, chat_id)
 
 def remove_alert_subscriber(chat_id: int) -> bool:
-    subscribers = load_alert_subscribers()
-    if chat_id in subscribers:
-        subscribers.remove(chat_id)
-        save_alert_subscribers(subscribers)
-        return True
-    return False
-
-def load_seen_news() -> set:
-    if os.path.exists(STATE_FILE):
-        try:
-            with open(STATE_FILE, "r") as f:
-                data = json.load(f)
-                return set(data.get("seen_urls", []))
-        except Exception:
-            pass
-    return set()
-
-def save_seen_news(seen_urls: set):
-    try:
-        os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
-        # Keep only the last 500 URLs to prevent infinite growth
-        with open(STATE_FILE, "w") as f:
-            json.dump({"seen_urls": list(seen_urls)[-500:]}, f)
-    except Exception as e:
-        logger.error(f"Error saving seen breaking news: {e}")
+    return state_store.remove_subscriber("alerts", SUBSCRIBER_CHANNEL, chat_id)
 
-async def analyze_and_broadcast_breaking_news(application, new_articles: list):
-    """Passes new articles to LLM to detect if any are highly urgent/breaking."""
+def load_seen_news() -> SeenStore:
+    """Opens the time-ordered seen-article store."""
+    return SeenStore(SEEN_SCOPE)
+
+async def analyze_breaking_news(new_articles: list) -> Optional[str]:
+    """Passes new articles to LLM to detect if any are highly urgent/breaking. Returns the alert text, if any."""
     if not new_articles:
-        return
+        return None
 
     formatted_news = []
     for idx, item in enumerate(new_articles, 1):
@@ -121,80 +90,132 @@ async def analyze_and_broadcast_breaking_news(application, new_articles: list):
 
     try:
         loop = asyncio.get_running_loop()
-        response = await loop.run_in_executor(
+        content = await loop.run_in_executor(
             None,
-            lambda: client.chat.completions.create(
-                model=MODEL,
-                messages=[
+            lambda: chat_completion(
+                [
                     {"role": "system", "content": "You are an urgent financial risk management AI."},
                     {"role": "user", "content": prompt}
                 ],
+                call_site="realtime_scanner.triage",
                 max_tokens=1000
             )
         )
-        content = response.choices[0].message.content.strip()
+        content = content.strip()
         
         if content.startswith("ALERT"):
             # Strip the 'ALERT' keyword and clean up
             alert_msg = content[5:].strip()
-            final_msg = f"🚨 *BREAKING MARKET ALERT* 🚨\n🕒 {current_time}\n\n{alert_msg}"
-            
-            subscribers = load_alert_subscribers()
-            for chat_id in subscribers:
-                try:
-                    await application.bot.send_message(
-                        chat_id=chat_id,
-                        text=final_msg,
-                        parse_mode="Markdown"
-                    )
-                    logger.info(f"Sent breaking news alert to {chat_id}")
-                except Exception as e:
-                    logger.error(f"Failed to send breaking news alert to {chat_id}: {e}")
+            return f"🚨 *BREAKING MARKET ALERT* 🚨\n🕒 {current_time}\n\n{alert_msg}"
 
     except Exception as e:
         logger.error(f"Error in realtime breaking news LLM check: {e}")
+    return None
+
+async def broadcast_breaking_alert(application, final_msg: str):
+    """Sends an alert to this frontend's alert subscribers."""
+    subscribers = load_alert_subscribers()
+    await broadcast_message(
+        application.bot, subscribers, final_msg,
+        parse_mode="Markdown", label="breaking news alert"
+    )
 
-async def realtime_breaking_news_task(application):
-    logger.info("Realtime breaking news scanner started. Running every 5 minutes.")
-    seen_urls = load_seen_news()
-    
-    while True:
+def build_feed_scheduler() -> FeedScheduler:
+    """Registers every breaking-news source with its starting poll interval."""
+    scheduler = FeedScheduler()
+
+    def rss_source(name: str, url: str):
+        return lambda: fetch_feed_strict(name, url, 3)
+
+    for name in INDIA_FEEDS:
+        scheduler.register(name, rss_source(name, RSS_FEEDS[name]), initial_interval=120)
+    for name in GLOBAL_FEEDS:
+        scheduler.register(name, rss_source(name, RSS_FEEDS[name]), initial_interval=180)
+    for name, url in GEO_FEEDS.items():
+        scheduler.register(name, rss_source(name, url), initial_interval=180)
+    for name in REGULATORY_FEEDS:
+        scheduler.register(name, rss_source(name, RSS_FEEDS[name]), initial_interval=600)
+
+    scheduler.register("Finnhub General", lambda: get_market_news_strict("general"), initial_interval=120)
+    scheduler.register("GNews Breaking", lambda: fetch_news_strict("breaking global market crisis", 5), initial_interval=300)
+    scheduler.register("BSE Announcements", lambda: fetch_latest_bse_announcements_strict(10), initial_interval=45)
+    scheduler.register("eProcure Tenders", lambda: fetch_eprocure_tenders_strict(10), initial_interval=600)
+    return scheduler
+
+class BreakingNewsScanner:
+    """
+    Polls every breaking-news source and triages new articles, one `tick()` at a time
+    (registered as an adaptive job on the job scheduler). Alerts go to `on_alert(text)`
+    (the core service publishes them to the frontends) or, by default, straight to the
+    alert subscribers of `application`.
+    """
+
+    def __init__(self, application=None, on_alert=None):
+        self.on_alert = on_alert or (lambda text: broadcast_breaking_alert(application, text))
+        self.scheduler = build_feed_scheduler()
+        self.seen_store = load_seen_news()
+        self.pending_articles = []
+        self.last_analysis = 0.0
+        self.session = None
+        logger.info("Realtime breaking news scanner started with adaptive per-source polling.")
+
+    async def tick(self) -> float:
+        """One polling round. Returns the seconds until the next round is due."""
         try:
             loop = asyncio.get_running_loop()
+
+            # Market session decides how fast sources may be polled
+            profile = current_profile()
+            if profile.name != self.session:
+                logger.info(f"Breaking news scanner: {profile.name} session, polling every {profile.feed_min}-{profile.feed_max}s")
+                self.scheduler.set_bounds(profile.feed_min, profile.feed_max)
+                self.session = profile.name
             
-            # Fetch news from RSS feeds, Finnhub API, and GNews API in parallel
-            india_news = await loop.run_in_executor(None, fetch_india_market_news, 2, 20)
-            global_news = await loop.run_in_executor(None, fetch_global_and_geo_news, 2, 20)
-            finnhub_news = await loop.run_in_executor(None, get_market_news, "general")
-            gnews_news = await loop.run_in_executor(None, fetch_news, "breaking global market crisis", 5)
-            bse_news = await loop.run_in_executor(None, fetch_latest_bse_announcements, 10)
-            eprocure_news = await loop.run_in_executor(None, fetch_eprocure_tenders, 10)
-            
-            india_news = india_news or []
-            global_news = global_news or []
-            finnhub_news = finnhub_news or []
-            gnews_news = gnews_news or []
-            bse_news = bse_news or []
-            eprocure_news = eprocure_news or []
-            
-            all_recent = india_news + global_news + finnhub_news + gnews_news + bse_news + eprocure_news
+            # Poll only the sources that are due, all in parallel
+            due = self.scheduler.due_sources()
+            results = await asyncio.gather(
+                *(loop.run_in_executor(None, source.fetch) for source in due),
+                return_exceptions=True
+            )
             
-            new_articles = []
-            for article in all_recent:
-                url = article.get("url")
-                if url and url not in seen_urls:
-                    new_articles.append(article)
-                    seen_urls.add(url)
+            for source, articles in zip(due, results):
+                if isinstance(articles, Exception):
+                    logger.debug(f"Breaking news source '{source.name}' failed: {articles}")
+                    self.scheduler.record(source.name, error=True)
+                    continue
+
+                new_count = 0
+                for article in articles or []:
+                    if self.seen_store.check_and_mark(article):
+                        self.pending_articles.append(article)
+                        new_count += 1
+                self.scheduler.record(source.name, new_count)
             
-            if new_articles:
-                # DEEP SCRAPE: Fetch the full paragraph text for all new articles concurrently
-                new_articles = await loop.run_in_executor(None, enrich_articles_with_deep_scrape, new_articles)
-                
-                await analyze_and_broadcast_breaking_news(application, new_articles)
-                save_seen_news(seen_urls)
+            if self.pending_articles and time.time() - self.last_analysis >= ANALYSIS_MIN_INTERVAL:
+                new_articles, self.pending_articles = self.pending_articles, []
+                self.last_analysis = time.time()
+
+                # LEXICON ORDERING: every new article goes to the LLM (a mild score doesn't mean
+                # routine news), strongest lexicon signals first
+                candidates = rank_articles(new_articles)
+                logger.info(f"Breaking news triage: {len(candidates)} new articles sent to LLM")
+
+                # DEEP SCRAPE: Fetch the full paragraph text for the candidates concurrently
+                candidates = await loop.run_in_executor(None, enrich_articles_with_deep_scrape, candidates)
+                alert = await analyze_breaking_news(candidates)
+                if alert:
+                    await self.on_alert(alert)
+
+            # Persist newly seen keys (one small transaction)
+            self.seen_store.flush()
                 
         except Exception as e:
             logger.error(f"Error in realtime breaking news loop: {e}")
             
-        # Check every 5 minutes (300 seconds)
-        await asyncio.sleep(300)
+        # Next round when the next source is due (bounded so pending batches are flushed on time)
+        return max(1.0, min(MAX_TICK, self.scheduler.seconds_until_next()))
+
+def register_breaking_news_job(job_scheduler, application=None, on_alert=None):
+    """Registers the breaking-news scanner as an adaptive job."""
+    scanner = BreakingNewsScanner(application, on_alert)
+    return job_scheduler.add_adaptive("breaking_news_scanner", scanner.tick, default_delay=MAX_TICK)
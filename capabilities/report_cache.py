@@ -0,0 +1,179 @@
+"""
+Daily Report Artifact Cache
+Keeps the latest published market report in memory and decides when a new one is built.
+
+- Pre-build: a job (PREBUILD_CRON, 08:30 IST) generates the report ahead of the 08:50
+  subscriber broadcast (BROADCAST_CRON), which then just sends the finished artifact
+  (and only builds one itself if the pre-build failed)
+- Reports are published atomically (write + rename) by generate_daily_report; readers
+  (`/report`, `get_latest_market_report`) are served from memory, reloading only when
+  a newer file appears on disk (e.g. built by the other frontend's process)
+- Freshness policy: `/report` reuses an artifact younger than REPORT_MAX_AGE; degraded
+  (no-news) artifacts only for REGEN_MIN_INTERVAL
+- Regeneration is single-flight (concurrent requests share one build) and rate-limited
+  to one build per REGEN_MIN_INTERVAL; inside that window the existing report is served
+"""
+
+import os
+import re
+import glob
+import time
+import logging
+import threading
+from typing import Optional
+
+from capabilities.daily_report import REPORTS_DIR, EMPTY_REPORT_NOTE, generate_daily_report, get_ist_now, report_path_for
+from capabilities.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+PREBUILD_CRON = "30 8 * * *"     # IST
+PREBUILD_CATCH_UP = 90 * 60      # a bot started after 10:00 builds on first /report instead
+BROADCAST_CRON = "50 8 * * *"    # IST
+BROADCAST_CATCH_UP = 15 * 3600   # a missed broadcast is still sent until midnight
+REPORT_MAX_AGE = 3 * 3600        # seconds an artifact is served to /report without rebuilding
+REGEN_MIN_INTERVAL = 15 * 60     # seconds between two builds
+BROADCAST_MAX_AGE = 3600         # the 08:50 broadcast reuses the 08:30 pre-build
+
+
+class ReportArtifact:
+    """One published report: its file, its text and when it was built."""
+
+    def __init__(self, path: str, content: str, built_at: float):
+        self.path = path
+        self.content = content
+        self.built_at = built_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.built_at
+
+    @property
+    def degraded(self) -> bool:
+        return EMPTY_REPORT_NOTE in self.content[:500]
+
+    def is_fresh(self, max_age: float = REPORT_MAX_AGE) -> bool:
+        return self.age < (REGEN_MIN_INTERVAL if self.degraded else max_age)
+
+
+_lock = threading.Lock()
+_current: Optional[ReportArtifact] = None
+_last_build_started = 0.0
+_flight = SingleFlight()
+
+
+def _latest_report_file() -> Optional[str]:
+    files = glob.glob(os.path.join(REPORTS_DIR, "market_impact_report_*.md"))
+    # Filenames contain YYYY-MM-DD, so the alphabetical maximum is the newest
+    return max(files) if files else None
+
+
+def _load(path: str) -> Optional[ReportArtifact]:
+    try:
+        built_at = os.path.getmtime(path)
+        with open(path, "r", encoding="utf-8") as f:
+            return ReportArtifact(path, f.read(), built_at)
+    except Exception as e:
+        logger.error(f"Error loading report artifact {path}: {e}")
+        return None
+
+
+def latest_artifact() -> Optional[ReportArtifact]:
+    """The newest published report, from memory (reloaded only if a newer file exists)."""
+    global _current
+    path = _latest_report_file()
+    if not path:
+        return _current
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return _current
+    with _lock:
+        if _current is None or _current.path != path or mtime > _current.built_at:
+            loaded = _load(path)
+            if loaded:
+                _current = loaded
+        return _current
+
+
+def published_report_path(date_str: str) -> Optional[str]:
+    """
+    The report file for a date announced by the core service: always resolved under
+    REPORTS_DIR (the core only sends the date). Falls back to the newest report when the
+    file for that date is missing (the report is named by server-local date).
+    """
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", date_str or ""):
+        path = report_path_for(date_str)
+        if os.path.exists(path):
+            return path
+    artifact = latest_artifact()
+    return artifact.path if artifact else None
+
+
+def get_latest_report_text() -> str:
+    artifact = latest_artifact()
+    return artifact.content if artifact else ""
+
+
+def build_report() -> ReportArtifact:
+    """Generates and publishes a new report. Concurrent callers share one build."""
+    return _flight.do("daily_report", _build)
+
+
+def _build() -> ReportArtifact:
+    global _current, _last_build_started
+    _last_build_started = time.time()
+    started = time.monotonic()
+    path = generate_daily_report()
+    artifact = _load(path)
+    if artifact is None:
+        raise RuntimeError(f"Report was generated but could not be read back: {path}")
+    with _lock:
+        _current = artifact
+    logger.info(f"Report artifact published in {time.monotonic() - started:.0f}s: {path}")
+    return artifact
+
+
+def needs_build(max_age: float = REPORT_MAX_AGE, allow_stale: bool = True) -> bool:
+    """True if get_report() with the same arguments would have to generate a new report."""
+    artifact = latest_artifact()
+    if artifact is None or artifact.is_fresh(max_age):
+        return artifact is None
+    return not (allow_stale and time.time() - _last_build_started < REGEN_MIN_INTERVAL)
+
+
+def get_report(max_age: float = REPORT_MAX_AGE, allow_stale: bool = True) -> ReportArtifact:
+    """
+    Returns a report no older than `max_age`, building one if needed. With `allow_stale`,
+    a build that ran within REGEN_MIN_INTERVAL means the existing (older) report is
+    returned instead of generating again.
+    """
+    artifact = latest_artifact()
+    if not needs_build(max_age, allow_stale):
+        if not artifact.is_fresh(max_age):
+            logger.info(f"Report rebuild rate-limited; serving artifact built {artifact.age / 60:.0f} min ago")
+        return artifact
+    return build_report()
+
+
+def is_built_today() -> bool:
+    artifact = latest_artifact()
+    today = get_ist_now().strftime("%Y-%m-%d")
+    return bool(artifact and today in os.path.basename(artifact.path) and not artifact.degraded)
+
+
+def prebuild_report() -> bool:
+    """Builds today's report unless it already exists. Returns True if a build ran."""
+    if is_built_today():
+        return False
+    logger.info(f"Pre-building daily report for {get_ist_now().strftime('%Y-%m-%d')}...")
+    build_report()
+    return True
+
+
+def register_prebuild_job(job_scheduler):
+    """Schedules prebuild_report at PREBUILD_CRON, retried every 5 minutes on failure."""
+    return job_scheduler.add_cron(
+        "report_prebuild", prebuild_report, PREBUILD_CRON,
+        jitter=60, catch_up=PREBUILD_CATCH_UP, retry_delay=5 * 60
+    )
@@ -1,15 +1,19 @@
 import concurrent.futures
+import contextvars
 import logging
 import json
-from openai import OpenAI
-from config import NVIDIA_API_KEY
 from capabilities.indicators.basic import get_indicators
 from capabilities.indicators.signals import compute_signals
 from providers.news import fetch_news
-MODEL = "meta/llama-3.3-70b-instruct"
+from providers.llm_gateway import chat_completion
+from capabilities.prompt_packer import Section, pack_sections
 
 logger = logging.getLogger(__name__)
 
+# Prompt token budgets (see capabilities/prompt_packer.py)
+SCANNER_DATA_BUDGET = 9000     # technical scan + sector news
+SCANNER_REPORT_BUDGET = 3000   # excerpt of the latest daily report
+
 SECTOR_MAP = {
     "IT": ["TCS.NS", "INFY.NS", "HCLTECH.NS", "WIPRO.NS", "TECHM.NS"],
     "Energy": ["RELIANCE.NS", "ONGC.NS", "BPCL.NS", "IOC.NS", "COALINDIA.NS"],
@@ -55,7 +59,7 @@ def fetch_sector_news(sector: str) -> list:
         logger.error(f"Error fetching news for sector {sector}: {e}")
         return []
 
-def run_sector_scanner(user_query: str) -> str:
+def run_sector_scanner(user_query: str, on_delta=None) -> str:
     """
     Scans all 35 stocks across 7 sectors in parallel, fetches sector news,
     and uses LLM to generate trade recommendations with precise entry, target, and stop loss.
@@ -71,7 +75,7 @@ def run_sector_scanner(user_query: str) -> str:
     scanned_data = {}
     logger.info(f"Scanning {len(all_symbols)} stocks in parallel...")
     with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-        futures = {executor.submit(scan_stock, sym): sym for sym in all_symbols}
+        futures = {executor.submit(contextvars.copy_context().run, scan_stock, sym): sym for sym in all_symbols}
         for future in concurrent.futures.as_completed(futures):
             sym = futures[future]
             try:
@@ -89,7 +93,7 @@ def run_sector_scanner(user_query: str) -> str:
     sector_news = {}
     sectors = list(SECTOR_MAP.keys())
     with concurrent.futures.ThreadPoolExecutor(max_workers=7) as executor:
-        futures = {executor.submit(fetch_sector_news, sec): sec for sec in sectors}
+        futures = {executor.submit(contextvars.copy_context().run, fetch_sector_news, sec): sec for sec in sectors}
         for future in concurrent.futures.as_completed(futures):
             sec = futures[future]
             try:
@@ -98,15 +102,21 @@ def run_sector_scanner(user_query: str) -> str:
                 logger.error(f"Failed to fetch news for {sec}: {e}")
 
     # 3. Retrieve latest daily market report for extra context
-    from agent import get_latest_market_report
-    report_context = get_latest_market_report()
+    from agent import get_latest_market_report, pack_report_context
+    report_context = pack_report_context(get_latest_market_report(), SCANNER_REPORT_BUDGET)
 
-    # 4. Synthesize prompt for LLM
-    client = OpenAI(
-        base_url="https://integrate.api.nvidia.com/v1",
-        api_key=NVIDIA_API_KEY
+    # Technical data is the core input; sector news is trimmed before it
+    packed = pack_sections(
+        [
+            Section("technical", json.dumps(scanned_data, default=str), priority=0),
+            Section("news", items=[json.dumps({sec: items}, default=str) for sec, items in sector_news.items()],
+                    priority=1, min_tokens=800, joiner="\n"),
+        ],
+        budget=SCANNER_DATA_BUDGET,
+        label="sector scanner data",
     )
-    
+
+    # 4. Synthesize prompt for LLM
     prompt = (
         "You are a lead trading strategist and technical analyst.\n"
         "Your task is to analyze the technical indicators, trend signals, and news context for stocks across 7 sectors:\n"
@@ -129,23 +139,23 @@ def run_sector_scanner(user_query: str) -> str:
         "- Use clean tables or callout blocks for trade setups.\n"
         "- Add a general 'Risk Management & Trading Guidelines' section at the end detailing position sizing, stop-loss adherence, and capital protection.\n"
         "- Include a prominent disclaimer stating that this is an AI-generated analysis based on technical configurations and public news, not financial advice.\n\n"
-        f"--- SCANNED TECHNICAL DATA ---\n{json.dumps(scanned_data, default=str)}\n\n"
-        f"--- SECTOR NEWS CONTEXT ---\n{json.dumps(sector_news, default=str)}\n\n"
+        f"--- SCANNED TECHNICAL DATA ---\n{packed['technical']}\n\n"
+        f"--- SECTOR NEWS CONTEXT ---\n{packed['news']}\n\n"
         f"--- LATEST REPORT CONTEXT ---\n{report_context}\n"
     )
 
     try:
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
+        content = chat_completion(
+            [
                 {
                     "role": "system",
                     "content": "You are a professional technical analyst and risk manager. Generate a detailed, actionable swing trading report. Be objective and precise with price numbers."
                 },
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            call_site="sector_scanner.report",
+            on_delta=on_delta
         )
-        content = response.choices[0].message.content if response and response.choices else None
         if not content:
             return "❌ The LLM returned an empty response. Please try again in a moment."
         return content
@@ -0,0 +1,173 @@
+"""
+Seen-Article Store
+Time-ordered, bounded dedupe store for the realtime breaking news scanner.
+
+Each article is keyed twice:
+- its canonical URL (tracking params, fragments, `www.` and trailing slashes removed)
+- a hash of its normalized title, so the same story syndicated under different URLs
+  is still recognized (sources with no URL at all, like BSE filings, hash the
+  description as well)
+
+Entries expire a TTL after they were last seen: an article a slow feed (RBI, SEBI) keeps
+listing for days is re-stamped when it is sighted again (at most every TOUCH_INTERVAL),
+so it never comes back as "new". The store never holds more than `max_entries` keys,
+least recently seen first out. State is persisted to the `seen` table of the SQLite
+state store (one small transaction per scan), pruned there once enough writes have
+accumulated, so restarts keep exactly the most recently seen articles.
+"""
+
+import re
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from capabilities import state_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_TTL = 3 * 24 * 3600  # 3 days after the last sighting
+# A sighting re-stamps a key at most this often, so re-listed items don't cost a write every scan
+TOUCH_INTERVAL = 3600
+
+TRACKING_PARAMS = {"fbclid", "gclid", "ref", "ref_src", "cmpid", "ocid", "from", "mc_cid", "mc_eid"}
+
+
+def canonical_url(url: str) -> str:
+    """Normalizes a URL so trivially different links to the same article compare equal."""
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
+
+
+def _normalize_text(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", (text or "").lower()).strip()
+
+
+def content_hash(article: dict) -> str:
+    """
+    Hash of the normalized headline — catches the same story under different URLs.
+    Items without a URL (BSE filings) hash their description too: many filings share a
+    generic title like "BSE FILING: X - Board Meeting Intimation".
+    """
+    title = _normalize_text(article.get("title"))
+    if not title:
+        return ""
+    if not article.get("url"):
+        title = f"{title}|{_normalize_text(article.get('description'))}"
+    return hashlib.sha1(title.encode("utf-8")).hexdigest()[:16]
+
+
+def article_keys(article: dict) -> list[str]:
+    keys = []
+    url = canonical_url(article.get("url") or "")
+    if url:
+        keys.append(f"u:{url}")
+    digest = content_hash(article)
+    if digest:
+        keys.append(f"h:{digest}")
+    return keys
+
+
+class SeenStore:
+    """Bounded set of article keys, expiring by last-seen time, persisted in the state store."""
+
+    def __init__(self, scope: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_seconds: int = DEFAULT_TTL):
+        self.scope = scope
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._pending: list[tuple[str, float]] = []
+        self._writes_since_prune = 0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_seen(self, article: dict) -> bool:
+        now = time.time()
+        for key in article_keys(article):
+            ts = self._entries.get(key)
+            if ts is not None and now - ts < self.ttl_seconds:
+                return True
+        return False
+
+    def mark(self, article: dict, now: float = None):
+        now = now or time.time()
+        for key in article_keys(article):
+            self._put(key, now)
+            self._pending.append((key, now))
+
+    def check_and_mark(self, article: dict) -> bool:
+        """
+        Returns True if the article is new, False if already seen. Either way the sighting
+        is recorded, so the article's TTL runs from the last time a feed listed it.
+        """
+        keys = article_keys(article)
+        if not keys:
+            return False
+        if self.is_seen(article):
+            self._touch(keys)
+            return False
+        self.mark(article)
+        return True
+
+    def flush(self):
+        """Writes pending keys in one transaction; prunes the table when it has grown too large."""
+        if not self._pending:
+            return
+        try:
+            state_store.save_seen(self.scope, self._pending)
+            self._writes_since_prune += len(self._pending)
+            self._pending = []
+            if self._writes_since_prune > self.max_entries:
+                state_store.prune_seen(self.scope, time.time() - self.ttl_seconds, self.max_entries)
+                self._writes_since_prune = 0
+        except Exception as e:
+            logger.error(f"Error saving seen article store: {e}")
+
+    # ------------------------------------------------------------------
+
+    def _touch(self, keys: list[str]):
+        now = time.time()
+        for key in keys:
+            ts = self._entries.get(key)
+            if ts is None or now - ts >= TOUCH_INTERVAL:
+                self._put(key, now)
+                self._pending.append((key, now))
+
+    def _put(self, key: str, ts: float):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self._entries[key] = ts
+        self._evict(ts)
+
+    def _evict(self, now: float):
+        while self._entries:
+            oldest_key, oldest_ts = next(iter(self._entries.items()))
+            if len(self._entries) > self.max_entries or now - oldest_ts >= self.ttl_seconds:
+                self._entries.popitem(last=False)
+            else:
+                break
+
+    def _load(self):
+        try:
+            for key, ts in state_store.load_seen(self.scope, time.time() - self.ttl_seconds, self.max_entries):
+                self._put(key, ts)
+        except Exception as e:
+            logger.error(f"Error loading seen article store: {e}")
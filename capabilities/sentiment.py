@@ -1,13 +1,8 @@
 import json
-from openai import OpenAI
-from config import NVIDIA_API_KEY
 from providers.finnhub import get_company_news
+from capabilities.lexicon_sentiment import triage_articles, aggregate_score
+from providers.llm_gateway import chat_completion
 
-client = OpenAI(
-    base_url="https://integrate.api.nvidia.com/v1",
-    api_key=NVIDIA_API_KEY
-)
-MODEL = "meta/llama-3.3-70b-instruct"
 
 def analyze_news_sentiment(company_name: str) -> str:
     """
@@ -26,8 +21,29 @@ def analyze_news_sentiment(company_name: str) -> str:
     if not news or len(news) == 0:
         return f"No recent news found for {company_name} ({ticker})."
 
+    # Local lexicon pass over every article — only strong or mixed items need the LLM
+    news = news[:10]
+    needs_llm, settled = triage_articles(news)
+    lexicon_score = aggregate_score([a["lexicon"] for a in news])
+    lexicon_label = "Bullish" if lexicon_score >= 15 else "Bearish" if lexicon_score <= -15 else "Neutral"
+
+    if not needs_llm:
+        lines = [
+            f"📰 News Sentiment for {company_name} ({ticker})",
+            f"Sentiment Score: {lexicon_score:+d} ({lexicon_label}) — lexicon-scored, no strong or mixed signals found.",
+            "",
+        ]
+        for a in settled:
+            lines.append(f"• [{a['lexicon']['label']}] {a.get('title')}")
+        return "\n".join(lines)
+
+    settled_lines = "\n".join(
+        f"- [{a['lexicon']['label']}, {a['lexicon']['compound']:+.2f}] {a.get('title')}" for a in settled
+    )
     prompt = (
-        f"Recent news for {company_name} ({ticker}):\n{json.dumps(news[:10], default=str)}\n\n"
+        f"Recent news for {company_name} ({ticker}):\n{json.dumps(needs_llm, default=str)}\n\n"
+        f"Lexicon pre-score across all {len(news)} articles: {lexicon_score:+d} ({lexicon_label}).\n"
+        f"Low-signal headlines already scored locally:\n{settled_lines or '- none'}\n\n"
         "Analyze the sentiment of these news articles. "
         "1. Give an overall Sentiment Score (-100 to +100).\n"
         "2. Categorize as Bullish, Bearish, or Neutral.\n"
@@ -36,13 +52,13 @@ def analyze_news_sentiment(company_name: str) -> str:
     )
     
     try:
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
+        content = chat_completion(
+            [
                 {"role": "system", "content": "You are a quantitative news sentiment analyst."},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            call_site="sentiment.news"
         )
-        return response.choices[0].message.content or "Error analyzing sentiment."
+        return content or "Error analyzing sentiment."
     except Exception as e:
         return f"Sentiment analysis error: {e}"
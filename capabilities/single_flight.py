@@ -0,0 +1,112 @@
+"""
+Single-Flight Request Coalescing
+Collapses identical concurrent requests (same intent + asset) into one computation.
+
+- The first caller for a key runs the computation; concurrent callers for the same key
+  block until it finishes and receive the same result (or the same exception)
+- Results stay fresh for a short per-call window, so near-simultaneous requests
+  (dozens of subscribers asking for "premarket" at 09:00) reuse them instead of
+  starting another full data fetch + LLM call
+- Failures are never cached: neither raised exceptions nor results the caller's
+  `cacheable(result)` predicate rejects (functions that return error text instead of raising)
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = 256
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Keyed single-flight executor with a short result freshness window."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._inflight: Dict[Any, _Call] = {}
+        self._results: Dict[Any, Tuple[float, Any]] = {}  # key -> (expires_at, result)
+
+    def do(self, key, fn: Callable, *args, fresh_for: float = 0,
+           cacheable: Optional[Callable[[Any], bool]] = None, **kwargs):
+        """
+        Returns fn(*args, **kwargs), shared with every identical concurrent or recent call.
+        Concurrent waiters always get the leader's result; it is only kept for `fresh_for`
+        seconds if it didn't raise and `cacheable(result)` (when given) is true.
+        """
+        with self._lock:
+            cached = self._results.get(key)
+            if cached and cached[0] > time.time():
+                logger.info(f"Single-flight: reusing fresh result for {key}")
+                return cached[1]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            logger.info(f"Single-flight: joining in-flight computation for {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if call.error is None and fresh_for > 0 and self._cacheable(cacheable, call.result):
+                    self._results[key] = (time.time() + fresh_for, call.result)
+                    self._prune()
+                self._inflight.pop(key, None)
+            if call.waiters:
+                logger.info(f"Single-flight: {call.waiters} duplicate request(s) served by one run of {key}")
+            call.done.set()
+        return call.result
+
+    @staticmethod
+    def _cacheable(predicate, result) -> bool:
+        if predicate is None:
+            return True
+        try:
+            return bool(predicate(result))
+        except Exception as e:
+            logger.warning(f"Single-flight: cacheable() check failed, not caching: {e}")
+            return False
+
+    def forget(self, key):
+        with self._lock:
+            self._results.pop(key, None)
+
+    def _prune(self):
+        # Called with the lock held
+        now = time.time()
+        for k in [k for k, (exp, _) in self._results.items() if exp <= now]:
+            del self._results[k]
+        while len(self._results) > self.max_entries:
+            del self._results[next(iter(self._results))]
+
+
+_default = SingleFlight()
+
+
+def single_flight(key, fn: Callable, *args, fresh_for: float = 0,
+                  cacheable: Optional[Callable[[Any], bool]] = None, **kwargs):
+    """Runs fn through the process-wide SingleFlight instance."""
+    return _default.do(key, fn, *args, fresh_for=fresh_for, cacheable=cacheable, **kwargs)
@@ -0,0 +1,321 @@
+"""
+State Store
+Single embedded SQLite database for the bot's persistent state, replacing the JSON files
+that were rewritten whole on every change.
+
+- subscribers: (list, channel, chat_id) rows — "daily_report" / "alerts" lists for the
+  "telegram" and "discord" frontends; subscribe/unsubscribe is one indexed INSERT/DELETE,
+  so concurrent /subscribe commands can no longer lose each other's updates
+- kv: small JSON values keyed by name (scheduler last-run dates, user preferences, ...)
+- seen: dedupe keys with timestamps for the breaking-news scanner (see seen_store.py)
+- symbol_queries: symbols users asked about and when (for the pre-open cache warmer)
+
+Every write is its own transaction. The database runs in WAL mode, so the Telegram and
+Discord processes can share it, and readers never block the writer.
+
+The first open migrates the legacy files (subscribers.json, alert_subscribers.json, their
+discord_* variants, scheduler_state.json and seen_breaking_news.json/.jsonl) exactly once;
+the JSON files are left in place untouched.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+DB_FILE = os.path.join(DATA_DIR, "state.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscribers (
+    list       TEXT NOT NULL,
+    channel    TEXT NOT NULL,
+    chat_id    INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (list, channel, chat_id)
+);
+CREATE TABLE IF NOT EXISTS kv (
+    key        TEXT PRIMARY KEY,
+    value      TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seen (
+    scope TEXT NOT NULL,
+    key   TEXT NOT NULL,
+    ts    REAL NOT NULL,
+    PRIMARY KEY (scope, key)
+);
+CREATE INDEX IF NOT EXISTS seen_scope_ts ON seen (scope, ts);
+CREATE TABLE IF NOT EXISTS symbol_queries (
+    symbol  TEXT PRIMARY KEY,
+    query   TEXT NOT NULL,
+    last_at REAL NOT NULL,
+    hits    INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS symbol_queries_last_at ON symbol_queries (last_at);
+CREATE TABLE IF NOT EXISTS migrations (
+    name       TEXT PRIMARY KEY,
+    applied_at REAL NOT NULL
+);
+"""
+
+# Legacy JSON subscriber files: (file name, list, channel)
+LEGACY_SUBSCRIBER_FILES = [
+    ("subscribers.json", "daily_report", "telegram"),
+    ("alert_subscribers.json", "alerts", "telegram"),
+    ("discord_subscribers.json", "daily_report", "discord"),
+    ("discord_alert_subscribers.json", "alerts", "discord"),
+]
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def get_connection(path: str = None) -> sqlite3.Connection:
+    """Per-thread connection to the state database (schema + migrations applied on first use)."""
+    path = path or DB_FILE
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        conn = conns[path] = _connect(path)
+        with _init_lock:
+            if path not in _initialized:
+                conn.executescript(SCHEMA)
+                _migrate_legacy_files(conn, os.path.dirname(path))
+                _initialized.add(path)
+    return conn
+
+
+@contextmanager
+def transaction(path: str = None):
+    """BEGIN IMMEDIATE ... COMMIT (ROLLBACK on error) on this thread's connection."""
+    conn = get_connection(path)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+# ---------------------------------------------------------
+# SUBSCRIBERS
+# ---------------------------------------------------------
+
+def add_subscriber(list_name: str, channel: str, chat_id: int) -> bool:
+    """Adds a chat to a subscriber list. Returns False if it was already subscribed."""
+    cur = get_connection().execute(
+        "INSERT OR IGNORE INTO subscribers (list, channel, chat_id, created_at) VALUES (?, ?, ?, ?)",
+        (list_name, channel, int(chat_id), time.time())
+    )
+    return cur.rowcount > 0
+
+
+def remove_subscriber(list_name: str, channel: str, chat_id: int) -> bool:
+    """Removes a chat from a subscriber list. Returns False if it wasn't subscribed."""
+    cur = get_connection().execute(
+        "DELETE FROM subscribers WHERE list = ? AND channel = ? AND chat_id = ?",
+        (list_name, channel, int(chat_id))
+    )
+    return cur.rowcount > 0
+
+
+def list_subscribers(list_name: str, channel: str) -> List[int]:
+    """Chat ids on a subscriber list, in subscription order."""
+    rows = get_connection().execute(
+        "SELECT chat_id FROM subscribers WHERE list = ? AND channel = ? ORDER BY created_at, rowid",
+        (list_name, channel)
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def is_subscribed(list_name: str, channel: str, chat_id: int) -> bool:
+    row = get_connection().execute(
+        "SELECT 1 FROM subscribers WHERE list = ? AND channel = ? AND chat_id = ?",
+        (list_name, channel, int(chat_id))
+    ).fetchone()
+    return row is not None
+
+
+# ---------------------------------------------------------
+# KEY-VALUE STATE
+# ---------------------------------------------------------
+
+def get_state(key: str, default: Any = None) -> Any:
+    row = get_connection().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return default
+    try:
+        return json.loads(row[0])
+    except ValueError:
+        return default
+
+
+def set_state(key: str, value: Any):
+    get_connection().execute(
+        "INSERT INTO kv (key, value, updated_at) VALUES (?, ?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+        (key, json.dumps(value), time.time())
+    )
+
+
+def delete_state(key: str):
+    get_connection().execute("DELETE FROM kv WHERE key = ?", (key,))
+
+
+# ---------------------------------------------------------
+# SEEN KEYS (dedupe)
+# ---------------------------------------------------------
+
+def load_seen(scope: str, since: float, limit: int) -> List[Tuple[str, float]]:
+    """The newest `limit` keys of a scope recorded after `since`, oldest first."""
+    rows = get_connection().execute(
+        "SELECT key, ts FROM (SELECT key, ts FROM seen WHERE scope = ? AND ts >= ? ORDER BY ts DESC LIMIT ?) "
+        "ORDER BY ts",
+        (scope, since, limit)
+    ).fetchall()
+    return [(k, ts) for k, ts in rows]
+
+
+def save_seen(scope: str, entries: Iterable[Tuple[str, float]]):
+    with transaction() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO seen (scope, key, ts) VALUES (?, ?, ?)",
+            [(scope, k, ts) for k, ts in entries]
+        )
+
+
+def prune_seen(scope: str, before: float, keep: int) -> int:
+    """Deletes keys older than `before`, and all but the newest `keep`. Returns rows deleted."""
+    with transaction() as conn:
+        deleted = conn.execute("DELETE FROM seen WHERE scope = ? AND ts < ?", (scope, before)).rowcount
+        deleted += conn.execute(
+            "DELETE FROM seen WHERE scope = ? AND ts < ("
+            "SELECT ts FROM seen WHERE scope = ? ORDER BY ts DESC LIMIT 1 OFFSET ?)",
+            (scope, scope, keep)
+        ).rowcount
+    return deleted
+
+
+# ---------------------------------------------------------
+# SYMBOL QUERIES
+# ---------------------------------------------------------
+
+def record_symbol_query(symbol: str, query: str):
+    get_connection().execute(
+        "INSERT INTO symbol_queries (symbol, query, last_at, hits) VALUES (?, ?, ?, 1) "
+        "ON CONFLICT(symbol) DO UPDATE SET query = excluded.query, last_at = excluded.last_at, hits = hits + 1",
+        (symbol, query, time.time())
+    )
+
+
+def recent_symbol_queries(since: float) -> List[Tuple[str, str]]:
+    """(symbol, last query text) for every symbol asked about after `since`, most asked first."""
+    rows = get_connection().execute(
+        "SELECT symbol, query FROM symbol_queries WHERE last_at >= ? ORDER BY hits DESC", (since,)
+    ).fetchall()
+    return [(symbol, query) for symbol, query in rows]
+
+
+# ---------------------------------------------------------
+# MIGRATION FROM JSON FILES
+# ---------------------------------------------------------
+
+def _migrate_legacy_files(conn: sqlite3.Connection, data_dir: str):
+    steps = [
+        ("json_subscribers", _migrate_subscribers),
+        ("json_scheduler_state", _migrate_scheduler_state),
+        ("json_seen_news", _migrate_seen_news),
+    ]
+    for name, step in steps:
+        try:
+            # Checked inside the write transaction, so two processes starting together migrate once
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM migrations WHERE name = ?", (name,)).fetchone():
+                conn.execute("COMMIT")
+                continue
+            count = step(conn, data_dir)
+            conn.execute("INSERT INTO migrations (name, applied_at) VALUES (?, ?)", (name, time.time()))
+            conn.execute("COMMIT")
+            if count:
+                logger.info(f"State store migration {name}: imported {count} records")
+        except Exception as e:
+            conn.execute("ROLLBACK")
+            logger.error(f"State store migration {name} failed (will retry on next start): {e}")
+
+
+def _read_json(path: str):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _migrate_subscribers(conn: sqlite3.Connection, data_dir: str) -> int:
+    count = 0
+    for filename, list_name, channel in LEGACY_SUBSCRIBER_FILES:
+        data = _read_json(os.path.join(data_dir, filename)) or {}
+        base = time.time()
+        for i, chat_id in enumerate(data.get("chat_ids", [])):
+            # Offsets keep the original list order
+            count += conn.execute(
+                "INSERT OR IGNORE INTO subscribers (list, channel, chat_id, created_at) VALUES (?, ?, ?, ?)",
+                (list_name, channel, int(chat_id), base + i * 1e-3)
+            ).rowcount
+    return count
+
+
+def _migrate_scheduler_state(conn: sqlite3.Connection, data_dir: str) -> int:
+    data = _read_json(os.path.join(data_dir, "scheduler_state.json")) or {}
+    if not data.get("last_run_date"):
+        return 0
+    # The JSON file was shared by both frontends; each now keeps its own run date
+    for channel in ("telegram", "discord"):
+        conn.execute(
+            "INSERT OR IGNORE INTO kv (key, value, updated_at) VALUES (?, ?, ?)",
+            (f"daily_report.last_run_date.{channel}", json.dumps(data["last_run_date"]), time.time())
+        )
+    return 2
+
+
+def _migrate_seen_news(conn: sqlite3.Connection, data_dir: str) -> int:
+    from capabilities.seen_store import article_keys
+
+    entries = []
+    log_path = os.path.join(data_dir, "seen_breaking_news.jsonl")
+    legacy_path = os.path.join(data_dir, "seen_breaking_news.json")
+    if os.path.exists(log_path):
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                    entries.append((rec["k"], float(rec["t"])))
+                except Exception:
+                    continue
+    elif os.path.exists(legacy_path):
+        # The old {"seen_urls": [...]} file has no timestamps: stamp with its mtime
+        stamp = os.path.getmtime(legacy_path)
+        for url in (_read_json(legacy_path) or {}).get("seen_urls", []):
+            entries += [(k, stamp) for k in article_keys({"url": url})]
+    conn.executemany(
+        "INSERT OR REPLACE INTO seen (scope, key, ts) VALUES ('breaking_news', ?, ?)", entries
+    )
+    return len(entries)
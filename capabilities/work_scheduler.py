@@ -0,0 +1,137 @@
+"""
+Work Scheduler
+Runs user requests on per-priority-class thread pools with per-user quotas, so a few
+expensive requests can't starve cheap ones.
+
+- Each message is classified up front (local intent classifier, then keywords):
+    quote    - price / calendar lookups             (cheapest, most concurrency)
+    standard - technical, news, social, dashboards, general chat
+    heavy    - deep research, sector scan, geopolitical impact, IPO analysis
+               (each fans out into 5-20 inner threads and one or more long LLM calls)
+- Every class has its own bounded pool: heavy work queues behind heavy work only,
+  while quotes keep their own threads and stay fast under load
+- Per-user quotas cap how many requests (and how many heavy ones) one user can have
+  in flight; extra requests are refused with a friendly message instead of queued
+- Requests run inside the LLM gateway's `work_class_scope`, so a quote's summary call
+  gets a reserved gateway slot instead of queueing behind research calls
+"""
+
+import asyncio
+import functools
+import logging
+import concurrent.futures
+from collections import Counter
+
+from providers.llm_gateway import work_class_scope
+
+logger = logging.getLogger(__name__)
+
+CLASS_CONCURRENCY = {"quote": 8, "standard": 6, "heavy": 2}
+
+INTENT_CLASSES = {
+    "market": "quote",
+    "calendar": "quote",
+    "technical": "standard",
+    "news": "standard",
+    "social": "standard",
+    "news_sentiment": "standard",
+    "premarket": "standard",
+    "alerts": "standard",
+    "gaps": "standard",
+    "general": "standard",
+    "deep_research": "heavy",
+    "sector_scan": "heavy",
+    "geopolitical_impact": "heavy",
+    "ipo": "heavy",
+}
+
+USER_MAX_IN_FLIGHT = 3
+USER_MAX_HEAVY = 1
+
+
+class QuotaExceeded(Exception):
+    """Raised by submit() when the user already has too much work in flight."""
+
+
+def classify_request(text: str) -> str:
+    """Priority class for a raw message, decided without any network call."""
+    from agent import detect_script_intent
+    from capabilities.intent_classifier import get_model, LLM_ONLY_INTENTS
+
+    intent = detect_script_intent(text)
+    # Runs on the event loop: never trains the model here (keywords only until it's ready)
+    model = get_model(wait=False)
+    if intent is None and model is not None:
+        try:
+            predicted, confidence = model.predict(text)
+            if confidence >= 0.6 or predicted in LLM_ONLY_INTENTS:
+                intent = predicted
+        except Exception:
+            pass
+    # Single bare words ("RELIANCE") are treated as quotes by handle_user_message
+    if intent is None and len(text.split()) == 1:
+        intent = "market"
+    return INTENT_CLASSES.get(intent, "standard")
+
+
+class WorkScheduler:
+    """Per-class thread pools plus per-user in-flight accounting (used from the event loop thread)."""
+
+    def __init__(self, class_concurrency: dict = None):
+        limits = class_concurrency or CLASS_CONCURRENCY
+        self._pools = {
+            cls: concurrent.futures.ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"work-{cls}")
+            for cls, n in limits.items()
+        }
+        self._in_flight = Counter()  # user -> requests
+        self._heavy = Counter()      # user -> heavy requests
+        self._queued = Counter()     # class -> requests submitted but not finished
+
+    def submit(self, user_id, text: str, fn, *args) -> asyncio.Future:
+        """
+        Schedules fn(*args) on the pool for `text`'s priority class and returns an
+        awaitable future. Raises QuotaExceeded if the user is over quota.
+        """
+        cls = classify_request(text)
+        if self._in_flight[user_id] >= USER_MAX_IN_FLIGHT:
+            raise QuotaExceeded(
+                f"⏳ You already have {self._in_flight[user_id]} requests running. "
+                "Please wait for one to finish before sending another."
+            )
+        if cls == "heavy" and self._heavy[user_id] >= USER_MAX_HEAVY:
+            raise QuotaExceeded(
+                "⏳ Your previous in-depth analysis (research / sector scan / geopolitical / IPO) is still running. "
+                "Quick price and news questions still work meanwhile."
+            )
+
+        self._in_flight[user_id] += 1
+        if cls == "heavy":
+            self._heavy[user_id] += 1
+        self._queued[cls] += 1
+        logger.info(f"Scheduled {cls} request for {user_id} ({self._queued[cls]} {cls} in flight)")
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._pools[cls], functools.partial(_run_as, cls, fn, *args))
+        future.add_done_callback(lambda _: self._release(user_id, cls))
+        return future
+
+    def stats(self) -> dict:
+        return {"in_flight_by_class": dict(self._queued), "users_in_flight": sum(1 for v in self._in_flight.values() if v)}
+
+    def _release(self, user_id, cls: str):
+        self._in_flight[user_id] -= 1
+        if self._in_flight[user_id] <= 0:
+            del self._in_flight[user_id]
+        if cls == "heavy":
+            self._heavy[user_id] -= 1
+            if self._heavy[user_id] <= 0:
+                del self._heavy[user_id]
+        self._queued[cls] -= 1
+
+
+def _run_as(cls: str, fn, *args):
+    with work_class_scope(cls):
+        return fn(*args)
+
+
+work_scheduler = WorkScheduler()
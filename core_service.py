@@ -0,0 +1,92 @@
+"""
+Core engine process shared by the Telegram (main.py) and Discord (discord_main.py) bots.
+
+Runs the breaking-news scanner and daily report generation once and publishes the results
+to every connected frontend over the local IPC channel (see capabilities/core_ipc.py).
+Start it before the bots:
+
+    python core_service.py
+    python main.py
+    python discord_main.py
+
+Without it, each bot runs its own embedded engine as before.
+"""
+
+import asyncio
+import logging
+import functools
+
+from capabilities import state_store
+from capabilities.core_ipc import CoreHub
+from capabilities.daily_report import get_ist_now
+from capabilities.job_scheduler import job_scheduler
+from capabilities.market_samplers import register_market_jobs
+from providers.ipo_updater import register_ipo_registry_job
+from capabilities.realtime_scanner import register_breaking_news_job
+from capabilities.report_cache import (
+    get_report,
+    register_prebuild_job,
+    BROADCAST_MAX_AGE,
+    BROADCAST_CRON,
+    BROADCAST_CATCH_UP
+)
+
+logging.basicConfig(
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+LAST_RUN_KEY = "daily_report.last_run_date.core"
+
+
+async def publish_daily_report(hub: CoreHub):
+    ist_now = get_ist_now()
+    today_str = ist_now.strftime("%Y-%m-%d")
+    last_run = state_store.get_state(LAST_RUN_KEY, "")
+
+    # If the current time (IST) is >= 08:50 AM, and we haven't run today yet
+    if (ist_now.hour > 8 or (ist_now.hour == 8 and ist_now.minute >= 50)) and last_run != today_str:
+        logger.info(f"Daily report for {today_str} hasn't been published yet. Triggering report...")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, lambda: get_report(BROADCAST_MAX_AGE, allow_stale=False))
+        state_store.set_state(LAST_RUN_KEY, today_str)
+        # Only the date: frontends resolve the file under REPORTS_DIR themselves
+        await hub.publish({"type": "daily_report", "date": today_str})
+
+
+def register_jobs(hub: CoreHub):
+    """Every recurring job of the engine runs here, on the one job scheduler."""
+    async def on_alert(text: str):
+        await hub.publish({"type": "breaking_alert", "text": text})
+
+    register_prebuild_job(job_scheduler)
+    job_scheduler.add_cron(
+        "daily_report.publish", functools.partial(publish_daily_report, hub),
+        BROADCAST_CRON, catch_up=BROADCAST_CATCH_UP, retry_delay=60
+    )
+    register_breaking_news_job(job_scheduler, on_alert=on_alert)
+    register_market_jobs(job_scheduler)
+    register_ipo_registry_job(job_scheduler)
+
+
+async def run_core():
+    hub = CoreHub()
+    await hub.start()
+    register_jobs(hub)
+    try:
+        await job_scheduler.run()
+    finally:
+        await hub.close()
+
+
+def main():
+    logger.info("Core service starting...")
+    try:
+        asyncio.run(run_core())
+    except KeyboardInterrupt:
+        logger.info("Core service stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,40 @@
-import os
 import asyncio
 import logging
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 
 from config import DISCORD_BOT_TOKEN
 from agent import handle_user_message
+from capabilities.work_scheduler import work_scheduler, QuotaExceeded
+from capabilities.broadcast import broadcast
 from capabilities.daily_report import (
     add_subscriber,
     remove_subscriber,
-    generate_daily_report,
     load_subscribers,
     get_last_run_date,
     save_last_run_date,
     get_ist_now
 )
+from capabilities.core_ipc import run_core_client, EmbeddedEngine
+from capabilities.job_scheduler import job_scheduler, format_job_stats
+from capabilities.admin import is_admin
+from capabilities.intent_classifier import get_model
+from capabilities.market_samplers import register_market_jobs, register_quote_refresher
+from providers.ipo_updater import register_ipo_registry_job
+from capabilities.cache_warmer import register_cache_warmer_job
+from providers.chittorgarh import register_ipo_page_jobs
+from capabilities.report_cache import (
+    get_report,
+    needs_build,
+    published_report_path,
+    register_prebuild_job,
+    BROADCAST_MAX_AGE,
+    BROADCAST_CRON,
+    BROADCAST_CATCH_UP
+)
 from capabilities.realtime_scanner import (
-    realtime_breaking_news_task,
+    register_breaking_news_job,
+    broadcast_breaking_alert,
     add_alert_subscriber,
     remove_alert_subscriber
 )
@@ -25,8 +43,8 @@ import capabilities.daily_report as dr
 import capabilities.realtime_scanner as rs
 
 # Isolate Discord subscribers from Telegram subscribers
-dr.SUBSCRIBERS_FILE = os.path.join(os.path.dirname(os.path.dirname(dr.__file__)), "data", "discord_subscribers.json")
-rs.ALERT_SUBSCRIBERS_FILE = os.path.join(os.path.dirname(os.path.dirname(rs.__file__)), "data", "discord_alert_subscribers.json")
+dr.SUBSCRIBER_CHANNEL = "discord"
+rs.SUBSCRIBER_CHANNEL = "discord"
 
 # Enable logging
 logging.basicConfig(
@@ -45,22 +63,22 @@ bot = commands.Bot(command_prefix='/', intents=intents, help_command=None)
 # MOCK TELEGRAM APP TO REUSE EXISTING SCANNERS UNMODIFIED
 # ---------------------------------------------------------
 class MockTelegramBot:
+    # Broadcasts through this adapter use Discord's rate limits and error handling
+    platform = "discord"
+
     def __init__(self, discord_bot):
         self._discord_bot = discord_bot
 
     async def send_message(self, chat_id, text, parse_mode=None):
-        try:
-            # chat_id can be a user ID or a channel ID
-            target = self._discord_bot.get_user(int(chat_id)) or self._discord_bot.get_channel(int(chat_id))
-            if not target:
-                # If user isn't cached, try fetching
-                target = await self._discord_bot.fetch_user(int(chat_id))
-            
-            if target:
-                # Discord handles markdown natively, no parse_mode needed
-                await target.send(text)
-        except Exception as e:
-            logger.error(f"Discord MockBot send_message failed for {chat_id}: {e}")
+        # chat_id can be a user ID or a channel ID
+        target = self._discord_bot.get_user(int(chat_id)) or self._discord_bot.get_channel(int(chat_id))
+        if not target:
+            # If user isn't cached, try fetching (raises NotFound for deleted users)
+            target = await self._discord_bot.fetch_user(int(chat_id))
+
+        # Discord handles markdown natively, no parse_mode needed.
+        # Errors propagate so the broadcast engine can retry or drop the recipient.
+        await target.send(text)
 
 class MockTelegramApplication:
     def __init__(self, discord_bot):
@@ -69,8 +87,7 @@ class MockTelegramApplication:
 # ---------------------------------------------------------
 # BACKGROUND TASKS
 # ---------------------------------------------------------
-@tasks.loop(minutes=1.0)
-async def daily_report_scheduler():
+async def check_and_run_daily_report():
     ist_now = get_ist_now()
     today_str = ist_now.strftime("%Y-%m-%d")
     last_run = get_last_run_date()
@@ -81,36 +98,82 @@ async def daily_report_scheduler():
         save_last_run_date(today_str)
         try:
             loop = asyncio.get_running_loop()
-            report_path = await loop.run_in_executor(None, generate_daily_report)
-            
-            subscribers = load_subscribers()
-            if not subscribers:
-                return
-            
-            caption = "📊 **Daily Market Impact Report**\n\nHere is your daily report on how latest news and events can affect stocks and ETFs."
-            
-            for chat_id in subscribers:
-                try:
-                    target = bot.get_user(int(chat_id)) or bot.get_channel(int(chat_id))
-                    if not target:
-                        target = await bot.fetch_user(int(chat_id))
-                    if target:
-                        await target.send(content=caption, file=discord.File(report_path))
-                except Exception as e:
-                    logger.error(f"Error sending report to {chat_id}: {e}")
-                    
-        except Exception as e:
-            logger.error(f"Failed to run daily report: {e}")
-            save_last_run_date(last_run) # reset so it tries again
+            artifact = await loop.run_in_executor(None, lambda: get_report(BROADCAST_MAX_AGE, allow_stale=False))
+            await send_daily_report(artifact.path)
+        except Exception:
+            save_last_run_date(last_run) # reset so the job's retry sends it
+            raise
+
+async def send_daily_report(report_path: str):
+    subscribers = load_subscribers()
+    if not subscribers:
+        return
+    
+    caption = "📊 **Daily Market Impact Report**\n\nHere is your daily report on how latest news and events can affect stocks and ETFs."
+    
+    async def send_report(chat_id):
+        target = bot.get_user(int(chat_id)) or bot.get_channel(int(chat_id))
+        if not target:
+            target = await bot.fetch_user(int(chat_id))
+        if target:
+            await target.send(content=caption, file=discord.File(report_path))
+
+    await broadcast(subscribers, send_report, label="discord daily report", platform="discord")
+
+async def on_core_daily_report(event: dict):
+    """Delivers the report published by the core service (once per day, even if replayed)."""
+    today_str = get_ist_now().strftime("%Y-%m-%d")
+    last_run = get_last_run_date()
+    if event.get("date") != today_str or last_run == today_str:
+        return
+    report_path = published_report_path(event["date"])
+    if not report_path:
+        logger.error(f"Core announced the {today_str} report but no report file exists")
+        return
+    save_last_run_date(today_str)
+    try:
+        await send_daily_report(report_path)
+    except Exception as e:
+        logger.error(f"Failed to send daily report: {e}")
+        save_last_run_date(last_run)
+
+def start_embedded_engine():
+    # Pre-build at 08:30, broadcast at 08:50 (caught up later in the day if the bot was down)
+    register_prebuild_job(job_scheduler)
+    job_scheduler.add_cron(
+        "daily_report.discord", check_and_run_daily_report,
+        BROADCAST_CRON, catch_up=BROADCAST_CATCH_UP, retry_delay=60
+    )
+    register_breaking_news_job(job_scheduler, MockTelegramApplication(bot))
+    register_market_jobs(job_scheduler)
+    register_ipo_registry_job(job_scheduler)
+
+_core_started = False
 
 @bot.event
 async def on_ready():
+    global _core_started
     logger.info(f"Discord Bot is online as {bot.user}")
-    daily_report_scheduler.start()
-    
-    # Start the realtime news scanner as a background task
+    # on_ready fires again after every gateway reconnect; start background work only once
+    if _core_started:
+        return
+    _core_started = True
+    bot.loop.create_task(job_scheduler.run())
+    # Caches are per process, so every bot warms its own, with or without the core service
+    register_cache_warmer_job(job_scheduler)
+    register_quote_refresher(job_scheduler)
+    register_ipo_page_jobs(job_scheduler)
+    # Train the local intent model in the background before the first message arrives
+    get_model(wait=False)
+
+    # Subscribe to the shared core service; runs the engine in-process if it isn't running
     mock_app = MockTelegramApplication(bot)
-    bot.loop.create_task(realtime_breaking_news_task(mock_app))
+    handlers = {
+        "breaking_alert": lambda event: broadcast_breaking_alert(mock_app, event["text"]),
+        "daily_report": on_core_daily_report,
+    }
+    engine = EmbeddedEngine(job_scheduler, start_embedded_engine)
+    bot.loop.create_task(run_core_client("discord", handlers, on_unavailable=engine.start, on_available=engine.stop))
 
 # ---------------------------------------------------------
 # COMMANDS
@@ -171,12 +234,34 @@ async def stop_market_alert_cmd(ctx):
     else:
         await ctx.send("ℹ️ You were not subscribed.")
 
+@bot.command(name='llm_stats')
+async def llm_stats_cmd(ctx, hours: float = 24):
+    if not is_admin(ctx.author.id):
+        await ctx.send("⛔ This command is only available to bot admins.")
+        return
+    from providers.llm_metrics import format_llm_stats
+    text = format_llm_stats(hours)
+    for i in range(0, len(text), 1900):
+        await ctx.send(f"```\n{text[i:i+1900]}\n```")
+
+@bot.command(name='jobs')
+async def jobs_cmd(ctx):
+    if not is_admin(ctx.author.id):
+        await ctx.send("⛔ This command is only available to bot admins.")
+        return
+    text = format_job_stats()
+    for i in range(0, len(text), 1900):
+        await ctx.send(f"```\n{text[i:i+1900]}\n```")
+
 @bot.command(name='report')
 async def report_cmd(ctx):
-    status_msg = await ctx.send("⏳ **Generating the latest market impact report on-demand...** This may take a minute.\n(Fetching global markets, NSE data, options, news in parallel...)")
+    status_msg = None
+    if needs_build():
+        status_msg = await ctx.send("⏳ **Generating the latest market impact report on-demand...** This may take a minute.\n(Fetching global markets, NSE data, options, news in parallel...)")
     try:
         loop = asyncio.get_running_loop()
-        report_path = await loop.run_in_executor(None, generate_daily_report)
+        artifact = await loop.run_in_executor(None, get_report)
+        report_path = artifact.path
 
         # Send a quick dashboard preview as text (readable in Discord mobile)
         dashboard_preview = ""
@@ -195,7 +280,8 @@ async def report_cmd(ctx):
 
         caption = "📊 **Full Daily Market Intelligence Report** (attached below)"
         await ctx.send(content=caption, file=discord.File(report_path))
-        await status_msg.delete()
+        if status_msg:
+            await status_msg.delete()
     except Exception as e:
         logger.error(f"Error generating on-demand report: {e}")
         await ctx.send(f"❌ Failed to generate report: {e}")
@@ -234,11 +320,16 @@ async def on_message(message):
         else:
             msg = "⏳ **Analyzing...**"
             
+        try:
+            handler_task = work_scheduler.submit(message.author.id, user_text, handle_user_message, user_text)
+        except QuotaExceeded as e:
+            await message.channel.send(str(e))
+            return
+
         status_message = await message.channel.send(msg)
 
         try:
-            loop = asyncio.get_running_loop()
-            reply = await loop.run_in_executor(None, handle_user_message, user_text)
+            reply = await handler_task
             
             # Clean up interim status message
             await status_message.delete()
@@ -1,5 +1,7 @@
 import logging
+import functools
 import socket
+import threading
 import time
 from telegram import Update
 from telegram.ext import (
@@ -13,22 +15,41 @@ from telegram.request import HTTPXRequest
 
 from config import BOT_TOKEN, PROXY_URL
 from agent import handle_user_message
+from capabilities.work_scheduler import work_scheduler, QuotaExceeded
+from capabilities.broadcast import broadcast_document
 import os
 import asyncio
 from capabilities.daily_report import (
     add_subscriber,
     remove_subscriber,
-    generate_daily_report,
     load_subscribers,
     get_last_run_date,
     save_last_run_date,
     get_ist_now
 )
+from capabilities.report_cache import (
+    get_report,
+    needs_build,
+    published_report_path,
+    register_prebuild_job,
+    BROADCAST_MAX_AGE,
+    BROADCAST_CRON,
+    BROADCAST_CATCH_UP
+)
 from capabilities.realtime_scanner import (
-    realtime_breaking_news_task,
+    register_breaking_news_job,
+    broadcast_breaking_alert,
     add_alert_subscriber,
     remove_alert_subscriber
 )
+from capabilities.core_ipc import run_core_client, EmbeddedEngine
+from capabilities.job_scheduler import job_scheduler, format_job_stats
+from capabilities.admin import is_admin
+from capabilities.intent_classifier import get_model
+from capabilities.market_samplers import register_market_jobs, register_quote_refresher
+from providers.ipo_updater import register_ipo_registry_job
+from capabilities.cache_warmer import register_cache_warmer_job
+from providers.chittorgarh import register_ipo_page_jobs
 
 # Enable logging
 logging.basicConfig(
@@ -44,6 +65,11 @@ logger = logging.getLogger(__name__)
 # Track last network error log time to avoid flooding the console
 _last_network_error_log = 0
 
+# Telegram has a 4096 char limit per message — replies are split into chunks of MAX_LEN
+MAX_LEN = 4000
+# Minimum seconds between progressive edits of a streamed reply (Telegram rate-limits edits)
+STREAM_EDIT_INTERVAL = 1.5
+
 
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Log errors but suppress repeated NetworkError floods (log at most once per 60s)."""
@@ -99,80 +125,143 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(welcome_text, parse_mode='Markdown')
 
 
+def split_message(text: str, max_len: int = MAX_LEN) -> list:
+    """Splits text into chunks of at most max_len chars, on newlines where possible."""
+    chunks = []
+    current = ""
+    for line in text.splitlines(keepends=True):
+        # A single line longer than the limit is hard-wrapped
+        while len(line) > max_len:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:max_len])
+            line = line[max_len:]
+        if len(current) + len(line) > max_len:
+            if current:
+                chunks.append(current)
+            current = line
+        else:
+            current += line
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class TelegramStreamer:
+    """
+    Mirrors a growing reply into the chat. The agent thread appends text fragments via
+    on_delta(); sync() edits the already-sent messages in place (and sends new ones as
+    the text crosses each MAX_LEN boundary), skipping chunks that haven't changed, and
+    deletes any sent messages beyond the last chunk.
+    """
+
+    def __init__(self, message):
+        self.message = message
+        self._parts = []
+        self._lock = threading.Lock()
+        self._sent = []  # [(telegram Message, text currently shown)]
+
+    def on_delta(self, text: str):
+        with self._lock:
+            self._parts.append(text)
+
+    def text(self) -> str:
+        with self._lock:
+            return "".join(self._parts)
+
+    def adopt(self, status_message, shown_text: str):
+        """Reuses the 'please stand by' message as the first chunk of the reply."""
+        self._sent = [(status_message, shown_text)]
+
+    async def sync(self, text: str):
+        chunks = split_message(text)
+        for i, chunk in enumerate(chunks):
+            if i < len(self._sent):
+                msg, shown = self._sent[i]
+                if shown != chunk:
+                    await msg.edit_text(chunk)
+                    self._sent[i] = (msg, chunk)
+            else:
+                msg = await self.message.reply_text(chunk)
+                self._sent.append((msg, chunk))
+        # The final reply can be shorter than what was streamed: remove the extra messages
+        while len(self._sent) > len(chunks):
+            msg, _ = self._sent[-1]
+            await msg.delete()
+            self._sent.pop()
+
+
 async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    from telegram.error import BadRequest, RetryAfter
     user_text = update.message.text
-    
-    # Run the CPU/IO bound handler in an executor so we don't block the loop
-    loop = asyncio.get_running_loop()
-    handler_task = loop.run_in_executor(None, handle_user_message, user_text)
-    
-    # Wait for either the handler to finish or 5 seconds to pass
-    status_message = None
+    streamer = TelegramStreamer(update.message)
+
+    # Run the CPU/IO bound handler on the work scheduler's pool for its priority class,
+    # so we don't block the loop. LLM text streams back through streamer.on_delta.
     try:
-        done, pending = await asyncio.wait(
-            [handler_task],
-            timeout=5.0
+        handler_task = work_scheduler.submit(
+            update.effective_user.id, user_text, handle_user_message, user_text, streamer.on_delta
         )
-        
-        if handler_task in pending:
-            # If it takes more than 5 seconds, send a status update message
-            lower_text = user_text.lower()
-            if any(k in lower_text for k in ["research", "deep dive", "everything about", "detailed"]):
-                msg = "🔍 *Running deep research...* Gathering fundamentals, technical signals, news, and sentiment in parallel. This may take 10-15 seconds."
-            elif any(k in lower_text for k in ["ipo", "listing", "drhp"]):
-                msg = "⏳ *Analyzing IPO details...* Fetching DRHP documents, financial statements, and analyzing risks. Please stand by."
-            elif any(k in lower_text for k in ["war", "conflict", "sanction", "middle east", "russia", "ukraine", "iran", "israel", "trade war", "tariff"]):
-                msg = "🌍 *Analyzing geopolitical impact...* Fetching live prices for affected sectors, event news, and synthesizing winners vs losers. Please stand by (30-60 seconds)."
-            elif any(k in lower_text for k in ["sector", "scan", "list 3", "grow this week"]):
-                msg = "🔎 *Scanning sectors and stocks...* Analyzing technical indicators, trends, and news in parallel for all 35 sector stocks. Please stand by."
-            elif any(k in lower_text for k in ["alert", "overnight"]):
-                msg = "🔔 *Scanning overnight news and alerts...* Please stand by."
-            elif any(k in lower_text for k in ["premarket", "dashboard", "gift nifty"]):
-                msg = "📈 *Fetching Pre-Market Dashboard...* Checking global cues and GIFT Nifty."
-            elif any(k in lower_text for k in ["gap", "gap-up", "gap-down"]):
-                msg = "🚀 *Scanning for opening gap opportunities...* Please stand by."
-            else:
-                msg = "⏳ *Gathering data and generating analysis...* Please stand by."
-            
-            status_message = await update.message.reply_text(msg, parse_mode='Markdown')
-            
-            # Now wait for the handler task to complete fully
-            reply = await handler_task
-        else:
-            # Finished within 5 seconds
-            reply = handler_task.result()
-            
+    except QuotaExceeded as e:
+        await update.message.reply_text(str(e))
+        return
+
+    started = time.monotonic()
+    status_sent = False
+    try:
+        while not handler_task.done():
+            await asyncio.wait([handler_task], timeout=STREAM_EDIT_INTERVAL)
+            if handler_task.done():
+                break
+            partial = streamer.text()
+            if partial.strip():
+                try:
+                    await streamer.sync(partial)
+                except RetryAfter as e:
+                    await asyncio.sleep(e.retry_after)
+                except BadRequest as e:
+                    logger.debug(f"Skipped stream edit: {e}")
+            elif not status_sent and time.monotonic() - started >= 5.0:
+                # Nothing streamed after 5 seconds: send a status update message
+                status_sent = True
+                lower_text = user_text.lower()
+                if any(k in lower_text for k in ["research", "deep dive", "everything about", "detailed"]):
+                    msg = "🔍 *Running deep research...* Gathering fundamentals, technical signals, news, and sentiment in parallel. This may take 10-15 seconds."
+                elif any(k in lower_text for k in ["ipo", "listing", "drhp"]):
+                    msg = "⏳ *Analyzing IPO details...* Fetching DRHP documents, financial statements, and analyzing risks. Please stand by."
+                elif any(k in lower_text for k in ["war", "conflict", "sanction", "middle east", "russia", "ukraine", "iran", "israel", "trade war", "tariff"]):
+                    msg = "🌍 *Analyzing geopolitical impact...* Fetching live prices for affected sectors, event news, and synthesizing winners vs losers. Please stand by (30-60 seconds)."
+                elif any(k in lower_text for k in ["sector", "scan", "list 3", "grow this week"]):
+                    msg = "🔎 *Scanning sectors and stocks...* Analyzing technical indicators, trends, and news in parallel for all 35 sector stocks. Please stand by."
+                elif any(k in lower_text for k in ["alert", "overnight"]):
+                    msg = "🔔 *Scanning overnight news and alerts...* Please stand by."
+                elif any(k in lower_text for k in ["premarket", "dashboard", "gift nifty"]):
+                    msg = "📈 *Fetching Pre-Market Dashboard...* Checking global cues and GIFT Nifty."
+                elif any(k in lower_text for k in ["gap", "gap-up", "gap-down"]):
+                    msg = "🚀 *Scanning for opening gap opportunities...* Please stand by."
+                else:
+                    msg = "⏳ *Gathering data and generating analysis...* Please stand by."
+
+                status_message = await update.message.reply_text(msg, parse_mode='Markdown')
+                # The first streamed text (or the final reply) replaces the status message
+                streamer.adopt(status_message, msg)
+
+        reply = handler_task.result()
     except Exception as e:
         logger.error(f"Error handling message: {e}")
         reply = f"❌ An error occurred while parsing your request: {e}"
 
-    # Clean up interim status message first to keep chat clean
-    if status_message:
+    # The returned reply is authoritative: bring the streamed messages in line with it
+    for attempt in range(3):
         try:
-            await status_message.delete()
-        except Exception:
-            pass
-
-    # Telegram has a 4096 char limit per message — split long replies into chunks
-    MAX_LEN = 4000
-    if len(reply) <= MAX_LEN:
-        await update.message.reply_text(reply)
-    else:
-        # Split on newlines to avoid cutting mid-sentence
-        chunks = []
-        current = ""
-        for line in reply.splitlines(keepends=True):
-            if len(current) + len(line) > MAX_LEN:
-                if current:
-                    chunks.append(current)
-                current = line
-            else:
-                current += line
-        if current:
-            chunks.append(current)
-
-        for i, chunk in enumerate(chunks):
-            await update.message.reply_text(chunk)
+            await streamer.sync(reply or "I couldn't generate a response. Please try again.")
+            break
+        except RetryAfter as e:
+            await asyncio.sleep(e.retry_after)
+        except Exception as e:
+            logger.error(f"Error sending reply: {e}")
+            break
 
 
 async def subscribe(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -234,16 +323,43 @@ async def unsubscribe_alerts(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
 
 
+async def llm_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """LLM latency / token usage per call site. Optional argument: window in hours (default 24)."""
+    from providers.llm_metrics import format_llm_stats
+    if not is_admin(update.effective_user and update.effective_user.id):
+        await update.message.reply_text("⛔ This command is only available to bot admins.")
+        return
+    try:
+        hours = float(context.args[0]) if context.args else 24
+    except ValueError:
+        hours = 24
+    for chunk in split_message(format_llm_stats(hours)):
+        await update.message.reply_text(chunk)
+
+
+async def jobs(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Background jobs running in this process, with their timing."""
+    if not is_admin(update.effective_user and update.effective_user.id):
+        await update.message.reply_text("⛔ This command is only available to bot admins.")
+        return
+    for chunk in split_message(format_job_stats()):
+        await update.message.reply_text(chunk)
+
+
 async def report(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
-    status_msg = await update.message.reply_text(
-        "⏳ *Generating the latest market impact report on-demand...* This may take a minute.",
-        parse_mode="Markdown"
-    )
+    # The pre-built report is sent straight from the cache; only a stale one needs a status message
+    status_msg = None
+    if needs_build():
+        status_msg = await update.message.reply_text(
+            "⏳ *Generating the latest market impact report on-demand...* This may take a minute.",
+            parse_mode="Markdown"
+        )
     
     loop = asyncio.get_running_loop()
     try:
-        report_path = await loop.run_in_executor(None, generate_daily_report)
+        artifact = await loop.run_in_executor(None, get_report)
+        report_path = artifact.path
         caption = "📊 *Daily Market Impact Report (On-Demand)*\n\nHere is the latest analysis on how news can affect stocks and ETFs."
         
         with open(report_path, "rb") as document:
@@ -255,10 +371,11 @@ async def report(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 parse_mode="Markdown"
             )
         
-        try:
-            await status_msg.delete()
-        except Exception:
-            pass
+        if status_msg:
+            try:
+                await status_msg.delete()
+            except Exception:
+                pass
     except Exception as e:
         logger.error(f"Error generating on-demand report: {e}")
         await update.message.reply_text(f"❌ Failed to generate report: {e}")
@@ -266,8 +383,12 @@ async def report(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def run_and_send_daily_report(application):
     loop = asyncio.get_running_loop()
-    report_path = await loop.run_in_executor(None, generate_daily_report)
-    
+    # Normally the report pre-built at 08:30 is reused; it is only generated here if that failed
+    artifact = await loop.run_in_executor(None, lambda: get_report(BROADCAST_MAX_AGE, allow_stale=False))
+    await send_daily_report(application, artifact.path)
+
+
+async def send_daily_report(application, report_path: str):
     subscribers = load_subscribers()
     if not subscribers:
         logger.info("No subscribers found to send report to.")
@@ -275,20 +396,15 @@ async def run_and_send_daily_report(application):
         
     logger.info(f"Sending daily report to {len(subscribers)} subscribers...")
     caption = "📊 *Daily Market Impact Report*\n\nHere is your daily report on how latest news and events can affect stocks and ETFs."
-    
-    for chat_id in subscribers:
-        try:
-            with open(report_path, "rb") as document:
-                await application.bot.send_document(
-                    chat_id=chat_id,
-                    document=document,
-                    filename=os.path.basename(report_path),
-                    caption=caption,
-                    parse_mode="Markdown"
-                )
-            logger.info(f"Successfully sent report to chat_id {chat_id}")
-        except Exception as e:
-            logger.error(f"Error sending report to chat_id {chat_id}: {e}")
+
+    # Uploaded once, then fanned out by file_id in parallel under Telegram's rate limits
+    await broadcast_document(
+        application.bot, subscribers, report_path,
+        filename=os.path.basename(report_path),
+        caption=caption,
+        parse_mode="Markdown",
+        label="daily report"
+    )
 
 
 async def check_and_run_daily_report(application):
@@ -302,51 +418,74 @@ async def check_and_run_daily_report(application):
         save_last_run_date(today_str)
         try:
             await run_and_send_daily_report(application)
-        except Exception as e:
-            logger.error(f"Failed to run daily report: {e}")
-            # Reset run date state so it can retry
+        except Exception:
+            # Reset run date state so the job's retry sends it
             save_last_run_date(last_run)
+            raise
 
 
-async def daily_report_scheduler(application):
-    logger.info("Daily report scheduler task started.")
-    while True:
-        try:
-            await check_and_run_daily_report(application)
-        except Exception as e:
-            logger.error(f"Error in check_and_run_daily_report: {e}")
-        # Check every 60 seconds
-        await asyncio.sleep(60)
+async def on_core_daily_report(application, event: dict):
+    """Delivers the report published by the core service (once per day, even if replayed)."""
+    today_str = get_ist_now().strftime("%Y-%m-%d")
+    last_run = get_last_run_date()
+    if event.get("date") != today_str or last_run == today_str:
+        return
+    report_path = published_report_path(event["date"])
+    if not report_path:
+        logger.error(f"Core announced the {today_str} report but no report file exists")
+        return
+    save_last_run_date(today_str)
+    try:
+        await send_daily_report(application, report_path)
+    except Exception as e:
+        logger.error(f"Failed to send daily report: {e}")
+        save_last_run_date(last_run)
+
+
+def start_embedded_engine(application):
+    # Pre-build at 08:30, broadcast at 08:50 (caught up later in the day if the bot was down)
+    register_prebuild_job(job_scheduler)
+    job_scheduler.add_cron(
+        "daily_report.telegram", functools.partial(check_and_run_daily_report, application),
+        BROADCAST_CRON, catch_up=BROADCAST_CATCH_UP, retry_delay=60
+    )
+    register_breaking_news_job(job_scheduler, application)
+    register_market_jobs(job_scheduler)
+    register_ipo_registry_job(job_scheduler)
 
 
 async def post_init(application) -> None:
-    # Start the scheduler as a background task on the application's event loop
-    task = asyncio.create_task(daily_report_scheduler(application))
-    application.bot_data['scheduler_task'] = task
-    
-    rt_task = asyncio.create_task(realtime_breaking_news_task(application))
-    application.bot_data['rt_task'] = rt_task
+    application.bot_data['jobs_task'] = asyncio.create_task(job_scheduler.run())
+    # Caches are per process, so every bot warms its own, with or without the core service
+    register_cache_warmer_job(job_scheduler)
+    register_quote_refresher(job_scheduler)
+    register_ipo_page_jobs(job_scheduler)
+    # Train the local intent model in the background before the first message arrives
+    get_model(wait=False)
+
+    # Subscribe to the shared core service; runs the engine in-process if it isn't running
+    handlers = {
+        "breaking_alert": lambda event: broadcast_breaking_alert(application, event["text"]),
+        "daily_report": lambda event: on_core_daily_report(application, event),
+    }
+    engine = EmbeddedEngine(job_scheduler, lambda: start_embedded_engine(application))
+    core_task = asyncio.create_task(
+        run_core_client("telegram", handlers, on_unavailable=engine.start, on_available=engine.stop)
+    )
+    application.bot_data['core_task'] = core_task
 
 
 async def post_shutdown(application) -> None:
-    # Clean up the scheduler task during shutdown to avoid pending task warning
-    task = application.bot_data.get('scheduler_task')
-    if task:
-        logger.info("Cancelling daily report scheduler task...")
-        task.cancel()
-        try:
-            await task
-        except asyncio.CancelledError:
-            logger.info("Daily report scheduler task successfully cancelled.")
-            
-    rt_task = application.bot_data.get('rt_task')
-    if rt_task:
-        logger.info("Cancelling realtime news scanner task...")
-        rt_task.cancel()
-        try:
-            await rt_task
-        except asyncio.CancelledError:
-            logger.info("Realtime news scanner task successfully cancelled.")
+    # Cancel background tasks during shutdown to avoid pending task warnings
+    for key in ('core_task', 'jobs_task'):
+        task = application.bot_data.get(key)
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    logger.info("Background tasks cancelled.")
 
 
 def check_network() -> bool:
@@ -407,6 +546,8 @@ def main():
     app.add_handler(CommandHandler("report", report))
     app.add_handler(CommandHandler("breaking_market_alert", subscribe_alerts))
     app.add_handler(CommandHandler("stop_market_alert", unsubscribe_alerts))
+    app.add_handler(CommandHandler("llm_stats", llm_stats))
+    app.add_handler(CommandHandler("jobs", jobs))
     
     # Delegate remaining intent detection to the main text handler
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text))
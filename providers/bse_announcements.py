@@ -16,38 +16,47 @@ def fetch_latest_bse_announcements(limit: int = 15) -> list[dict]:
     Fetches the latest corporate announcements directly from the BSE India API.
     These are the raw filings submitted by companies before they hit the news.
     """
+    try:
+        return fetch_latest_bse_announcements_strict(limit)
+    except Exception as e:
+        logger.error(f"Failed to fetch BSE announcements: {e}")
+        return []
+
+
+def fetch_latest_bse_announcements_strict(limit: int = 15) -> list[dict]:
+    """Like `fetch_latest_bse_announcements`, but raises on network or HTTP errors.
+
+    Used by the adaptive feed scheduler, which needs to tell a quiet source
+    apart from a failing one.
+    """
     # The BSE API endpoint for announcements
     # strCat=-1 means all categories. strPrevDate and strToDate can be today's date.
     today_str = datetime.now().strftime("%Y%m%d")
     url = f"https://api.bseindia.com/BseIndiaAPI/api/AnnGetData/w?strCat=-1&strPrevDate={today_str}&strToDate={today_str}&strType=C&strData=all&strHCData=all"
     
     articles = []
-    try:
-        response = requests.get(url, headers=BSE_HEADERS, timeout=15)
-        if response.status_code == 200:
-            data = response.json()
-            if "Table" in data:
-                # Iterate through the latest announcements
-                for item in data["Table"][:limit]:
-                    company_name = item.get("SLONGNAME", "Unknown Company")
-                    headline = item.get("HEADLINE", "")
-                    details = item.get("MORE", "")
-                    time_submitted = item.get("NEWS_DT", "")
-                    
-                    # We only care about major announcements (ignore mundane updates like 'Trading Window Closed')
-                    ignore_keywords = ["trading window", "loss of share certificate", "issue of duplicate", "newspaper publication"]
-                    if any(k in headline.lower() or k in details.lower() for k in ignore_keywords):
-                        continue
-                        
-                    articles.append({
-                        "title": f"BSE FILING: {company_name} - {headline}",
-                        "description": details,
-                        "source": "BSE Corporate Announcements (Raw Filing)",
-                        "published_at": time_submitted,
-                        "region": "India",
-                        "category": "Corporate Filings (Zero-Minute Edge)"
-                    })
-        return articles
-    except Exception as e:
-        logger.error(f"Failed to fetch BSE announcements: {e}")
-        return []
+    response = requests.get(url, headers=BSE_HEADERS, timeout=15)
+    response.raise_for_status()
+    data = response.json()
+    if "Table" in data:
+        # Iterate through the latest announcements
+        for item in data["Table"][:limit]:
+            company_name = item.get("SLONGNAME", "Unknown Company")
+            headline = item.get("HEADLINE", "")
+            details = item.get("MORE", "")
+            time_submitted = item.get("NEWS_DT", "")
+            
+            # We only care about major announcements (ignore mundane updates like 'Trading Window Closed')
+            ignore_keywords = ["trading window", "loss of share certificate", "issue of duplicate", "newspaper publication"]
+            if any(k in headline.lower() or k in details.lower() for k in ignore_keywords):
+                continue
+                
+            articles.append({
+                "title": f"BSE FILING: {company_name} - {headline}",
+                "description": details,
+                "source": "BSE Corporate Announcements (Raw Filing)",
+                "published_at": time_submitted,
+                "region": "India",
+                "category": "Corporate Filings (Zero-Minute Edge)"
+            })
+    return articles
@@ -0,0 +1,98 @@
+"""
+Lookup Cache
+`ttl_cached`: the in-process TTL cache shared by the lookup providers (Yahoo symbols and
+quotes, technical indicators, Chittorgarh pages).
+
+- per-key expiry, with a separate (usually shorter) TTL for misses (None results)
+- bounded: expired entries are dropped first, then the oldest
+- single-flight: concurrent calls for the same key wait for the first one
+- `.refresh(arg, ttl_override)` for background refreshers and the cache warmer
+"""
+
+import functools
+import threading
+import time
+
+CACHE_MAX_ENTRIES = 2048
+INFLIGHT_WAIT = 30  # seconds a caller waits for an identical in-flight lookup
+
+
+def ttl_cached(ttl: float, miss_ttl: float = None, max_entries: int = CACHE_MAX_ENTRIES,
+               normalize_key: bool = True):
+    """
+    Caches a single-argument lookup for `ttl` seconds (`miss_ttl` for None results),
+    keeping at most `max_entries` values.
+    Concurrent calls for the same key wait for the first one instead of repeating it.
+    String arguments are stripped and lowercased into the cache key ("Reliance" and
+    "reliance " share an entry); pass `normalize_key=False` where case matters (URLs).
+    """
+    def make_key(arg):
+        if normalize_key and isinstance(arg, str):
+            return arg.strip().lower()
+        return arg
+
+    def decorator(func):
+        cache = {}      # key -> (expires_at, value)
+        inflight = {}   # key -> threading.Event
+        lock = threading.Lock()
+
+        def lookup(key):
+            hit = cache.get(key)
+            if hit and hit[0] > time.time():
+                return True, hit[1]
+            return False, None
+
+        @functools.wraps(func)
+        def wrapper(arg):
+            key = make_key(arg)
+            with lock:
+                found, value = lookup(key)
+                if found:
+                    return value
+                event = inflight.get(key)
+                owner = event is None
+                if owner:
+                    event = inflight[key] = threading.Event()
+
+            if not owner:
+                event.wait(timeout=INFLIGHT_WAIT)
+                with lock:
+                    found, value = lookup(key)
+                if found:
+                    return value
+                return func(arg)
+
+            value = None
+            try:
+                value = func(arg)
+            finally:
+                expiry = ttl if value is not None else (miss_ttl or 0)
+                with lock:
+                    if expiry > 0:
+                        cache[key] = (time.time() + expiry, value)
+                        if len(cache) > max_entries:
+                            now = time.time()
+                            for k in [k for k, (exp, _) in cache.items() if exp <= now]:
+                                del cache[k]
+                            while len(cache) > max_entries:
+                                del cache[next(iter(cache))]
+                    inflight.pop(key, None)
+                    event.set()
+            return value
+
+        def refresh(arg, ttl_override: float = None):
+            """
+            Fetches `arg` now and replaces its cached value (used by background refreshers
+            and the cache warmer, which may keep a value longer than the normal `ttl`).
+            """
+            key = make_key(arg)
+            value = func(arg)
+            if value is not None:
+                with lock:
+                    cache[key] = (time.time() + (ttl_override or ttl), value)
+            return value
+
+        wrapper.cache_clear = cache.clear
+        wrapper.refresh = refresh
+        return wrapper
+    return decorator
@@ -0,0 +1,113 @@
+"""
+Chittorgarh Page Cache
+Shared fetch layer for the chittorgarh.com IPO providers (ipo_documents, ipo_gmp, ipo_discovery).
+
+- get_page(url): the parsed page (BeautifulSoup), cached for PAGE_TTL; failed fetches are
+  remembered for PAGE_MISS_TTL so a missing page isn't requested on every question
+- IPO list index: the mainboard IPO list parsed into (name, url) pairs, refreshed every
+  LIST_REFRESH_INTERVAL by the `chittorgarh_ipo_list` job, so finding a company's IPO page
+  needs no request
+- `pool`: executor for fetching a company's pages concurrently (see ipo_documents)
+
+Cached pages are shared between threads; treat them as read-only.
+"""
+
+import re
+import logging
+import concurrent.futures
+from typing import List, Optional, Tuple
+from urllib.parse import quote_plus
+
+import requests
+from bs4 import BeautifulSoup
+
+from providers.cache_utils import ttl_cached
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://www.chittorgarh.com"
+LIST_URL = "https://www.chittorgarh.com/report/mainboard-ipo-list-in-india-bse-nse/83/"
+SEARCH_URL = "https://www.chittorgarh.com/search/"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+PAGE_TIMEOUT = 15
+PAGE_TTL = 30 * 60
+PAGE_MISS_TTL = 5 * 60
+PAGE_CACHE_ENTRIES = 64          # parsed pages are large; IPO questions cluster on a few names
+LIST_REFRESH_INTERVAL = 3 * 3600
+LIST_TTL = LIST_REFRESH_INTERVAL + 15 * 60
+
+pool = concurrent.futures.ThreadPoolExecutor(max_workers=6, thread_name_prefix="chittorgarh")
+
+
+def absolute_url(href: str) -> str:
+    return href if href.startswith("http") else BASE_URL + href
+
+
+def search_url(query: str) -> str:
+    return f"{SEARCH_URL}?q={quote_plus(query)}"
+
+
+@ttl_cached(PAGE_TTL, PAGE_MISS_TTL, max_entries=PAGE_CACHE_ENTRIES, normalize_key=False)
+def get_page(url: str) -> Optional[BeautifulSoup]:
+    """Parsed page, or None if it could not be fetched (non-200 included)."""
+    try:
+        res = requests.get(url, headers=HEADERS, timeout=PAGE_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Chittorgarh fetch failed for {url}: {e}")
+        return None
+    if res.status_code != 200:
+        return None
+    return BeautifulSoup(res.text, "html.parser")
+
+
+@ttl_cached(LIST_TTL, PAGE_MISS_TTL, normalize_key=False)
+def _load_ipo_list(url: str) -> Optional[List[Tuple[str, str]]]:
+    try:
+        res = requests.get(url, headers=HEADERS, timeout=PAGE_TIMEOUT)
+        res.raise_for_status()
+    except Exception as e:
+        logger.warning(f"Chittorgarh IPO list unavailable: {e}")
+        return None
+    soup = BeautifulSoup(res.text, "html.parser")
+    entries = [
+        (a.get_text(" ", strip=True).lower(), absolute_url(a["href"]))
+        for a in soup.find_all("a", href=True)
+        if "/ipo/" in a["href"]
+    ]
+    return entries or None
+
+
+def get_ipo_list_index() -> List[Tuple[str, str]]:
+    """(lowercased link text, IPO page URL) for every IPO in the mainboard list."""
+    return _load_ipo_list(LIST_URL) or []
+
+
+def find_listed_ipo_url(company: str) -> Optional[str]:
+    """URL of the company's IPO page from the list index, or None."""
+    name = company.lower().strip()
+    if not name:
+        return None
+    for text, url in get_ipo_list_index():
+        if name in text:
+            return url
+    # Same company written differently ("Tata Technologies Ltd" vs "Tata Technologies IPO")
+    target = re.sub(r"\b(limited|ltd|ipo)\b", "", name).strip()
+    for text, url in get_ipo_list_index():
+        if target and target in text:
+            return url
+    return None
+
+
+def refresh_ipo_list() -> int:
+    """Job: re-downloads the IPO list index. Returns the number of entries."""
+    entries = _load_ipo_list.refresh(LIST_URL)
+    if not entries:
+        raise RuntimeError("Chittorgarh IPO list unavailable")
+    return len(entries)
+
+
+def register_ipo_page_jobs(job_scheduler):
+    return job_scheduler.add_interval(
+        "chittorgarh_ipo_list", refresh_ipo_list, LIST_REFRESH_INTERVAL, jitter=60
+    )
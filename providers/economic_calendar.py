@@ -14,12 +14,23 @@ Events tracked:
 - OPEC meetings (oil price impact)
 
 Data source: Investing.com RSS + ForexFactory-style scraping (free, no key)
+
+Dated events are seeded from data/economic_calendar.json (hand-maintained FOMC / RBI MPC / OPEC
+dates, read-only) and extended in memory with rule-based recurring events (CPI, GDP, NFP, Budget,
+F&O expiries), regenerated once per IST day. Queries like "what's coming this week" are answered
+from an in-memory interval index — no network or LLM call.
 """
 
+import os
+import json
+import bisect
+import calendar
+import threading
+import pytz
 import requests
 import feedparser
 import logging
-from datetime import datetime
+from datetime import datetime, date, timedelta
 from typing import List, Dict
 
 logger = logging.getLogger(__name__)
@@ -182,3 +193,201 @@ def get_high_impact_events_summary() -> str:
             f"  Reaction: {event['typical_market_reaction']}"
         )
     return "\n".join(lines)
+
+
+
+# ---------------------------------------------------------------------------
+#  Dated event calendar (local store + interval index)
+# ---------------------------------------------------------------------------
+
+CALENDAR_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "economic_calendar.json")
+CALENDAR_HORIZON_DAYS = 90   # how far ahead rule-based events are generated
+CALENDAR_RETENTION_DAYS = 30  # how long past events are kept
+IST = pytz.timezone("Asia/Kolkata")
+
+# Which HIGH_IMPACT_EVENT_SCHEDULE entry describes each category
+_CATEGORY_SCHEDULE = {
+    "RBI MPC": "RBI Monetary Policy Committee (MPC) Meeting",
+    "FOMC": "US Federal Reserve FOMC Meeting",
+    "India CPI": "India CPI Inflation Data",
+    "India GDP": "India GDP Growth Data",
+    "US NFP": "US Non-Farm Payrolls (NFP)",
+    "Union Budget": "India Union Budget",
+    "OPEC": "OPEC Meeting / Production Decision",
+}
+
+
+def _ist_today() -> date:
+    return datetime.now(IST).date()
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    last = date(year, month, calendar.monthrange(year, month)[1])
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _first_weekday(year: int, month: int, weekday: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7)
+
+
+def _last_working_day(year: int, month: int) -> date:
+    d = date(year, month, calendar.monthrange(year, month)[1])
+    while d.weekday() >= 5:
+        d -= timedelta(days=1)
+    return d
+
+
+def _generate_recurring_events(start: date, end: date) -> List[Dict]:
+    """Rule-based recurring events between two dates (inclusive)."""
+    events = []
+
+    def add(event_id, name, category, day, time_ist=None):
+        if start <= day <= end:
+            e = {"id": event_id, "name": name, "category": category,
+                 "start": day.isoformat(), "end": day.isoformat(), "source": "rule"}
+            if time_ist:
+                e["time_ist"] = time_ist
+            events.append(e)
+
+    # Weekly Nifty expiry (Tuesday) and monthly F&O expiry (last Tuesday)
+    d = start + timedelta(days=(1 - start.weekday()) % 7)
+    while d <= end:
+        monthly = d == _last_weekday(d.year, d.month, 1)
+        if monthly:
+            add(f"expiry-monthly-{d}", "Nifty / Bank Nifty Monthly F&O Expiry", "F&O Expiry", d, "15:30")
+        else:
+            add(f"expiry-weekly-{d}", "Nifty Weekly Options Expiry", "F&O Expiry", d, "15:30")
+        d += timedelta(days=7)
+
+    y, m = start.year, start.month
+    while date(y, m, 1) <= end:
+        add(f"india-cpi-{y}-{m:02d}", "India CPI Inflation Data", "India CPI", date(y, m, 12), "16:00")
+        add(f"us-nfp-{y}-{m:02d}", "US Non-Farm Payrolls (NFP)", "US NFP", _first_weekday(y, m, 4), "18:00")
+        if m in (2, 5, 8, 11):
+            add(f"india-gdp-{y}-{m:02d}", "India GDP Growth Data", "India GDP", _last_working_day(y, m), "16:00")
+        if m == 2:
+            add(f"union-budget-{y}", "India Union Budget", "Union Budget", date(y, 2, 1), "11:00")
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+
+    return events
+
+
+class EventCalendar:
+    """
+    Dated economic events with an interval index for fast range queries.
+    The seed file is only read; generated events and pruning live in memory.
+    """
+
+    def __init__(self, path: str = CALENDAR_FILE):
+        self.path = path
+        self._events: Dict[str, Dict] = {}
+        self._starts: List[str] = []
+        self._sorted: List[Dict] = []
+        self._max_span = timedelta(days=0)
+        self._refreshed_on = None
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            events = {e["id"]: e for e in data.get("events", []) if e.get("id") and e.get("start")}
+        except FileNotFoundError:
+            events = {}
+        except Exception as e:
+            logger.error(f"Error loading economic calendar: {e}")
+            events = {}
+        with self._lock:
+            self._events = events
+            self._reindex()
+
+    def refresh(self, today: date = None) -> int:
+        """Incrementally adds newly due recurring events and prunes old ones. Returns events added."""
+        today = today or _ist_today()
+        horizon = today + timedelta(days=CALENDAR_HORIZON_DAYS)
+        cutoff = (today - timedelta(days=CALENDAR_RETENTION_DAYS)).isoformat()
+
+        with self._lock:
+            added = 0
+            for event in _generate_recurring_events(today, horizon):
+                if event["id"] not in self._events:
+                    self._events[event["id"]] = event
+                    added += 1
+            stale = [k for k, e in self._events.items() if e.get("end", e["start"]) < cutoff]
+            for k in stale:
+                del self._events[k]
+            if added or stale:
+                self._reindex()
+            self._refreshed_on = today
+        if added or stale:
+            logger.info(f"Economic calendar refreshed: +{added} events, -{len(stale)} expired")
+        return added
+
+    def events_between(self, start: date, end: date) -> List[Dict]:
+        """All events overlapping [start, end], ordered by start date."""
+        lo_key = (start - self._max_span).isoformat()
+        hi_key = end.isoformat()
+        start_key = start.isoformat()
+        with self._lock:
+            lo = bisect.bisect_left(self._starts, lo_key)
+            hi = bisect.bisect_right(self._starts, hi_key)
+            return [e for e in self._sorted[lo:hi] if e.get("end", e["start"]) >= start_key]
+
+    def upcoming(self, days: int = 7, today: date = None) -> List[Dict]:
+        today = today or _ist_today()
+        if self._refreshed_on != today:
+            self.refresh(today)
+        return self.events_between(today, today + timedelta(days=days))
+
+    def _reindex(self):
+        self._sorted = sorted(self._events.values(), key=lambda e: (e["start"], e.get("time_ist", "")))
+        self._starts = [e["start"] for e in self._sorted]
+        spans = [
+            date.fromisoformat(e.get("end", e["start"])) - date.fromisoformat(e["start"])
+            for e in self._sorted
+        ]
+        self._max_span = max(spans, default=timedelta(days=0))
+
+
+_calendar = None
+_calendar_lock = threading.Lock()
+
+
+def get_event_calendar() -> EventCalendar:
+    """Process-wide calendar, seeded from disk; recurring events are refreshed once per IST day."""
+    global _calendar
+    with _calendar_lock:
+        if _calendar is None:
+            _calendar = EventCalendar()
+            _calendar.refresh()
+        return _calendar
+
+
+def refresh_event_calendar() -> int:
+    return get_event_calendar().refresh()
+
+
+def get_upcoming_events(days: int = 7) -> List[Dict]:
+    return get_event_calendar().upcoming(days)
+
+
+def format_upcoming_events_text(days: int = 7) -> str:
+    """Markdown table of upcoming events with their typical market impact. Pure data, no AI."""
+    events = get_upcoming_events(days)
+    if not events:
+        return f"No high-impact economic events scheduled in the next {days} days."
+
+    schedule = {e["name"]: e for e in HIGH_IMPACT_EVENT_SCHEDULE}
+    lines = [
+        "| Date | Time (IST) | Event | Impact | Sectors |",
+        "|---|---|---|---|---|",
+    ]
+    for e in events:
+        when = e["start"] if e.get("end", e["start"]) == e["start"] else f"{e['start']} → {e['end']}"
+        info = schedule.get(_CATEGORY_SCHEDULE.get(e.get("category"), ""), {})
+        impact = info.get("impact", "").split(" - ")[0] or "MEDIUM"
+        sectors = ", ".join(info.get("sectors_affected", [])[:3]) or "Index / derivatives"
+        lines.append(f"| {when} | {e.get('time_ist', '—')} | {e['name']} | {impact} | {sectors} |")
+    return "\n".join(lines)
@@ -57,30 +57,59 @@ GEO_FEEDS = {
     "Defense News": "https://www.defensenews.com/arc/outboundfeeds/rss/?outputType=xml",
 }
 
+# Feed groupings used by the aggregate fetchers and the realtime scanner
+INDIA_FEEDS = [
+    "Economic Times Markets",
+    "Economic Times Stocks",
+    "Moneycontrol Markets",
+    "Moneycontrol Business",
+    "Business Standard Markets",
+    "Business Standard Economy",
+    "LiveMint Markets",
+    "LiveMint Companies",
+    "NDTV Business",
+    "The Hindu Business",
+]
+
+GLOBAL_FEEDS = [
+    "Reuters Business", "Reuters Markets", "Bloomberg Markets",
+    "CNBC Finance", "Financial Times",
+]
+
+REGULATORY_FEEDS = ["RBI Press Releases", "SEBI Press Releases", "NSE India News"]
+
+
+def fetch_feed_strict(name: str, url: str, limit: int = 5) -> List[Dict]:
+    """Fetches a single RSS feed, raising on network or HTTP errors.
+
+    Used by the adaptive feed scheduler, which needs to tell a quiet feed
+    apart from a failing one.
+    """
+    resp = requests.get(url, timeout=5, headers={"User-Agent": "Mozilla/5.0"})
+    resp.raise_for_status()
+    feed = feedparser.parse(resp.content)
+    articles = []
+    for entry in feed.entries[:limit]:
+        published = None
+        try:
+            if entry.get("published_parsed"):
+                published = datetime(*entry.published_parsed[:6]).strftime("%Y-%m-%dT%H:%M:%SZ")
+        except Exception:
+            pass
+        articles.append({
+            "title": entry.get("title", ""),
+            "description": (entry.get("summary") or entry.get("title", ""))[:300],
+            "source": name,
+            "published_at": published,
+            "url": entry.get("link", ""),
+        })
+    return articles
+
 
 def _fetch_single_feed(name: str, url: str, limit: int = 5) -> List[Dict]:
     """Fetches a single RSS feed with timeout protection."""
     try:
-        resp = requests.get(url, timeout=5, headers={"User-Agent": "Mozilla/5.0"})
-        if resp.status_code != 200:
-            return []
-        feed = feedparser.parse(resp.content)
-        articles = []
-        for entry in feed.entries[:limit]:
-            published = None
-            try:
-                if entry.get("published_parsed"):
-                    published = datetime(*entry.published_parsed[:6]).strftime("%Y-%m-%dT%H:%M:%SZ")
-            except Exception:
-                pass
-            articles.append({
-                "title": entry.get("title", ""),
-                "description": (entry.get("summary") or entry.get("title", ""))[:300],
-                "source": name,
-                "published_at": published,
-                "url": entry.get("link", ""),
-            })
-        return articles
+        return fetch_feed_strict(name, url, limit)
     except Exception as e:
         logger.debug(f"Feed '{name}' failed: {e}")
         return []
@@ -140,28 +169,13 @@ def fetch_enhanced_news(
 
 def fetch_india_market_news(limit_per_feed: int = 3, max_total: int = 30) -> List[Dict]:
     """Fetch only India-focused financial news feeds."""
-    india_feeds = [
-        "Economic Times Markets",
-        "Economic Times Stocks",
-        "Moneycontrol Markets",
-        "Moneycontrol Business",
-        "Business Standard Markets",
-        "Business Standard Economy",
-        "LiveMint Markets",
-        "LiveMint Companies",
-        "NDTV Business",
-        "The Hindu Business",
-    ]
-    return fetch_enhanced_news(categories=india_feeds, limit_per_feed=limit_per_feed, max_total=max_total)
+    return fetch_enhanced_news(categories=INDIA_FEEDS, limit_per_feed=limit_per_feed, max_total=max_total)
 
 
 def fetch_global_and_geo_news(limit_per_feed: int = 4, max_total: int = 30) -> List[Dict]:
     """Fetch global news with geopolitical feeds for war/conflict analysis."""
     return fetch_enhanced_news(
-        categories=[
-            "Reuters Business", "Reuters Markets", "Bloomberg Markets",
-            "CNBC Finance", "Financial Times",
-        ],
+        categories=GLOBAL_FEEDS,
         limit_per_feed=limit_per_feed,
         max_total=max_total,
         include_geo=True,
@@ -170,5 +184,4 @@ def fetch_global_and_geo_news(limit_per_feed: int = 4, max_total: int = 30) -> L
 
 def fetch_regulatory_news(limit_per_feed: int = 5) -> List[Dict]:
     """Fetch RBI, SEBI, and NSE regulatory announcements."""
-    reg_feeds = ["RBI Press Releases", "SEBI Press Releases", "NSE India News"]
-    return fetch_enhanced_news(categories=reg_feeds, limit_per_feed=limit_per_feed, max_total=15)
+    return fetch_enhanced_news(categories=REGULATORY_FEEDS, limit_per_feed=limit_per_feed, max_total=15)
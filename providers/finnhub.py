@@ -34,15 +34,11 @@ def _finnhub_get(endpoint: str, params: dict = None) -> Optional[dict]:
         logger.warning("FINNHUB_API_KEY not set. Add it to .env for enhanced data.")
         return None
     try:
-        url = f"{FINNHUB_BASE}/{endpoint}"
-        params = params or {}
-        params["token"] = FINNHUB_API_KEY
-        resp = requests.get(url, params=params, timeout=10)
-        if resp.status_code == 200:
-            return resp.json()
-        elif resp.status_code == 401:
+        return _finnhub_get_strict(endpoint, params)
+    except requests.HTTPError as e:
+        if e.response.status_code == 401:
             logger.error("Finnhub API key invalid. Check FINNHUB_API_KEY in .env")
-        elif resp.status_code == 429:
+        elif e.response.status_code == 429:
             logger.warning("Finnhub rate limit hit (60/min free tier). Slow down requests.")
         return None
     except Exception as e:
@@ -50,6 +46,18 @@ def _finnhub_get(endpoint: str, params: dict = None) -> Optional[dict]:
         return None
 
 
+def _finnhub_get_strict(endpoint: str, params: dict = None) -> dict:
+    """Like `_finnhub_get`, but raises on a missing key, network or HTTP errors."""
+    if not FINNHUB_API_KEY:
+        raise RuntimeError("FINNHUB_API_KEY not set")
+    url = f"{FINNHUB_BASE}/{endpoint}"
+    params = params or {}
+    params["token"] = FINNHUB_API_KEY
+    resp = requests.get(url, params=params, timeout=10)
+    resp.raise_for_status()
+    return resp.json()
+
+
 def get_company_news(symbol: str, days_back: int = 7) -> List[Dict]:
     """
     Fetch recent news articles for a specific company.
@@ -89,7 +97,19 @@ def get_market_news(category: str = "general") -> List[Dict]:
     data = _finnhub_get("news", {"category": category, "minId": 0})
     if not data:
         return []
+    return _market_news_articles(data, category)
+
+
+def get_market_news_strict(category: str = "general") -> List[Dict]:
+    """Like `get_market_news`, but raises on network or HTTP errors.
+
+    Used by the adaptive feed scheduler, which needs to tell a quiet source
+    apart from a failing one.
+    """
+    return _market_news_articles(_finnhub_get_strict("news", {"category": category, "minId": 0}) or [], category)
+
 
+def _market_news_articles(data: List[Dict], category: str) -> List[Dict]:
     articles = []
     for item in data[:10]:
         articles.append({
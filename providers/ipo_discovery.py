@@ -1,14 +1,7 @@
-import requests
-from bs4 import BeautifulSoup
 import re
 from typing import Optional, Dict
 
-BASE_URL = "https://www.chittorgarh.com"
-SEARCH_URL = "https://www.chittorgarh.com/search/"
-
-HEADERS = {
-    "User-Agent": "Mozilla/5.0",
-}
+from providers.chittorgarh import BASE_URL, get_page, search_url
 
 
 def _clean(text: str) -> str:
@@ -22,19 +15,10 @@ def find_ipo_page(company_name: str) -> Optional[Dict]:
     """
     Finds IPO page on Chittorgarh using search.
     """
-    try:
-        resp = requests.get(
-            SEARCH_URL,
-            params={"q": company_name},
-            headers=HEADERS,
-            timeout=15,
-        )
-        resp.raise_for_status()
-    except Exception:
+    soup = get_page(search_url(company_name))
+    if soup is None:
         return None
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-
     results = soup.find_all("a", href=True)
 
     target = _clean(company_name)
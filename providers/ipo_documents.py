@@ -1,24 +1,28 @@
-import requests
 from bs4 import BeautifulSoup
 import re
 
-HEADERS = {"User-Agent": "Mozilla/5.0"}
-
-BASE_LIST_URL = "https://www.chittorgarh.com/report/mainboard-ipo-list-in-india-bse-nse/83/"
+from providers.chittorgarh import pool, get_page, find_listed_ipo_url
+from providers.ipo_discovery import find_ipo_page
+from providers.ipo_gmp import get_ipo_gmp, gmp_page_url
 
 
 def _find_ipo_page(company: str) -> str | None:
-    res = requests.get(BASE_LIST_URL, headers=HEADERS, timeout=15)
-    soup = BeautifulSoup(res.text, "html.parser")
+    """IPO page from the cached list index, falling back to Chittorgarh search."""
+    url = find_listed_ipo_url(company)
+    if url:
+        return url
+    found = find_ipo_page(company)
+    return found["url"] if found else None
+
+
+def _fetch_ipo_page(company: str) -> tuple[str | None, BeautifulSoup | None]:
+    ipo_url = _find_ipo_page(company)
+    return ipo_url, get_page(ipo_url) if ipo_url else None
+
 
-    for a in soup.find_all("a", href=True):
-        if company.lower() in a.text.lower() and "/ipo/" in a["href"]:
-            return (
-                a["href"]
-                if a["href"].startswith("http")
-                else "https://www.chittorgarh.com" + a["href"]
-            )
-    return None
+def _price_band_high(price_band: str | None) -> int | None:
+    numbers = re.findall(r"\d+(?:\.\d+)?", (price_band or "").replace(",", ""))
+    return int(float(numbers[-1])) if numbers else None
 
 
 def _parse_financials(soup: BeautifulSoup) -> dict:
@@ -71,13 +75,13 @@ def _parse_issue_details(soup: BeautifulSoup) -> dict:
 
 
 def get_ipo_documents(company: str) -> dict | None:
-    ipo_url = _find_ipo_page(company)
-    if not ipo_url:
+    # The IPO page (found via the list index or search) and the GMP page download in parallel
+    page_future = pool.submit(_fetch_ipo_page, company)
+    gmp_future = pool.submit(get_page, gmp_page_url(company))
+    ipo_url, soup = page_future.result()
+    if soup is None:
         return None
 
-    page = requests.get(ipo_url, headers=HEADERS, timeout=15)
-    soup = BeautifulSoup(page.text, "html.parser")
-
     financials = _parse_financials(soup)
     issue = _parse_issue_details(soup)
 
@@ -100,5 +104,15 @@ def get_ipo_documents(company: str) -> dict | None:
             "growth_trend": growth_trend,
         },
         "issue": issue,
+        "gmp": _ipo_gmp(company, gmp_future, issue),
         "source": "chittorgarh.com",
     }
+
+
+def _ipo_gmp(company: str, gmp_future, issue: dict) -> dict | None:
+    try:
+        gmp_future.result()
+        # Served from the page cache the future just filled
+        return get_ipo_gmp(company, _price_band_high(issue.get("price_band")))
+    except Exception:
+        return None
@@ -1,17 +1,19 @@
-import requests
 from bs4 import BeautifulSoup
 import re
 
-HEADERS = {"User-Agent": "Mozilla/5.0"}
+from providers.chittorgarh import get_page
 
 
-def _find_gmp_page(company: str) -> str | None:
+def gmp_page_url(company: str) -> str:
     slug = company.lower().replace(" ", "-")
-    url = f"https://www.chittorgarh.com/ipo/ipo-gmp/{slug}/"
+    return f"https://www.chittorgarh.com/ipo/ipo-gmp/{slug}/"
 
-    res = requests.get(url, headers=HEADERS, timeout=10)
-    if res.status_code == 200 and "GMP" in res.text:
-        return url
+
+def _find_gmp_page(company: str) -> BeautifulSoup | None:
+    # Cached: ipo_documents prefetches this page alongside the IPO page
+    soup = get_page(gmp_page_url(company))
+    if soup is not None and "GMP" in soup.get_text():
+        return soup
     return None
 
 
@@ -27,12 +29,10 @@ def _extract_gmp_range(text: str) -> tuple[int, int] | None:
 
 
 def get_ipo_gmp(company: str, price_band_high: int | None = None) -> dict | None:
-    gmp_url = _find_gmp_page(company)
-    if not gmp_url:
+    soup = _find_gmp_page(company)
+    if soup is None:
         return {"status": "not_available", "reason": "GMP page not found"}
 
-    page = requests.get(gmp_url, headers=HEADERS, timeout=10)
-    soup = BeautifulSoup(page.text, "html.parser")
     text = soup.get_text(" ", strip=True)
 
     gmp_range = _extract_gmp_range(text)
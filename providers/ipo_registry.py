@@ -1,26 +1,198 @@
+"""
+IPO Registry
+Read side of data/ipo_registry.json (written by ipo_updater.py).
+
+The registry is parsed once into an in-memory index and reloaded only when the file's
+mtime changes; the mtime itself is checked at most every RELOAD_CHECK_INTERVAL seconds,
+so lookups on the request path don't touch disk.
+
+Index:
+- IPOs in file order, plus per-status buckets (upcoming / open / closed / ...)
+- exact lookup by normalized name and short name
+- a token index (plus a sorted vocabulary for prefix lookups) that picks the candidates
+  for substring and fuzzy matching ("Tata Tech" -> "Tata Technologies Limited"), so a
+  lookup never scans the whole registry. Fuzzy matches need a shared distinctive token:
+  generic words like "electronics" or "industries" alone never match ("LG Electronics"
+  must not resolve to "UKB Electronics")
+
+Returned dicts are shared with the index; treat them as read-only.
+"""
+
+import os
+import re
 import json
-from datetime import datetime
-from typing import Dict, List
+import time
+import bisect
+import difflib
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "ipo_registry.json")
+RELOAD_CHECK_INTERVAL = 30
+FUZZY_CUTOFF = 0.75
+
+# Suffixes that don't help tell companies apart
+NAME_NOISE = {"limited", "ltd", "pvt", "private", "india", "the", "ipo", "co", "company", "inc"}
+
+# Industry words shared by many unrelated companies: not enough on their own for a fuzzy match
+GENERIC_TOKENS = {
+    "electronics", "industries", "industry", "technologies", "technology", "tech", "infotech",
+    "services", "solutions", "systems", "enterprises", "enterprise", "global", "international",
+    "group", "holdings", "ventures", "capital", "finance", "financial", "fincorp", "finserv",
+    "bank", "insurance", "life", "securities", "investments", "energy", "power", "solar",
+    "green", "infra", "infrastructure", "projects", "engineering", "engineers", "constructions",
+    "construction", "realty", "developers", "housing", "estates", "pharma", "pharmaceuticals",
+    "healthcare", "health", "hospitals", "labs", "laboratories", "chemicals",
+    "foods", "food", "products", "motors", "auto", "automotive", "logistics", "media",
+    "communications", "telecom", "digital", "networks", "software", "textiles", "steel",
+    "metals", "agro", "retail", "fashion", "hotels", "resorts", "travels", "new", "national",
+    "bharat", "hindustan", "indian", "and", "&",
+}
+MIN_PREFIX = 3
+
+
+def normalize_name(name: str) -> str:
+    words = re.sub(r"[^a-z0-9& ]", " ", (name or "").lower()).split()
+    return " ".join(w for w in words if w not in NAME_NOISE)
+
+
+class RegistryIndex:
+    def __init__(self, data: Dict, mtime: float = 0.0):
+        self.updated_on = data.get("updated_on")
+        self.mtime = mtime
+        self.ipos: List[Dict] = data.get("ipos", [])
+        self.by_status: Dict[str, List[Dict]] = defaultdict(list)
+        self.by_name: Dict[str, Dict] = {}
+        self.by_token: Dict[str, List[int]] = defaultdict(list)
+        self.normalized: List[str] = []
+        self.names: List[str] = []
+
+        for i, ipo in enumerate(self.ipos):
+            self.by_status[(ipo.get("status") or "unknown").lower()].append(ipo)
+            norm = normalize_name(ipo.get("name", ""))
+            self.normalized.append(norm)
+            self.names.append((ipo.get("name") or "").lower())
+            for key in (norm, normalize_name(ipo.get("short_name", "")), (ipo.get("name") or "").lower()):
+                if key:
+                    self.by_name.setdefault(key, ipo)
+            for token in set(norm.split()):
+                self.by_token[token].append(i)
+        self.vocabulary: List[str] = sorted(self.by_token)
+
+    def _with_prefix(self, prefix: str) -> set:
+        """Positions of IPOs with a token starting with `prefix`."""
+        positions = set()
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            positions.update(self.by_token[token])
+        return positions
 
-REGISTRY_PATH = "data/ipo_registry.json"
+    def _substring_candidates(self, tokens: List[str]) -> set:
+        """IPOs containing every query token (the last one may be cut off: "jio platf")."""
+        candidates = None
+        for n, token in enumerate(tokens):
+            last = n == len(tokens) - 1
+            positions = self._with_prefix(token) if last else set(self.by_token.get(token, ()))
+            candidates = positions if candidates is None else candidates & positions
+            if not candidates:
+                return set()
+        return candidates or set()
 
+    def _fuzzy_candidates(self, tokens: List[str]) -> set:
+        """IPOs sharing a distinctive token, or its first MIN_PREFIX letters (typos), with the query."""
+        candidates = set()
+        for token in tokens:
+            if token in GENERIC_TOKENS:
+                continue
+            candidates.update(self.by_token.get(token, ()))
+            if len(token) >= MIN_PREFIX:
+                candidates.update(self._with_prefix(token[:MIN_PREFIX]))
+        return candidates
 
-def _load_registry() -> Dict:
-    with open(REGISTRY_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    def find(self, name: str) -> Optional[Dict]:
+        query = (name or "").strip().lower()
+        if not query:
+            return None
+        norm = normalize_name(query)
+
+        exact = self.by_name.get(query) or self.by_name.get(norm)
+        if exact:
+            return exact
+
+        tokens = norm.split()
+        if not tokens:
+            return None
+
+        # Substring of a registered name, first in registry order
+        for i in sorted(self._substring_candidates(tokens)):
+            if query in self.names[i] or norm in self.normalized[i]:
+                return self.ipos[i]
+
+        # Fuzzy: rank the names sharing a distinctive token with the query
+        best, best_score = None, FUZZY_CUTOFF
+        for i in sorted(self._fuzzy_candidates(tokens)):
+            score = difflib.SequenceMatcher(None, norm, self.normalized[i]).ratio()
+            if score > best_score:
+                best, best_score = self.ipos[i], score
+        return best
+
+
+_lock = threading.Lock()
+_index: Optional[RegistryIndex] = None
+_last_check = 0.0
+
+
+def _load_registry() -> Optional[RegistryIndex]:
+    try:
+        mtime = os.path.getmtime(REGISTRY_PATH)
+        with open(REGISTRY_PATH, "r", encoding="utf-8") as f:
+            return RegistryIndex(json.load(f), mtime)
+    except FileNotFoundError:
+        logger.warning(f"IPO registry not found at {REGISTRY_PATH}")
+    except Exception as e:
+        logger.error(f"Error loading IPO registry: {e}")
+    return None
+
+
+def get_registry_index(force_check: bool = False) -> RegistryIndex:
+    """The in-memory index, reloaded if the registry file changed since it was built."""
+    global _index, _last_check
+    now = time.time()
+    if _index is not None and not force_check and now - _last_check < RELOAD_CHECK_INTERVAL:
+        return _index
+    with _lock:
+        _last_check = now
+        try:
+            mtime = os.path.getmtime(REGISTRY_PATH)
+        except OSError:
+            mtime = None
+        if _index is None or (mtime is not None and mtime != _index.mtime):
+            loaded = _load_registry()
+            if loaded:
+                _index = loaded
+                logger.info(f"IPO registry indexed: {len(loaded.ipos)} IPOs (updated {loaded.updated_on})")
+            elif _index is None:
+                _index = RegistryIndex({})
+        return _index
+
+
+def reload_registry() -> RegistryIndex:
+    """Picks up a registry the updater just wrote without waiting for the next mtime check."""
+    return get_registry_index(force_check=True)
 
 
 def get_all_ipos() -> List[Dict]:
-    data = _load_registry()
-    return data.get("ipos", [])
+    return list(get_registry_index().ipos)
 
 
 def get_ipos_by_status(status: str) -> List[Dict]:
-    status = status.lower()
-    return [
-        ipo for ipo in get_all_ipos()
-        if ipo.get("status") == status
-    ]
+    return list(get_registry_index().by_status.get(status.lower(), []))
 
 
 def get_upcoming_ipos() -> List[Dict]:
@@ -36,8 +208,4 @@ def get_recently_closed_ipos() -> List[Dict]:
 
 
 def find_ipo_by_name(name: str) -> Dict | None:
-    name = name.lower()
-    for ipo in get_all_ipos():
-        if name in ipo["name"].lower() or name == ipo["short_name"].lower():
-            return ipo
-    return None
+    return get_registry_index().find(name)
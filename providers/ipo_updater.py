@@ -1,8 +1,37 @@
+"""
+IPO Registry Updater
+Maintains data/ipo_registry.json incrementally (read side: ipo_registry.py).
+
+Each update:
+- fetches the Google News IPO feeds and the NSE/BSE IPO lists concurrently, each with a
+  timeout, so one slow source can't stall the run
+- merges new headline candidates and the exchange entries into the existing registry
+  (last_seen, and dates / price band / official name from the exchanges)
+- recomputes every dated IPO's status from its open / close / listing dates, so an IPO
+  that dropped off the exchange lists doesn't stay "open" forever
+- ages out headline candidates no exchange ever confirmed once they haven't been seen for
+  RSS_CANDIDATE_MAX_AGE_DAYS (most are headline fragments, not companies)
+- writes the file atomically; readers pick it up through their mtime check
+
+Runs as the `ipo_registry_update` job (UPDATE_CRON); `python -m providers.ipo_updater`
+runs one update by hand.
+"""
+
+import os
 import json
+import logging
+import concurrent.futures
 import feedparser
 import re
-from datetime import datetime
+import pytz
+import requests
+from datetime import date, datetime, timedelta
 from pathlib import Path
+from typing import Dict, List
+
+from providers.ipo_registry import normalize_name, reload_registry
+
+logger = logging.getLogger(__name__)
 
 # --------------------
 # PATH SETUP (CORRECT)
@@ -21,6 +50,14 @@ RSS_FEEDS = [
     "https://news.google.com/rss/search?q=DRHP+IPO+India",
 ]
 
+FEED_TIMEOUT = 10
+UPDATE_TIMEOUT = 45            # whole fetch phase; sources still running are left out
+UPDATE_CRON = "20 */6 * * *"   # IST; exchange statuses change at most daily
+UPDATE_CATCH_UP = 6 * 3600
+RSS_CANDIDATE_MAX_AGE_DAYS = 30
+RSS_SOURCE = "Google News RSS"
+IST = pytz.timezone("Asia/Kolkata")
+
 STOPWORDS = {
     "india", "indian", "ipo", "psu", "crore", "rs",
     "files", "filed", "opens", "open", "opening",
@@ -29,6 +66,9 @@ STOPWORDS = {
     "gets", "to", "for", "of", "in", "on", "with",
 }
 
+# Fields the exchange lists are authoritative for (status is derived from the dates)
+EXCHANGE_FIELDS = ("open_date", "close_date", "listing_date", "price_band", "issue_size", "exchange")
+
 # --------------------
 # EXTRACTION LOGIC
 # --------------------
@@ -59,50 +99,167 @@ def extract_company_candidates(title: str) -> list[str]:
 
 
 # --------------------
-# REGISTRY BUILDER
+# SOURCES
 # --------------------
-def rebuild_ipo_registry():
-    print("Rebuilding IPO registry...")
-
-    ipos = {}
-    today = datetime.now().strftime("%Y-%m-%d")
-
-    for url in RSS_FEEDS:
-        feed = feedparser.parse(url)
-
-        for entry in feed.entries:
-            title = entry.get("title", "")
-            companies = extract_company_candidates(title)
-
-            for company in companies:
-                key = company.upper()
-
-                if key not in ipos:
-                    ipos[key] = {
-                        "name": company,
-                        "short_name": key,
-                        "status": "unknown",
-                        "source": "Google News RSS",
-                        "first_seen": today,
-                        "last_seen": today,
-                    }
-                else:
-                    ipos[key]["last_seen"] = today
-
-    registry = {
-        "updated_on": today,
-        "ipos": list(ipos.values()),
-    }
-
-    # Ensure /data exists
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
+def fetch_feed_titles(url: str) -> List[str]:
+    # feedparser.parse(url) has no timeout — fetch with requests first
+    response = requests.get(url, timeout=FEED_TIMEOUT, headers={"User-Agent": "Mozilla/5.0"})
+    response.raise_for_status()
+    return [entry.get("title", "") for entry in feedparser.parse(response.content).entries]
+
+
+def fetch_sources() -> Dict[str, list]:
+    """Every source in parallel: {"rss": [titles], "exchanges": [ipo dicts]}. Failed sources are skipped."""
+    from providers.ipo_basic import get_open_ipos_nse, get_ipos_bse
+
+    results = {"rss": [], "exchanges": []}
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(RSS_FEEDS) + 2, thread_name_prefix="ipo-update")
+    # The two halves of ipo_basic.get_ipos_overview, run side by side
+    futures = {executor.submit(fetch_feed_titles, url): ("rss", url) for url in RSS_FEEDS}
+    futures[executor.submit(get_open_ipos_nse)] = ("exchanges", "NSE")
+    futures[executor.submit(get_ipos_bse)] = ("exchanges", "BSE")
+    try:
+        for future in concurrent.futures.as_completed(futures, timeout=UPDATE_TIMEOUT):
+            kind, source = futures[future]
+            try:
+                results[kind].extend(future.result() or [])
+            except Exception as e:
+                logger.warning(f"IPO registry source {source} failed: {e}")
+    except concurrent.futures.TimeoutError:
+        pending = [futures[f][1] for f in futures if not f.done()]
+        logger.warning(f"IPO registry update: gave up waiting for {', '.join(pending)}")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+# --------------------
+# REGISTRY MERGE
+# --------------------
+def load_registry_file() -> Dict:
+    try:
+        with open(REGISTRY_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"ipos": []}
+
+
+def ipo_status(ipo: Dict, today: str) -> str:
+    """upcoming / open / closed / listed from the IPO's dates; "unknown" without them."""
+    open_date, close_date, listing_date = ipo.get("open_date"), ipo.get("close_date"), ipo.get("listing_date")
+    if not open_date or not close_date:
+        return ipo.get("status") or "unknown"
+    if today < open_date:
+        return "upcoming"
+    if today <= close_date:
+        return "open"
+    if listing_date and today >= listing_date:
+        return "listed"
+    return "closed"
 
-    with open(REGISTRY_PATH, "w", encoding="utf-8") as f:
+
+def merge_into_registry(registry: Dict, titles: List[str], exchange_ipos: List[Dict], today: str) -> Dict[str, int]:
+    """Merges fetched data into `registry` in place. Returns added/updated/expired counts."""
+    ipos = registry.setdefault("ipos", [])
+    by_key = {}
+    for ipo in ipos:
+        by_key.setdefault(normalize_name(ipo.get("name", "")), ipo)
+    added, updated = set(), set()
+
+    def upsert(name: str, source: str) -> Dict:
+        key = normalize_name(name)
+        ipo = by_key.get(key)
+        if ipo is None:
+            ipo = {
+                "name": name,
+                "short_name": name.upper(),
+                "status": "unknown",
+                "source": source,
+                "first_seen": today,
+                "last_seen": today,
+            }
+            ipos.append(ipo)
+            by_key[key] = ipo
+            added.add(key)
+        elif ipo.get("last_seen") != today:
+            ipo["last_seen"] = today
+            updated.add(key)
+        return ipo
+
+    for title in titles:
+        for company in extract_company_candidates(title):
+            if normalize_name(company):
+                upsert(company, RSS_SOURCE)
+
+    for item in exchange_ipos:
+        company = (item.get("company") or "").strip()
+        if not normalize_name(company):
+            continue
+        ipo = upsert(company, item.get("exchange") or "Exchange")
+        for field in EXCHANGE_FIELDS:
+            if item.get(field) is not None and ipo.get(field) != item[field]:
+                ipo[field] = item[field]
+                updated.add(normalize_name(company))
+        if ipo.get("source") == RSS_SOURCE:
+            # Confirmed by an exchange listing: prefer the official name
+            ipo["name"], ipo["short_name"], ipo["source"] = company, company.upper(), item.get("exchange")
+            updated.add(normalize_name(company))
+
+    for ipo in ipos:
+        status = ipo_status(ipo, today)
+        if ipo.get("status") != status:
+            ipo["status"] = status
+            updated.add(normalize_name(ipo.get("name", "")))
+
+    cutoff = (date.fromisoformat(today) - timedelta(days=RSS_CANDIDATE_MAX_AGE_DAYS)).isoformat()
+    kept = [
+        ipo for ipo in ipos
+        if not (ipo.get("source") == RSS_SOURCE and not ipo.get("open_date") and (ipo.get("last_seen") or "") < cutoff)
+    ]
+    expired = len(ipos) - len(kept)
+    ipos[:] = kept
+
+    return {"added": len(added), "updated": len(updated - added), "expired": expired}
+
+
+def write_registry(registry: Dict):
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{REGISTRY_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
         json.dump(registry, f, indent=2)
+    os.replace(tmp_path, REGISTRY_PATH)
+
+
+# --------------------
+# REGISTRY UPDATER
+# --------------------
+def update_ipo_registry() -> Dict[str, int]:
+    """Fetches every source and merges the results into the registry on disk."""
+    today = datetime.now(IST).strftime("%Y-%m-%d")
+    fetched = fetch_sources()
+    if not fetched["rss"] and not fetched["exchanges"]:
+        raise RuntimeError("IPO registry update: every source failed")
+
+    registry = load_registry_file()
+    stats = merge_into_registry(registry, fetched["rss"], fetched["exchanges"], today)
+    registry["updated_on"] = today
+    write_registry(registry)
+    reload_registry()
+
+    logger.info(
+        f"IPO registry updated: {stats['added']} new, {stats['updated']} updated, {stats['expired']} expired, "
+        f"{len(registry['ipos'])} total ({len(fetched['rss'])} headlines, {len(fetched['exchanges'])} exchange entries)"
+    )
+    return stats
+
 
-    print(f"IPO registry rebuilt. Total IPOs found: {len(registry['ipos'])}")
-    print(f"Saved to: {REGISTRY_PATH}")
+def register_ipo_registry_job(job_scheduler):
+    return job_scheduler.add_cron(
+        "ipo_registry_update", update_ipo_registry, UPDATE_CRON,
+        jitter=120, catch_up=UPDATE_CATCH_UP, retry_delay=30 * 60
+    )
 
 
 if __name__ == "__main__":
-    rebuild_ipo_registry()
+    logging.basicConfig(level=logging.INFO)
+    update_ipo_registry()
@@ -0,0 +1,416 @@
+"""
+LLM Gateway
+Single entry point for every chat completion sent to the NVIDIA-hosted model.
+
+- One pooled HTTP client (keep-alive connections shared by all callers)
+- Global concurrency limit: at most MAX_CONCURRENT_REQUESTS calls in flight; extra callers queue.
+  RESERVED_PRIORITY_SLOTS of them are kept for PRIORITY_WORK_CLASSES (quick user lookups,
+  tagged by the work scheduler via `work_class_scope`), whose callers also go ahead of
+  queued research and background calls
+- Token-per-minute budget: callers wait for budget instead of tripping the provider's rate limit
+- Retries with exponential backoff + jitter on 429 / 5xx / timeouts (honours Retry-After)
+- Content-addressed response cache: identical (model, messages, params) requests are answered
+  from memory within a per-call-site TTL; long-lived entries are also persisted to disk
+- Optional streaming: pass `on_delta` to receive text fragments as the model produces them
+- Every call (including cache hits and failures) is recorded by providers/llm_metrics.py
+
+Callers get the message content back as a string and keep their own except blocks for
+the final failure (raised as LLMError after retries are exhausted).
+"""
+
+import os
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+import contextvars
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+from typing import Callable, List, Dict, Optional
+
+import httpx
+import openai
+from openai import OpenAI
+from config import NVIDIA_API_KEY
+from providers.llm_metrics import record_call
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://integrate.api.nvidia.com/v1"
+MODEL = "meta/llama-3.3-70b-instruct"
+
+MAX_CONCURRENT_REQUESTS = 6      # in-flight completions across the whole process
+RESERVED_PRIORITY_SLOTS = 2      # of which only priority work may use these
+PRIORITY_WORK_CLASSES = {"quote"}
+TOKENS_PER_MINUTE = 120_000      # prompt + completion budget per rolling minute
+DEFAULT_COMPLETION_TOKENS = 1024 # assumed completion size when max_tokens isn't given
+QUEUE_TIMEOUT = 180              # seconds a caller may wait for a slot before giving up
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.5               # seconds; doubled every retry
+REQUEST_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+# Response cache TTLs (seconds) per call site. Call sites not listed are never cached.
+CACHE_TTLS = {
+    "events.macro_query": 30 * 24 * 3600,      # company -> sector query: effectively permanent
+    "attention.social_query": 30 * 24 * 3600,
+    "context.asset_context": 7 * 24 * 3600,    # neutral company description
+    "agent.intent_parse": 10 * 60,
+    "agent.summarize": 10 * 60,                # summaries embed live prices/news
+}
+CACHE_MAX_ENTRIES = 1000
+CACHE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "llm_cache.jsonl")
+CACHE_PERSIST_MIN_TTL = 24 * 3600              # only entries living at least this long are written to disk
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class LLMError(Exception):
+    """Raised when a completion fails after all retries (or the queue wait times out)."""
+
+
+class _PrioritySlots:
+    """
+    Concurrency limit where `reserved` slots are only handed to priority callers, and a
+    waiting priority caller gets the next free slot before anyone else.
+    """
+
+    def __init__(self, total: int, reserved: int):
+        self.total = total
+        self.reserved = reserved
+        self._in_use = 0
+        self._priority_waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, priority: bool, timeout: float) -> bool:
+        limit = self.total if priority else self.total - self.reserved
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            if priority:
+                self._priority_waiting += 1
+            try:
+                while self._in_use >= limit or (not priority and self._priority_waiting):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._cond.wait(timeout=remaining)
+                self._in_use += 1
+                return True
+            finally:
+                if priority:
+                    self._priority_waiting -= 1
+
+    def release(self):
+        with self._cond:
+            self._in_use -= 1
+            self._cond.notify_all()
+
+
+class _TokenBudget:
+    """Rolling one-minute token budget shared by all threads."""
+
+    def __init__(self, tokens_per_minute: int):
+        self.tokens_per_minute = tokens_per_minute
+        self._window = deque()  # (timestamp, tokens)
+        self._used = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, tokens: int, timeout: float) -> tuple:
+        """Blocks until `tokens` fit in the window; returns the charge (for `refund`)."""
+        # A single oversized request is allowed through once the window is empty
+        tokens = min(tokens, self.tokens_per_minute)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                self._expire()
+                if self._used + tokens <= self.tokens_per_minute:
+                    charge = (time.monotonic(), tokens)
+                    self._window.append(charge)
+                    self._used += tokens
+                    return charge
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise LLMError("Token-per-minute budget exhausted; request timed out in queue")
+                wait = self._window[0][0] + 60 - time.monotonic() if self._window else 0.5
+                self._cond.wait(timeout=max(0.05, min(wait, remaining)))
+
+    def refund(self, charge: tuple):
+        """Returns a charge for a request that was never sent (no-op once it has expired)."""
+        with self._cond:
+            try:
+                self._window.remove(charge)
+            except ValueError:
+                return
+            self._used -= charge[1]
+            self._cond.notify_all()
+
+    def _expire(self):
+        cutoff = time.monotonic() - 60
+        while self._window and self._window[0][0] < cutoff:
+            _, tokens = self._window.popleft()
+            self._used -= tokens
+
+
+class _ResponseCache:
+    """Thread-safe LRU of completion texts keyed by request hash, with per-entry expiry."""
+
+    def __init__(self, max_entries: int, path: str = None):
+        self.max_entries = max_entries
+        self.path = path
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, content)
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, content: str, ttl: float):
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._load()
+            self._entries[key] = (expires_at, content)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if self.path and ttl >= CACHE_PERSIST_MIN_TTL:
+            self._append(key, expires_at, content)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _append(self, key: str, expires_at: float, content: str):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"k": key, "e": round(expires_at), "c": content}) + "\n")
+        except Exception as e:
+            logger.warning(f"Could not persist LLM cache entry: {e}")
+
+    def _load(self):
+        # Called with the lock held. Rewrites the file with only live entries, so it stays small.
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        now = time.time()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    if rec.get("e", 0) > now and rec.get("c"):
+                        self._entries[rec["k"]] = (rec["e"], rec["c"])
+                        self._entries.move_to_end(rec["k"])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for key, (expires_at, content) in self._entries.items():
+                    f.write(json.dumps({"k": key, "e": expires_at, "c": content}) + "\n")
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Error loading LLM response cache: {e}")
+
+
+_client: Optional[OpenAI] = None
+_client_lock = threading.Lock()
+_slots = _PrioritySlots(MAX_CONCURRENT_REQUESTS, RESERVED_PRIORITY_SLOTS)
+_work_class: contextvars.ContextVar = contextvars.ContextVar("llm_work_class", default=None)
+_budget = _TokenBudget(TOKENS_PER_MINUTE)
+_cache = _ResponseCache(CACHE_MAX_ENTRIES, CACHE_FILE)
+
+
+@contextmanager
+def work_class_scope(work_class: str):
+    """Marks LLM calls made inside the block as `work_class` work (see PRIORITY_WORK_CLASSES)."""
+    token = _work_class.set(work_class)
+    try:
+        yield
+    finally:
+        _work_class.reset(token)
+
+
+def get_client() -> OpenAI:
+    """The shared OpenAI-compatible client with a pooled HTTP transport."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            http_client = httpx.Client(
+                timeout=REQUEST_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONCURRENT_REQUESTS * 2,
+                    max_keepalive_connections=MAX_CONCURRENT_REQUESTS,
+                ),
+            )
+            # Retries are handled here (with budget awareness), not inside the SDK
+            _client = OpenAI(base_url=BASE_URL, api_key=NVIDIA_API_KEY, http_client=http_client, max_retries=0)
+        return _client
+
+
+def estimate_tokens(messages: List[Dict]) -> int:
+    """Rough prompt size: ~4 characters per token."""
+    return sum(len(m.get("content") or "") for m in messages) // 4 + 4 * len(messages)
+
+
+def cache_key(request: Dict) -> str:
+    """sha256 of the canonical JSON form of model + messages + sampling params."""
+    canonical = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def cache_stats() -> Dict:
+    return {"entries": len(_cache._entries), "hits": _cache.hits, "misses": _cache.misses}
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    retry_after = None
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            retry_after = float(response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            retry_after = None
+    delay = BACKOFF_BASE * (2 ** attempt)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay + random.uniform(0, delay * 0.25)
+
+
+def chat_completion(
+    messages: List[Dict],
+    model: str = MODEL,
+    call_site: str = "unknown",
+    max_tokens: int = None,
+    temperature: float = None,
+    cache_ttl: float = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+    **params,
+) -> str:
+    """
+    Sends a chat completion through the shared gateway and returns the message content
+    ("" if the model returned nothing). Raises LLMError once retries are exhausted.
+
+    `cache_ttl` overrides the call site's entry in CACHE_TTLS (0 disables caching).
+    Empty responses and failures are never cached.
+
+    If `on_delta` is given the completion is streamed and `on_delta(text)` is called with
+    each fragment (from the calling thread); the full text is still returned at the end.
+    A stream that fails after text was emitted is not retried.
+    """
+    started = time.monotonic()
+    stats = {"wait": 0.0, "ttft": None, "usage": None, "retries": 0, "cached": False}
+    try:
+        content = _complete(messages, model, call_site, max_tokens, temperature, cache_ttl, on_delta, params, stats)
+    except Exception as e:
+        record_call(call_site, model, prompt_tokens=estimate_tokens(messages), latency=time.monotonic() - started,
+                    queue_wait=stats["wait"], ok=False, error=str(e), retries=stats["retries"])
+        raise
+
+    usage = stats["usage"]
+    record_call(
+        call_site, model,
+        prompt_tokens=getattr(usage, "prompt_tokens", None) or estimate_tokens(messages),
+        completion_tokens=getattr(usage, "completion_tokens", None) or len(content) // 4,
+        latency=time.monotonic() - started, queue_wait=stats["wait"], ttft=stats["ttft"],
+        cached=stats["cached"], retries=stats["retries"],
+    )
+    return content
+
+
+def _complete(messages, model, call_site, max_tokens, temperature, cache_ttl, on_delta, params, stats) -> str:
+    request = {"model": model, "messages": messages, **params}
+    if max_tokens is not None:
+        request["max_tokens"] = max_tokens
+    if temperature is not None:
+        request["temperature"] = temperature
+
+    ttl = CACHE_TTLS.get(call_site, 0) if cache_ttl is None else cache_ttl
+    key = cache_key(request) if ttl > 0 else None
+    if key:
+        cached = _cache.get(key)
+        if cached is not None:
+            logger.debug(f"LLM cache hit ({call_site})")
+            stats["cached"] = True
+            if on_delta:
+                on_delta(cached)
+            return cached
+
+    tokens = estimate_tokens(messages) + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+    client = get_client()
+    priority = _work_class.get() in PRIORITY_WORK_CLASSES
+
+    # The budget is charged once per request; retries reuse the charge
+    queued = time.monotonic()
+    charge = _budget.acquire(tokens, timeout=QUEUE_TIMEOUT)
+    last_error = None
+    for attempt in range(MAX_RETRIES + 1):
+        stats["retries"] = attempt
+        if not _slots.acquire(priority, timeout=QUEUE_TIMEOUT):
+            if last_error is None:
+                _budget.refund(charge)
+            raise LLMError(f"LLM gateway busy: no slot free within {QUEUE_TIMEOUT}s ({call_site})")
+        sent = time.monotonic()
+        stats["wait"] += sent - queued
+        emitted = False
+        try:
+            if on_delta is None:
+                response = client.chat.completions.create(**request)
+                if not response or not response.choices:
+                    return ""
+                stats["usage"] = getattr(response, "usage", None)
+                content = response.choices[0].message.content or ""
+            else:
+                parts = []
+                for chunk in client.chat.completions.create(**request, stream=True):
+                    if getattr(chunk, "usage", None):
+                        stats["usage"] = chunk.usage
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        if not emitted:
+                            stats["ttft"] = time.monotonic() - sent
+                        parts.append(delta)
+                        emitted = True
+                        on_delta(delta)
+                content = "".join(parts)
+            if key and content.strip():
+                _cache.put(key, content, ttl)
+            return content
+        except RETRYABLE_ERRORS as e:
+            if emitted:
+                raise LLMError(f"LLM stream interrupted ({call_site}): {e}") from e
+            last_error = e
+        except openai.APIStatusError as e:
+            # Other 4xx errors (bad request, auth) won't succeed on retry
+            raise LLMError(f"LLM request failed ({call_site}): {e}") from e
+        finally:
+            _slots.release()
+
+        if attempt < MAX_RETRIES:
+            delay = _retry_delay(last_error, attempt)
+            logger.warning(f"LLM call '{call_site}' failed ({type(last_error).__name__}); retry {attempt + 1}/{MAX_RETRIES} in {delay:.1f}s")
+            time.sleep(delay)
+            queued = time.monotonic()
+
+    raise LLMError(f"LLM request failed after {MAX_RETRIES} retries ({call_site}): {last_error}") from last_error
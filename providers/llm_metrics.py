@@ -0,0 +1,196 @@
+"""
+LLM Call Metrics
+Records every chat completion that goes through the LLM gateway, for capacity planning.
+
+Each record: call site, user intent (set per request via `intent_scope`), prompt and
+completion tokens, queue wait, time-to-first-token (streamed calls), total latency,
+cache hits and failures.
+
+- Kept in memory as a rolling window of the last MAX_RECORDS calls
+- Persisted to an append-only JSONL file (compacted to the window when it doubles),
+  so statistics survive restarts
+- `summarize()` / `format_llm_stats()` report p50/p95 latency and token volume per call site
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+METRICS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "llm_calls.jsonl")
+MAX_RECORDS = 20000
+
+_current_intent: contextvars.ContextVar = contextvars.ContextVar("llm_intent", default=None)
+
+_lock = threading.Lock()
+_records: deque = deque(maxlen=MAX_RECORDS)
+_log_lines = 0
+_loaded = False
+
+
+@contextmanager
+def intent_scope(intent: str):
+    """
+    Tags every LLM call made inside the block with `intent`. Thread pools don't inherit
+    it: submit work with `contextvars.copy_context().run` to keep the tag.
+    """
+    token = _current_intent.set(intent)
+    try:
+        yield
+    finally:
+        _current_intent.reset(token)
+
+
+def set_intent(intent: str):
+    """Tags the rest of the current request. Use inside an intent_scope so it is reset."""
+    _current_intent.set(intent)
+
+
+def current_intent() -> Optional[str]:
+    return _current_intent.get()
+
+
+def record_call(call_site: str, model: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+                latency: float = 0.0, queue_wait: float = 0.0, ttft: float = None,
+                ok: bool = True, cached: bool = False, error: str = None, retries: int = 0):
+    rec = {
+        "ts": round(time.time(), 1),
+        "site": call_site,
+        "intent": current_intent(),
+        "model": model,
+        "pt": int(prompt_tokens or 0),
+        "ct": int(completion_tokens or 0),
+        "lat": round(latency, 3),
+        "wait": round(queue_wait, 3),
+        "ttft": round(ttft, 3) if ttft is not None else None,
+        "ok": ok,
+        "cached": cached,
+        "retries": retries,
+    }
+    if error:
+        rec["err"] = error[:200]
+    with _lock:
+        _load()
+        _records.append(rec)
+        _append(rec)
+
+
+def _append(rec: Dict):
+    # Called with the lock held
+    global _log_lines
+    try:
+        os.makedirs(os.path.dirname(METRICS_FILE), exist_ok=True)
+        if _log_lines >= 2 * MAX_RECORDS:
+            tmp_path = f"{METRICS_FILE}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for r in _records:
+                    f.write(json.dumps(r) + "\n")
+            os.replace(tmp_path, METRICS_FILE)
+            _log_lines = len(_records)
+        else:
+            with open(METRICS_FILE, "a", encoding="utf-8") as f:
+                f.write(json.dumps(rec) + "\n")
+            _log_lines += 1
+    except Exception as e:
+        logger.warning(f"Could not persist LLM metrics: {e}")
+
+
+def _load():
+    # Called with the lock held
+    global _loaded, _log_lines
+    if _loaded:
+        return
+    _loaded = True
+    if not os.path.exists(METRICS_FILE):
+        return
+    try:
+        with open(METRICS_FILE, "r", encoding="utf-8") as f:
+            for line in f:
+                _log_lines += 1
+                try:
+                    _records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except Exception as e:
+        logger.error(f"Error loading LLM metrics: {e}")
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def summarize(hours: float = 24, group_by: str = "site") -> List[Dict]:
+    """Per call site (or per intent) statistics over the last `hours`, busiest first."""
+    cutoff = time.time() - hours * 3600
+    with _lock:
+        _load()
+        recent = [r for r in _records if r.get("ts", 0) >= cutoff]
+
+    groups: Dict[str, List[Dict]] = {}
+    for r in recent:
+        groups.setdefault(r.get(group_by) or "unknown", []).append(r)
+
+    rows = []
+    for name, recs in groups.items():
+        live = [r for r in recs if r.get("ok") and not r.get("cached")]
+        latencies = [r["lat"] for r in live]
+        ttfts = [r["ttft"] for r in live if r.get("ttft") is not None]
+        rows.append({
+            "name": name,
+            "calls": len(recs),
+            "failures": sum(1 for r in recs if not r.get("ok")),
+            "cache_hits": sum(1 for r in recs if r.get("cached")),
+            "p50_latency": _percentile(latencies, 50),
+            "p95_latency": _percentile(latencies, 95),
+            "p50_ttft": _percentile(ttfts, 50),
+            "p95_wait": _percentile([r.get("wait", 0) for r in live], 95),
+            "prompt_tokens": sum(r.get("pt", 0) for r in live),
+            "completion_tokens": sum(r.get("ct", 0) for r in live),
+        })
+    rows.sort(key=lambda r: r["prompt_tokens"] + r["completion_tokens"], reverse=True)
+    return rows
+
+
+def _fmt_seconds(value: Optional[float]) -> str:
+    return f"{value:.1f}s" if value is not None else "-"
+
+
+def format_llm_stats(hours: float = 24) -> str:
+    """Plain-text report of LLM usage per call site and per intent."""
+    sites = summarize(hours, "site")
+    if not sites:
+        return f"No LLM calls recorded in the last {hours:g}h."
+
+    total_calls = sum(r["calls"] for r in sites)
+    total_tokens = sum(r["prompt_tokens"] + r["completion_tokens"] for r in sites)
+    lines = [f"🤖 LLM usage — last {hours:g}h: {total_calls} calls, {total_tokens:,} tokens", ""]
+    lines.append("Call site | calls (fail/cache) | p50 / p95 latency | p50 TTFT | p95 queue | tokens in / out")
+    for r in sites:
+        lines.append(
+            f"{r['name']} | {r['calls']} ({r['failures']}/{r['cache_hits']}) | "
+            f"{_fmt_seconds(r['p50_latency'])} / {_fmt_seconds(r['p95_latency'])} | "
+            f"{_fmt_seconds(r['p50_ttft'])} | {_fmt_seconds(r['p95_wait'])} | "
+            f"{r['prompt_tokens']:,} / {r['completion_tokens']:,}"
+        )
+
+    intents = [r for r in summarize(hours, "intent") if r["name"] != "unknown"]
+    if intents:
+        lines += ["", "By intent | calls | p95 latency | tokens"]
+        for r in intents:
+            lines.append(
+                f"{r['name']} | {r['calls']} | {_fmt_seconds(r['p95_latency'])} | "
+                f"{r['prompt_tokens'] + r['completion_tokens']:,}"
+            )
+    return "\n".join(lines)
@@ -10,7 +10,28 @@ def fetch_news(query: str, limit: int = 5) -> List[Dict]:
     Fetch recent news articles for an asset using GNews API.
     Falls back to Google News RSS if GNews API key is rate-limited or fails.
     """
+    try:
+        return fetch_news_strict(query, limit)
+    except Exception:
+        return []
+
+
+def fetch_news_strict(query: str, limit: int = 5) -> List[Dict]:
+    """Like `fetch_news`, but raises when the Google News RSS fallback fails too.
+
+    Used by the adaptive feed scheduler, which needs to tell a quiet source
+    apart from a failing one.
+    """
+    try:
+        articles = _fetch_gnews(query, limit)
+        if articles:
+            return articles
+    except Exception:
+        pass
+    return _fetch_google_news_rss(query, limit)
 
+
+def _fetch_gnews(query: str, limit: int) -> List[Dict]:
     url = "https://gnews.io/api/v4/search"
 
     params = {
@@ -21,54 +42,45 @@ def fetch_news(query: str, limit: int = 5) -> List[Dict]:
         "apikey": GNEWS_API_KEY,
     }
 
-    try:
-        response = requests.get(url, params=params, timeout=4)
-        if response.status_code == 200:
-            data = response.json()
-            articles = []
+    response = requests.get(url, params=params, timeout=4)
+    response.raise_for_status()
+    data = response.json()
+    articles = []
 
-            for item in data.get("articles", []):
-                articles.append({
-                    "title": item.get("title"),
-                    "description": item.get("description"),
-                    "source": item.get("source", {}).get("name", "GNews"),
-                    "published_at": item.get("publishedAt"),
-                    "url": item.get("url"),
-                })
+    for item in data.get("articles", []):
+        articles.append({
+            "title": item.get("title"),
+            "description": item.get("description"),
+            "source": item.get("source", {}).get("name", "GNews"),
+            "published_at": item.get("publishedAt"),
+            "url": item.get("url"),
+        })
+    return articles
 
-            if articles:
-                return articles
-    except Exception:
-        pass
 
+def _fetch_google_news_rss(query: str, limit: int) -> List[Dict]:
     # =====================================================
     # FALLBACK: Fetch via Free Google News RSS Feed
     # feedparser.parse(url) has no timeout — must fetch with requests first
     # =====================================================
-    try:
-        url_rss = f"https://news.google.com/rss/search?q={query.replace(' ', '+')}&hl=en-IN&gl=IN&ceid=IN:en"
-        rss_response = requests.get(url_rss, timeout=4, headers={"User-Agent": "Mozilla/5.0"})
-        feed = feedparser.parse(rss_response.content)
-        articles = []
-        for entry in feed.entries[:limit]:
-            published = None
-            try:
-                if entry.get("published_parsed"):
-                    published = datetime(*entry.published_parsed[:6]).strftime("%Y-%m-%dT%H:%M:%SZ")
-            except Exception:
-                pass
-
-            articles.append({
-                "title": entry.get("title"),
-                "description": entry.get("summary") or entry.get("title"),
-                "source": entry.get("source", {}).get("title", "Google News RSS"),
-                "published_at": published,
-                "url": entry.get("link")
-            })
-        if articles:
-            return articles
-    except Exception:
-        pass
-
-    return []
+    url_rss = f"https://news.google.com/rss/search?q={query.replace(' ', '+')}&hl=en-IN&gl=IN&ceid=IN:en"
+    rss_response = requests.get(url_rss, timeout=4, headers={"User-Agent": "Mozilla/5.0"})
+    rss_response.raise_for_status()
+    feed = feedparser.parse(rss_response.content)
+    articles = []
+    for entry in feed.entries[:limit]:
+        published = None
+        try:
+            if entry.get("published_parsed"):
+                published = datetime(*entry.published_parsed[:6]).strftime("%Y-%m-%dT%H:%M:%SZ")
+        except Exception:
+            pass
 
+        articles.append({
+            "title": entry.get("title"),
+            "description": entry.get("summary") or entry.get("title"),
+            "source": entry.get("source", {}).get("title", "Google News RSS"),
+            "published_at": published,
+            "url": entry.get("link")
+        })
+    return articles
@@ -308,6 +308,23 @@ def get_insider_trading() -> list:
     return []
 
 
+def get_trading_holidays() -> list:
+    """NSE equity (CM segment) trading holidays as YYYY-MM-DD strings, [] on failure."""
+    try:
+        data = _nse_api_get("/api/holiday-master?type=trading")
+        if isinstance(data, dict):
+            dates = []
+            for item in data.get("CM", []):
+                try:
+                    dates.append(datetime.strptime(item["tradingDate"], "%d-%b-%Y").strftime("%Y-%m-%d"))
+                except (KeyError, ValueError):
+                    continue
+            return dates
+    except Exception as e:
+        logger.error(f"Error fetching NSE trading holidays: {e}")
+    return []
+
+
 def get_nse_full_snapshot() -> dict:
     """
     Aggregates all NSE data into a single comprehensive market snapshot.
@@ -10,7 +10,9 @@ Data sources (in fallback order):
 Pivot levels use yfinance for previous-day OHLC (Nifty ^NSEI, BankNifty ^NSEBANK).
 """
 
+import time
 import logging
+import threading
 import concurrent.futures
 from datetime import datetime, timedelta
 
@@ -190,6 +192,47 @@ def get_pcr_data() -> dict:
     }
 
 
+# Latest successful PCR reading, kept fresh during market hours by the PCR sampler job
+PCR_MAX_AGE = 5 * 60
+# The sampler usually runs in the core service; the bots read its samples from the state store
+PCR_STATE_KEY = "pcr.latest"
+_pcr_lock = threading.Lock()
+_latest_pcr = {"ts": 0.0, "data": None}
+
+
+def sample_pcr_data() -> dict:
+    """Fetches PCR now and, if it succeeded, stores it as the latest reading."""
+    data = get_pcr_data()
+    if data.get("nifty_pcr") is not None:
+        now = time.time()
+        with _pcr_lock:
+            _latest_pcr.update(ts=now, data=data)
+        try:
+            from capabilities import state_store
+            state_store.set_state(PCR_STATE_KEY, {"ts": now, "data": data})
+        except Exception as e:
+            logger.warning(f"Could not store PCR sample: {e}")
+    return data
+
+
+def get_latest_pcr(max_age: float = PCR_MAX_AGE) -> dict:
+    """The sampled PCR (from any process) if it is younger than `max_age` seconds, otherwise a fresh fetch."""
+    with _pcr_lock:
+        if _latest_pcr["data"] is not None and time.time() - _latest_pcr["ts"] < max_age:
+            return _latest_pcr["data"]
+    try:
+        from capabilities import state_store
+        stored = state_store.get_state(PCR_STATE_KEY)
+    except Exception as e:
+        logger.warning(f"Could not read stored PCR sample: {e}")
+        stored = None
+    if stored and stored.get("data") and time.time() - stored.get("ts", 0) < max_age:
+        with _pcr_lock:
+            _latest_pcr.update(ts=stored["ts"], data=stored["data"])
+        return stored["data"]
+    return sample_pcr_data()
+
+
 # ---------------------------------------------------------------------------
 #  2.  Pivot Levels (Classic)
 # ---------------------------------------------------------------------------
@@ -302,7 +345,7 @@ def get_options_snapshot() -> dict:
         {'pcr': {...}, 'levels': {...}}
     """
     with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-        pcr_future = executor.submit(get_pcr_data)
+        pcr_future = executor.submit(get_latest_pcr)
         levels_future = executor.submit(get_pivot_levels)
 
         try:
@@ -2,10 +2,20 @@ import yfinance as yf
 import datetime
 import logging
 
+from providers.cache_utils import ttl_cached  # also imported from here by older callers
+
 # Suppress yfinance internal error logging to keep the console clean
 yf_logger = logging.getLogger('yfinance')
 yf_logger.setLevel(logging.CRITICAL)
 
+# Lookup caches. Resolved symbols rarely change; quotes are only reused briefly
+# (long enough for a speculative prefetch to be picked up by the real request).
+SYMBOL_CACHE_TTL = 24 * 3600
+SYMBOL_MISS_TTL = 10 * 60
+QUOTE_CACHE_TTL = 60
+
+
+@ttl_cached(SYMBOL_CACHE_TTL, SYMBOL_MISS_TTL)
 def search_symbol(query: str):
     """
     Resolve a company name or ticker to a Yahoo symbol.
@@ -41,6 +51,7 @@ def search_symbol(query: str):
         return None
 
 
+@ttl_cached(QUOTE_CACHE_TTL)
 def get_market_data(symbol: str):
     try:
         stock = yf.Ticker(symbol)
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the bot's packages (capabilities, providers) from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def state_db(tmp_path, monkeypatch):
+    """Points the SQLite state store at a throwaway database."""
+    from capabilities import state_store
+
+    path = str(tmp_path / "state.db")
+    monkeypatch.setattr(state_store, "DB_FILE", path)
+    return path
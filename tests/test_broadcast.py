@@ -0,0 +1,67 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+import pytest
+
+from capabilities import broadcast as bc
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters(monkeypatch):
+    monkeypatch.setattr(bc, "_limiters", {})
+    monkeypatch.setattr(bc, "BACKOFF_BASE", 0)
+
+
+def http_error(cls, status):
+    return cls(SimpleNamespace(status=status, reason="error"), "error")
+
+
+def test_discord_forbidden_and_not_found_are_not_retried():
+    calls = []
+
+    async def send(chat_id):
+        calls.append(chat_id)
+        raise http_error(discord.Forbidden if chat_id == 1 else discord.NotFound, 403 if chat_id == 1 else 404)
+
+    stats = asyncio.run(bc.broadcast([1, 2], send, platform="discord"))
+    assert calls == [1, 2]
+    assert stats["failed"] == 2 and stats["retries"] == 0
+    assert stats["failed_chats"] == [1, 2]
+
+
+def test_transient_discord_errors_are_retried():
+    attempts = []
+
+    async def send(chat_id):
+        attempts.append(chat_id)
+        if len(attempts) < 2:
+            raise http_error(discord.HTTPException, 500)
+
+    stats = asyncio.run(bc.broadcast([1], send, platform="discord"))
+    assert stats["sent"] == 1 and stats["retries"] == 1
+
+
+def test_discord_rate_limit_pauses_only_discord():
+    attempts = []
+
+    async def send(chat_id):
+        attempts.append(chat_id)
+        if len(attempts) == 1:
+            raise discord.RateLimited(0.01)
+
+    async def run():
+        stats = await bc.broadcast([1], send, platform="discord")
+        return stats, bc.get_limiter("discord")._paused_until, bc.get_limiter("telegram")._paused_until
+
+    stats, discord_pause, telegram_pause = asyncio.run(run())
+    assert stats["sent"] == 1 and stats["retries"] == 1
+    assert discord_pause > 0 and telegram_pause == 0
+
+
+def test_platforms_get_their_own_limits():
+    telegram, discord_limiter = bc.get_limiter("telegram"), bc.get_limiter("discord")
+    assert telegram is not discord_limiter
+    assert telegram.rate == bc.GLOBAL_RATE
+    assert discord_limiter.rate == bc.DISCORD_GLOBAL_RATE
+    assert discord_limiter.chat_interval == bc.DISCORD_CHANNEL_INTERVAL
@@ -0,0 +1,42 @@
+from providers.cache_utils import ttl_cached
+
+
+def make_lookup(**kwargs):
+    calls = []
+
+    @ttl_cached(60, **kwargs)
+    def lookup(arg):
+        calls.append(arg)
+        return f"value for {arg}"
+
+    return lookup, calls
+
+
+def test_string_keys_are_normalized_by_default():
+    lookup, calls = make_lookup()
+    assert lookup("Reliance") == "value for Reliance"
+    assert lookup(" reliance ") == "value for Reliance"
+    assert calls == ["Reliance"]
+
+
+def test_normalize_key_false_keeps_case_sensitive_urls_apart():
+    lookup, calls = make_lookup(normalize_key=False)
+    lookup("https://example.com/ipo/ABC")
+    lookup("https://example.com/ipo/abc")
+    lookup("https://example.com/ipo/ABC")
+    assert calls == ["https://example.com/ipo/ABC", "https://example.com/ipo/abc"]
+
+
+def test_refresh_replaces_the_cached_value():
+    lookup, calls = make_lookup(normalize_key=False)
+    lookup("URL")
+    lookup.refresh("URL")
+    lookup("URL")
+    assert calls == ["URL", "URL"]
+
+
+def test_max_entries_evicts_oldest():
+    lookup, calls = make_lookup(max_entries=2)
+    for arg in ("a", "b", "c", "a"):
+        lookup(arg)
+    assert calls == ["a", "b", "c", "a"]
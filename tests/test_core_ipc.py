@@ -0,0 +1,113 @@
+import asyncio
+import socket
+
+import pytest
+
+from capabilities import core_ipc
+from capabilities.core_ipc import CoreHub, EmbeddedEngine, run_core_client
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(core_ipc, "RECONNECT_DELAY", 0.05)
+    monkeypatch.setattr(core_ipc, "EMBEDDED_RETRY_INTERVAL", 0.05)
+    monkeypatch.setattr(core_ipc, "HANDSHAKE_TIMEOUT", 1)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_for(condition, timeout=3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.02)
+
+
+def test_authenticated_frontend_gets_sticky_report_date():
+    async def run():
+        port = free_port()
+        hub = CoreHub(port=port, secret=b"s3cret")
+        await hub.start()
+        await hub.publish({"type": "daily_report", "date": "2026-10-19"})
+        received = []
+
+        async def on_report(event):
+            received.append(event)
+
+        client = asyncio.create_task(run_core_client(
+            "telegram", {"daily_report": on_report}, on_unavailable=lambda: None,
+            port=port, secret=b"s3cret"))
+        try:
+            await wait_for(lambda: received)
+        finally:
+            client.cancel()
+            await hub.close()
+        return received
+
+    received = asyncio.run(run())
+    assert received[0]["date"] == "2026-10-19"
+    assert "path" not in received[0]
+
+
+def test_frontend_rejects_core_without_the_secret():
+    async def run():
+        port = free_port()
+        hub = CoreHub(port=port, secret=b"impostor")
+        await hub.start()
+        await hub.publish({"type": "breaking_alert", "text": "fake"})
+        received, fallbacks = [], []
+
+        async def on_alert(event):
+            received.append(event)
+
+        client = asyncio.create_task(run_core_client(
+            "telegram", {"breaking_alert": on_alert}, on_unavailable=lambda: fallbacks.append(1),
+            port=port, secret=b"s3cret"))
+        try:
+            await wait_for(lambda: fallbacks)
+            await asyncio.sleep(0.2)
+        finally:
+            client.cancel()
+            await hub.close()
+        return received, fallbacks, hub
+
+    received, fallbacks, hub = asyncio.run(run())
+    assert received == []
+    assert fallbacks == [1]
+    assert hub._clients == {}
+
+
+def test_embedded_engine_stops_when_core_comes_up():
+    class Scheduler:
+        def __init__(self):
+            self.jobs = {"cache_warmer": object()}
+
+        def remove(self, name):
+            self.jobs.pop(name, None)
+
+    async def run():
+        port = free_port()
+        scheduler = Scheduler()
+        engine = EmbeddedEngine(scheduler, lambda: scheduler.jobs.update(breaking_news_scanner=object()))
+        client = asyncio.create_task(run_core_client(
+            "discord", {}, on_unavailable=engine.start, on_available=engine.stop,
+            port=port, secret=b"s3cret"))
+        hub = None
+        try:
+            await wait_for(lambda: "breaking_news_scanner" in scheduler.jobs)
+            hub = CoreHub(port=port, secret=b"s3cret")
+            await hub.start()
+            await wait_for(lambda: "breaking_news_scanner" not in scheduler.jobs)
+        finally:
+            client.cancel()
+            if hub:
+                await hub.close()
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert list(scheduler.jobs) == ["cache_warmer"]
@@ -0,0 +1,45 @@
+import json
+from datetime import date
+
+from providers.economic_calendar import EventCalendar
+
+SEED = {
+    "events": [
+        {"id": "fomc-2026-09", "name": "US Federal Reserve FOMC Meeting", "category": "FOMC",
+         "start": "2026-09-15", "end": "2026-09-16"},
+        {"id": "rbi-mpc-2026-12", "name": "RBI Monetary Policy Committee (MPC) Meeting", "category": "RBI MPC",
+         "start": "2026-12-02", "end": "2026-12-04"},
+    ]
+}
+
+
+def make_calendar(tmp_path):
+    path = tmp_path / "economic_calendar.json"
+    path.write_text(json.dumps(SEED), encoding="utf-8")
+    return path, EventCalendar(str(path))
+
+
+def test_seed_file_is_never_written(tmp_path):
+    path, cal = make_calendar(tmp_path)
+    before = path.read_bytes()
+    cal.refresh(date(2026, 11, 20))
+    cal.upcoming(30, today=date(2026, 11, 20))
+    assert path.read_bytes() == before
+    assert not (tmp_path / "economic_calendar.json.tmp").exists()
+
+
+def test_generated_events_and_range_query(tmp_path):
+    _, cal = make_calendar(tmp_path)
+    events = cal.upcoming(14, today=date(2026, 11, 25))
+    names = {e["name"] for e in events}
+    assert "RBI Monetary Policy Committee (MPC) Meeting" in names
+    assert "US Non-Farm Payrolls (NFP)" in names          # first Friday: 2026-12-04
+    assert "Nifty Weekly Options Expiry" in names
+    assert "India CPI Inflation Data" not in names        # 2026-11-12 is past, 2026-12-12 is outside
+    assert [e["start"] for e in events] == sorted(e["start"] for e in events)
+
+
+def test_old_seed_events_are_pruned_in_memory(tmp_path):
+    _, cal = make_calendar(tmp_path)
+    cal.refresh(date(2026, 11, 20))
+    assert cal.events_between(date(2026, 9, 1), date(2026, 9, 30)) == []
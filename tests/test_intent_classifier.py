@@ -0,0 +1,54 @@
+import pytest
+
+from capabilities import intent_classifier as ic
+
+
+@pytest.fixture(autouse=True)
+def alias_maps(monkeypatch):
+    """Alias maps built from a few SECTOR_MAP / GEO_SENSITIVE_STOCKS style tickers."""
+    aliases, ticker_aliases = {}, dict(ic.TICKER_ONLY_ALIASES)
+    for root, name in [("OIL", "Oil India"), ("IOC", "Indian Oil Corporation"), ("SCI", "Shipping Corporation"),
+                       ("INFY", "Infosys"), ("RVNL", "RVNL")]:
+        ic._ticker_alias(root, name, aliases, ticker_aliases)
+    aliases["oil india"] = "Oil India"
+    aliases.update(ic.COMMON_ALIASES)
+    monkeypatch.setattr(ic, "_alias_map", aliases)
+    monkeypatch.setattr(ic, "_ticker_alias_map", ticker_aliases)
+
+
+@pytest.mark.parametrize("query", [
+    "crude oil price",
+    "what is the price of oil today",
+    "latest news on oil",
+    "news on ioc",
+    "sci news",
+    "lt",
+])
+def test_word_like_tickers_need_ticker_form(query):
+    assert ic.find_asset(query) is None
+
+
+@pytest.mark.parametrize("query, asset", [
+    ("OIL share price", "Oil India"),
+    ("IOC.NS price", "Indian Oil Corporation"),
+    ("ioc.ns news", "Indian Oil Corporation"),
+    ("price of LT", "Larsen & Toubro"),
+    ("oil india news", "Oil India"),
+    ("infy technicals", "Infosys"),
+    ("rvnl price", "RVNL"),
+])
+def test_assets_found(query, asset):
+    assert ic.find_asset(query) == asset
+
+
+def test_get_model_without_wait_never_trains_inline(monkeypatch):
+    started = []
+    monkeypatch.setattr(ic, "_model", None)
+    monkeypatch.setattr(ic, "_training", False)
+    monkeypatch.setattr(ic.threading, "Thread", lambda **kw: type("T", (), {"start": lambda self: started.append(kw)})())
+    monkeypatch.setattr(ic, "_fit", lambda: pytest.fail("trained on the caller's thread"))
+    assert ic.get_model(wait=False) is None
+    assert len(started) == 1
+    # A second call while training is under way doesn't start another
+    assert ic.get_model(wait=False) is None
+    assert len(started) == 1
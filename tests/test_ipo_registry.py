@@ -0,0 +1,66 @@
+import os
+import json
+
+import pytest
+
+from providers import ipo_registry
+from providers.ipo_registry import RegistryIndex
+
+IPOS = [
+    {"name": "Bharat Coking Coal", "short_name": "BHARAT COKING COAL", "status": "open"},
+    {"name": "UKB Electronics Limited", "short_name": "UKB ELECTRONICS LIMITED", "status": "upcoming"},
+    {"name": "Tata Technologies Limited", "short_name": "TATA TECHNOLOGIES LIMITED", "status": "closed"},
+    {"name": "Amagi Media Labs", "short_name": "AMAGI MEDIA LABS", "status": "unknown"},
+    {"name": "Jio Platforms", "short_name": "JIO PLATFORMS", "status": "upcoming"},
+    {"name": "Hindustan Power Projects", "short_name": "HINDUSTAN POWER PROJECTS", "status": "unknown"},
+]
+
+
+@pytest.fixture
+def index():
+    return RegistryIndex({"updated_on": "2026-10-19", "ipos": IPOS})
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Bharat Coking Coal", "Bharat Coking Coal"),                 # exact
+    ("BHARAT COKING COAL LTD", "Bharat Coking Coal"),             # noise suffix
+    ("coking coal", "Bharat Coking Coal"),                        # substring
+    ("jio platf", "Jio Platforms"),                               # cut-off last word
+    ("Tata Tech", "Tata Technologies Limited"),
+    ("ukb", "UKB Electronics Limited"),
+    ("Amagy Media Labs", "Amagi Media Labs"),                     # typo in a distinctive word
+])
+def test_find_matches(index, query, expected):
+    assert index.find(query)["name"] == expected
+
+
+@pytest.mark.parametrize("query", [
+    "lg electronics",        # shares only a generic word with UKB Electronics
+    "hindustan electronics", # generic words only
+    "reliance retail",
+    "zzzz",
+    "",
+    "limited",
+])
+def test_find_rejects_generic_or_unknown(index, query):
+    assert index.find(query) is None
+
+
+def test_status_buckets(index):
+    assert [i["name"] for i in index.by_status["upcoming"]] == ["UKB Electronics Limited", "Jio Platforms"]
+    assert len(index.by_status["open"]) == 1
+
+
+def test_reloads_only_when_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "ipo_registry.json"
+    path.write_text(json.dumps({"ipos": IPOS[:1]}), encoding="utf-8")
+    monkeypatch.setattr(ipo_registry, "REGISTRY_PATH", str(path))
+    monkeypatch.setattr(ipo_registry, "_index", None)
+
+    first = ipo_registry.get_registry_index()
+    assert len(first.ipos) == 1
+    assert ipo_registry.get_registry_index(force_check=True) is first
+
+    path.write_text(json.dumps({"ipos": IPOS}), encoding="utf-8")
+    os.utime(path, (first.mtime + 10, first.mtime + 10))
+    assert len(ipo_registry.reload_registry().ipos) == len(IPOS)
@@ -0,0 +1,52 @@
+from providers.ipo_updater import ipo_status, merge_into_registry
+
+EXCHANGE_ITEM = {
+    "company": "Bharat Coking Coal Limited", "status": "upcoming", "open_date": "2026-10-19",
+    "close_date": "2026-10-21", "listing_date": "2026-10-24", "price_band": "Rs 20-23",
+    "issue_size": "1000", "exchange": "NSE",
+}
+
+
+def rss_entry(name, last_seen):
+    return {"name": name, "short_name": name.upper(), "status": "unknown", "source": "Google News RSS",
+            "first_seen": "2026-01-20", "last_seen": last_seen}
+
+
+def test_status_follows_dates():
+    ipo = dict(EXCHANGE_ITEM)
+    assert ipo_status(ipo, "2026-10-18") == "upcoming"
+    assert ipo_status(ipo, "2026-10-20") == "open"
+    assert ipo_status(ipo, "2026-10-22") == "closed"
+    assert ipo_status(ipo, "2026-10-24") == "listed"
+    assert ipo_status({"status": "unknown"}, "2026-10-20") == "unknown"
+
+
+def test_exchange_entry_confirms_headline_candidate():
+    registry = {"ipos": [rss_entry("Bharat Coking Coal", "2026-10-01")]}
+    stats = merge_into_registry(registry, ["Amagi Media Labs IPO opens today"], [EXCHANGE_ITEM], "2026-10-20")
+    bccl, amagi = registry["ipos"]
+    assert bccl["name"] == "Bharat Coking Coal Limited"
+    assert bccl["first_seen"] == "2026-01-20"
+    assert (bccl["status"], bccl["source"]) == ("open", "NSE")
+    assert amagi["name"] == "Amagi Media Labs"
+    assert stats["added"] == 1 and stats["updated"] == 1
+
+
+def test_status_is_recomputed_after_ipo_leaves_exchange_lists():
+    registry = {"ipos": []}
+    merge_into_registry(registry, [], [EXCHANGE_ITEM], "2026-10-20")
+    assert registry["ipos"][0]["status"] == "open"
+    merge_into_registry(registry, [], [], "2026-11-05")
+    assert registry["ipos"][0]["status"] == "listed"
+
+
+def test_stale_unconfirmed_candidates_age_out():
+    registry = {"ipos": [rss_entry("date time revealed", "2026-08-01"), rss_entry("Recent Candidate Co", "2026-10-10")]}
+    merge_into_registry(registry, [], [EXCHANGE_ITEM], "2026-10-20")
+    names = [i["name"] for i in registry["ipos"]]
+    assert "date time revealed" not in names
+    assert "Recent Candidate Co" in names
+    # Exchange-confirmed entries are kept however old they get
+    stats = merge_into_registry(registry, [], [], "2027-06-01")
+    assert [i["name"] for i in registry["ipos"]] == ["Bharat Coking Coal Limited"]
+    assert stats["expired"] == 1
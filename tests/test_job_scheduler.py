@@ -0,0 +1,68 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from capabilities.job_scheduler import IST, CronTrigger, JobScheduler, format_job_stats
+
+
+def ist(*args) -> float:
+    return IST.localize(datetime(*args)).timestamp()
+
+
+def fires(expr: str, start: float, count: int):
+    trigger, ts, out = CronTrigger(expr), start, []
+    for _ in range(count):
+        ts = trigger.next_after(ts)
+        out.append(datetime.fromtimestamp(ts, IST))
+    return out
+
+
+def test_weekday_zero_is_monday():
+    # 2026-10-18 is a Sunday
+    (first,) = fires("0 9 * * 0", ist(2026, 10, 18, 12, 0), 1)
+    assert first.strftime("%a %Y-%m-%d %H:%M") == "Mon 2026-10-19 09:00"
+
+
+def test_weekday_range_covers_monday_to_friday():
+    runs = fires("30 8 * * 0-4", ist(2026, 10, 23, 9, 0), 5)  # from Friday after the slot
+    assert [r.strftime("%a") for r in runs] == ["Mon", "Tue", "Wed", "Thu", "Fri"]
+    assert all((r.hour, r.minute) == (8, 30) for r in runs)
+
+
+def test_steps_lists_and_ranges():
+    trigger = CronTrigger("*/20 9-10,15 * * *")
+    assert trigger.minutes == {0, 20, 40}
+    assert trigger.hours == {9, 10, 15}
+    assert trigger.weekdays == set(range(7))
+
+
+@pytest.mark.parametrize("expr", ["* * * *", "60 * * * *", "* 24 * * *", "* * * * 7", "5-1 * * * *"])
+def test_invalid_expressions_are_rejected(expr):
+    with pytest.raises(ValueError):
+        CronTrigger(expr)
+
+
+def test_previous_fire_within_window():
+    trigger = CronTrigger("50 8 * * *")
+    now = ist(2026, 10, 19, 9, 30)
+    assert trigger.previous_fire(now, 3600) == ist(2026, 10, 19, 8, 50)
+    assert trigger.previous_fire(now, 30 * 60) is None
+
+
+def test_job_stats_render_while_adaptive_job_runs(state_db):
+    scheduler = JobScheduler()
+    job = scheduler.add_adaptive("scanner", lambda: 60)
+    job.running, job.next_run = True, float("inf")
+    text = format_job_stats(scheduler)
+    assert "scanner (running)" in text
+    assert "after this run" in text
+
+
+def test_cron_catch_up_of_missed_run(state_db):
+    scheduler = JobScheduler()
+    expr = datetime.fromtimestamp(time.time() - 120, IST).strftime("%M %H * * *")
+    job = scheduler.add_cron("missed", lambda: None, expr, catch_up=3600)
+    assert job.next_run <= time.time()
+    later = scheduler.add_cron("no_catch_up", lambda: None, expr)
+    assert later.next_run > time.time()
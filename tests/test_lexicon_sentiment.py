@@ -0,0 +1,84 @@
+import pytest
+
+from capabilities.lexicon_sentiment import rank_articles, score_headlines, triage_articles
+
+# Alert-worthy headlines the lexicon can't score with confidence: they must reach the LLM
+MUST_REACH_LLM = [
+    "Hindenburg Research releases report on Adani Group",
+    "SEBI bars Karvy from broking",
+    "US imposes 50% duty on Indian pharma imports",
+    "Silver futures down 7% in minutes",
+    "RBI cancels licence of cooperative bank",
+    "Infosys CEO steps down",
+    "L&T bags order worth Rs 5,000 crore",
+    "Markets crash as FIIs pull out",
+    "Tata Motors profit jumps but margins under pressure amid weak demand and losses",
+]
+
+# Clear, low-magnitude lexicon hits: settled locally
+SETTLED = [
+    "Markets fall marginally",
+    "Nifty gains slightly in early trade",
+    "FMCG stocks rise marginally",
+]
+
+
+def _triage(titles):
+    return triage_articles([{"title": t} for t in titles])
+
+
+@pytest.mark.parametrize("title", MUST_REACH_LLM)
+def test_alert_headlines_reach_llm(title):
+    needs_llm, settled = _triage([title])
+    assert [a["title"] for a in needs_llm] == [title]
+    assert settled == []
+
+
+@pytest.mark.parametrize("title", SETTLED)
+def test_low_magnitude_headlines_are_settled(title):
+    needs_llm, settled = _triage([title])
+    assert needs_llm == []
+    assert settled[0]["lexicon"]["hits"] > 0
+
+
+def test_unscored_headline_is_never_settled():
+    needs_llm, settled = _triage(["Company announces board meeting date"])
+    assert needs_llm[0]["lexicon"]["hits"] == 0
+    assert settled == []
+
+
+def test_intensifier_after_term_scales_it():
+    plain, damped, boosted = score_headlines(["Markets fall", "Markets fall marginally", "Markets fall sharply"])
+    assert abs(damped["compound"]) < abs(plain["compound"]) < abs(boosted["compound"])
+    # Same weight whichever side the modifier is on
+    assert score_headlines(["Markets sharply fall"])[0]["compound"] == boosted["compound"]
+
+
+def test_batch_scoring_keeps_order():
+    scores = score_headlines(["Stock surges", "", "Stock plunges"])
+    assert scores[0]["compound"] > 0
+    assert scores[1]["hits"] == 0
+    assert scores[2]["compound"] < 0
+
+
+# Urgent news the lexicon scores only mildly
+ALERTS = [
+    "US launches military strike on Iran",
+    "RBI imposes curbs on Paytm Payments Bank",
+    "Govt hikes import duty on gold",
+    "Inflation spikes to 8%",
+    "No rate cut this year, says RBI governor",
+]
+
+
+def test_rank_articles_keeps_every_article():
+    articles = [{"title": t} for t in ALERTS + ["Markets fall marginally", "Stock plunges"]]
+    ranked = rank_articles(articles)
+    assert sorted(a["title"] for a in ranked) == sorted(a["title"] for a in articles)
+    assert ranked[0]["title"] == "Stock plunges"
+    assert all("lexicon" in a for a in ranked)
+
+
+def test_sharp_before_term_intensifies():
+    plain, sharp = score_headlines(["Markets fall", "Sharp fall in markets"])
+    assert abs(sharp["compound"]) > abs(plain["compound"])
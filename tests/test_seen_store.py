@@ -0,0 +1,61 @@
+import time
+
+from capabilities import seen_store
+from capabilities.seen_store import SeenStore, canonical_url
+
+ARTICLE = {"title": "RBI issues directions to co-operative bank", "url": "https://www.rbi.org.in/x?id=1&utm_source=feed"}
+
+
+def test_canonical_url_drops_tracking_and_www():
+    assert canonical_url("https://www.site.com/a/?utm_source=x&id=2&fbclid=y#top") == "https://site.com/a?id=2"
+
+
+def test_same_story_under_another_url_is_seen(state_db):
+    store = SeenStore("test")
+    assert store.check_and_mark(ARTICLE)
+    assert not store.check_and_mark({"title": ARTICLE["title"], "url": "https://mirror.example/story"})
+
+
+def test_resighting_extends_ttl(state_db, monkeypatch):
+    store = SeenStore("test", ttl_seconds=3 * 24 * 3600)
+    clock = [1_000_000.0]
+    monkeypatch.setattr(seen_store.time, "time", lambda: clock[0])
+    assert store.check_and_mark(ARTICLE)
+
+    # A slow feed keeps listing the item every day for a week: never new again
+    for _ in range(7):
+        clock[0] += 24 * 3600
+        assert not store.check_and_mark(ARTICLE)
+
+    # Expires only a full TTL after the last sighting
+    clock[0] += 3 * 24 * 3600 + 1
+    assert store.check_and_mark(ARTICLE)
+
+
+def test_last_seen_survives_restart(state_db, monkeypatch):
+    clock = [time.time() - 4 * 24 * 3600]
+    monkeypatch.setattr(seen_store.time, "time", lambda: clock[0])
+    store = SeenStore("test")
+    store.check_and_mark(ARTICLE)
+    store.flush()
+    clock[0] = time.time() - 3600
+    store.check_and_mark(ARTICLE)
+    store.flush()
+
+    clock[0] = time.time()
+    assert not SeenStore("test").check_and_mark(ARTICLE)
+
+
+def test_bounded_size(state_db):
+    store = SeenStore("test", max_entries=10)
+    for i in range(20):
+        store.check_and_mark({"title": f"headline {i}", "url": ""})
+    assert len(store) == 10
+
+
+def test_url_less_filings_with_the_same_title_are_kept_apart(state_db):
+    store = SeenStore("test")
+    filing = {"title": "BSE FILING: ABC Ltd - Board Meeting Intimation", "description": "Meeting on 20 Oct to approve Q2 results"}
+    assert store.check_and_mark(filing)
+    assert store.check_and_mark({**filing, "description": "Meeting on 5 Nov to consider a bonus issue"})
+    assert not store.check_and_mark(dict(filing))
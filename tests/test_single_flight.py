@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+from capabilities.single_flight import SingleFlight
+
+
+class Counter:
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_fresh_result_is_reused():
+    sf, fn = SingleFlight(), Counter(["report", "report 2"])
+    assert sf.do("k", fn, fresh_for=60) == "report"
+    assert sf.do("k", fn, fresh_for=60) == "report"
+    assert fn.calls == 1
+
+
+def test_no_freshness_window_recomputes():
+    sf, fn = SingleFlight(), Counter(["a", "b"])
+    assert sf.do("k", fn) == "a"
+    assert sf.do("k", fn) == "b"
+
+
+def test_raised_failure_is_not_cached():
+    sf, fn = SingleFlight(), Counter([RuntimeError("boom"), "ok"])
+    with pytest.raises(RuntimeError):
+        sf.do("k", fn, fresh_for=60)
+    assert sf.do("k", fn, fresh_for=60) == "ok"
+    assert fn.calls == 2
+
+
+def test_rejected_result_is_not_cached():
+    sf, fn = SingleFlight(), Counter(["Pre-market dashboard error: timeout", "dashboard"])
+    cacheable = lambda result: "error:" not in result
+    assert sf.do("k", fn, fresh_for=60, cacheable=cacheable).startswith("Pre-market dashboard error")
+    assert sf.do("k", fn, fresh_for=60, cacheable=cacheable) == "dashboard"
+    assert sf.do("k", fn, fresh_for=60, cacheable=cacheable) == "dashboard"
+    assert fn.calls == 2
+
+
+def test_failing_predicate_does_not_cache():
+    sf, fn = SingleFlight(), Counter(["a", "b"])
+    assert sf.do("k", fn, fresh_for=60, cacheable=lambda r: 1 / 0) == "a"
+    assert sf.do("k", fn, fresh_for=60) == "b"
+
+
+def test_concurrent_callers_share_one_run():
+    sf = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "shared"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(sf.do("k", slow)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(sf.do("k", slow))) for _ in range(3)]
+    for t in followers:
+        t.start()
+    # Followers register as waiters before the leader is released
+    while sf._inflight["k"].waiters < 3:
+        threading.Event().wait(0.01)
+    release.set()
+    for t in [leader] + followers:
+        t.join(5)
+    assert results == ["shared"] * 4
+    assert len(calls) == 1
+
+
+def test_concurrent_callers_share_the_exception():
+    sf = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("bad")
+
+    errors = []
+
+    def call():
+        try:
+            sf.do("k", failing, fresh_for=60)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    while sf._inflight["k"].waiters < 1:
+        threading.Event().wait(0.01)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert len(errors) == 2
+    assert "k" not in sf._results